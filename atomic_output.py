@@ -0,0 +1,162 @@
+"""
+Crash-safe output files.
+
+A converter killed while saving leaves a truncated file that looks like a finished output. The converters write to a
+partial file next to the output instead, `.<name>.partial<ext>`, and rename it onto the output once it is complete:
+the rename is atomic, so the output path holds either its previous content or the complete new file. A partial file
+left by a killed process is overwritten by the next conversion of the same output.
+
+Multi-page conversions also keep a PageManifest of the pages already written, so that a restarted conversion only
+renders the missing ones.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+
+
+def partial_path(path: str) -> str:
+    """
+    Returns the path a converter writes to before the output is complete. It keeps the extension of path, which the
+    savers pick the format from.
+    """
+    directory, name = os.path.split(path)
+    stem, extension = os.path.splitext(name)
+    return os.path.join(directory, f".{stem}.partial{extension}")
+
+
+def discard(path: str):
+    """
+    Removes a partial file, if it was written.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def atomic_output(path: str):
+    """
+    Yields the partial path to write the output to. The partial file replaces path when the with block completes, and
+    is removed when it raises.
+
+    Example:
+        with atomic_output(output_file) as partial:
+            image.save(partial)
+    """
+    partial = partial_path(path)
+    try:
+        yield partial
+    except BaseException:
+        discard(partial)
+        raise
+    os.replace(partial, path)
+
+
+def file_digest(path: str) -> str:
+    """
+    Returns the SHA-256 of a file, in hex.
+    """
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PageManifest:
+    """
+    Record of the pages of a multi-page conversion already written, kept next to them until the conversion completes.
+
+    The manifest is a JSON lines file: a header identifying the input (path, size and modification time) and the
+    conversion parameters, then one line per page with the size and SHA-256 of its file. Each line is appended with a
+    single write, so processes writing different pages of a document can share a manifest, and a line cut short by a
+    crash is ignored.
+
+    Args:
+        path (str): The path of the manifest file.
+        source (str): The path of the input file.
+        **params: The conversion parameters the pages depend on (e.g. the DPI).
+    """
+
+    def __init__(self, path: str, source: str, **params):
+        self.path = path
+        stat = os.stat(source)
+        self.header = {
+            "source": os.path.abspath(source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "params": params,
+        }
+
+    def resume(self, page_files: dict[int, str]) -> set[int]:
+        """
+        Returns the pages whose files are complete and unchanged since they were recorded, and starts a new manifest
+        if the recorded one is missing or belongs to another input or other parameters.
+
+        Args:
+            page_files (dict[int, str]): The output file of each page of the document.
+
+        Returns:
+            set[int]: The pages that do not need to be written again.
+        """
+        header, records = None, {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if header is None:
+                        header = record
+                    elif isinstance(record, dict) and "page" in record:
+                        records[record["page"]] = record
+        except OSError:
+            pass
+
+        if header != dict(self.header, pages=len(page_files)):
+            self.start(len(page_files))
+            return set()
+
+        done = set()
+        for page, record in records.items():
+            page_file = page_files.get(page)
+            try:
+                if (
+                    page_file is not None
+                    and os.path.getsize(page_file) == record["size"]
+                    and file_digest(page_file) == record["sha256"]
+                ):
+                    done.add(page)
+            except (OSError, KeyError):
+                pass
+        return done
+
+    def start(self, page_count: int):
+        """
+        Starts a new manifest, with no page written yet.
+        """
+        self._write(json.dumps(dict(self.header, pages=page_count)) + "\n", "w")
+
+    def add(self, page: int, page_file: str):
+        """
+        Records a page whose file is complete.
+        """
+        record = {
+            "page": page,
+            "size": os.path.getsize(page_file),
+            "sha256": file_digest(page_file),
+        }
+        self._write(json.dumps(record) + "\n", "a")
+
+    def remove(self):
+        discard(self.path)
+
+    def _write(self, line: str, mode: str):
+        # unbuffered, so that the line reaches the file in one write
+        with open(self.path, mode + "b", buffering=0) as f:
+            f.write(line.encode())
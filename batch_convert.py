@@ -0,0 +1,392 @@
+from typing import Iterable, Iterator, NamedTuple
+
+from result import ErrorCategory
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of converting one file of a batch.
+
+    Attributes:
+        file_path (str): The path of the input file.
+        status (str): 'converted', 'cached' (outputs taken from the conversion cache), 'skipped' (outputs already up to
+            date or input already in the target format), 'rejected' (content not recognized or not convertible to the
+            target format, found before any conversion) or 'failed'.
+        seconds (float): The wall time spent on the file.
+        outputs (list[str]): The paths of the output files.
+        error (str): A description of the failure, empty unless status is 'rejected' or 'failed'.
+        category (ErrorCategory | None): The kind of failure, None unless status is 'rejected' or 'failed'. A batch
+            runner can retry the 'timeout' failures and give up on the 'unsupported' and 'decode-failure' ones.
+    """
+
+    file_path: str
+    status: str
+    seconds: float
+    outputs: list[str]
+    error: str = ""
+    category: ErrorCategory | None = None
+
+
+def collect_files(sources: str | Iterable[str], recursive: bool = False) -> list[str]:
+    """
+    Expands batch sources into a sorted list of file paths.
+
+    Args:
+        sources (str | Iterable[str]): A directory, a glob pattern, a file path, or a list mixing any of them.
+        recursive (bool): Whether directories are walked recursively. Glob patterns may use '**' regardless.
+
+    Returns:
+        list[str]: The unique file paths, sorted.
+    """
+    import glob
+    import os
+
+    if isinstance(sources, str):
+        sources = [sources]
+
+    files = set()
+    for source in sources:
+        if os.path.isdir(source):
+            if recursive:
+                for root, _, names in os.walk(source):
+                    files.update(os.path.join(root, name) for name in names)
+            else:
+                files.update(
+                    entry.path for entry in os.scandir(source) if entry.is_file()
+                )
+        elif any(c in source for c in "*?["):
+            files.update(
+                path
+                for path in glob.glob(source, recursive=True)
+                if os.path.isfile(path)
+            )
+        else:
+            files.add(source)
+
+    return sorted(files)
+
+
+def convert_batch(
+    sources: str | Iterable[str],
+    output_type: str,
+    workers: int | None = None,
+    recursive: bool = False,
+    force: bool = False,
+    cache_dir: str | None = None,
+    profile: str | None = None,
+) -> Iterator[BatchResult]:
+    """
+    Converts many files to the same output type on a process pool, yielding each result as soon as it is available.
+
+    Outputs are written next to their input, with the names convert_to_pdf and convert_to_image would give them.
+
+    Args:
+        sources (str | Iterable[str]): A directory, a glob pattern, a file path, or a list mixing any of them.
+        output_type (str): The target format (e.g., 'pdf', 'png', 'jpg').
+        workers (int | None): The number of worker processes. Defaults to the number of CPUs; with 1 the files are
+            converted in the calling process.
+        recursive (bool): Whether directories are walked recursively.
+        force (bool): Convert even the files whose outputs are already up to date.
+        cache_dir (str | None): A ConversionCache directory. Inputs whose content was already converted to output_type
+            get their outputs from the cache instead of being converted again.
+        profile (str | None): An encoding profile (see encoding_profiles) passed to the converters. Outputs written
+            with another profile are still skipped as up to date unless force is set.
+
+    Yields:
+        BatchResult: One result per input file, in completion order.
+    """
+    import os
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    from detect_format import detect_format
+
+    workers = workers or os.cpu_count() or 1
+
+    # triage on the first bytes of each file, so that bad inputs never reach a worker
+    files = []
+    listings = {}
+    for file_path in collect_files(sources, recursive):
+        file_format = detect_format(file_path)
+        result = _triage(file_path, file_format, output_type)
+        if result is None and not force:
+            outputs = _up_to_date_outputs(file_path, file_format, output_type, listings)
+            if outputs:
+                result = BatchResult(file_path, "skipped", 0.0, outputs)
+        if result:
+            yield result
+        else:
+            files.append((file_path, file_format))
+
+    if workers == 1:
+        # not worth a process pool: convert in this process
+        for file_path, file_format in files:
+            yield _convert_one(file_path, file_format, output_type, cache_dir, profile)
+        return
+
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_path, file_format in files:
+            # keep a bounded number of jobs in flight so huge batches don't queue every future at once
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+            pending.add(
+                executor.submit(
+                    _convert_one,
+                    file_path,
+                    file_format,
+                    output_type,
+                    cache_dir,
+                    profile,
+                )
+            )
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _triage(
+    file_path: str, file_format: str | None, output_type: str
+) -> BatchResult | None:
+    """
+    Returns the result of a file that must not be converted: 'rejected' when it cannot be read, when its content is not
+    recognized or when it cannot be converted to output_type, 'skipped' when its content is already in the target format, whatever its extension.
+    Returns None otherwise.
+    """
+    import os
+
+    import converter_registry
+    from detect_format import normalize
+
+    if file_format is None and not os.access(file_path, os.R_OK):
+        # removed since it was listed, or unreadable
+        return BatchResult(
+            file_path,
+            "rejected",
+            0.0,
+            [],
+            f"{file_path} not found",
+            ErrorCategory.NOT_FOUND,
+        )
+    if file_format is None:
+        return BatchResult(
+            file_path,
+            "rejected",
+            0.0,
+            [],
+            "unrecognized file format",
+            ErrorCategory.UNSUPPORTED,
+        )
+    if file_format == normalize(output_type):
+        return BatchResult(file_path, "skipped", 0.0, [file_path])
+    if not converter_registry.route(file_format, output_type):
+        return BatchResult(
+            file_path,
+            "rejected",
+            0.0,
+            [],
+            f"no conversion from {file_format} to {output_type}",
+            ErrorCategory.UNSUPPORTED,
+        )
+    return None
+
+
+def _convert_one(
+    file_path: str,
+    file_format: str,
+    output_type: str,
+    cache_dir: str | None = None,
+    profile: str | None = None,
+) -> BatchResult:
+    """
+    Converts a single file of a batch. Runs in a worker process.
+    """
+    import os
+    import time
+
+    import converter_registry
+
+    start = time.perf_counter()
+    output_stem = os.path.splitext(file_path)[0]
+    # without a profile, the keys and options of the conversions made before profiles existed
+    params = {"profile": profile} if profile else {}
+    cache = key = None
+    try:
+        if cache_dir:
+            cache = _cache(cache_dir)
+            key = cache.key(file_path, output_type=output_type, **params)
+            outputs = cache.fetch(key, output_stem)
+            if outputs is not None:
+                return BatchResult(
+                    file_path, "cached", time.perf_counter() - start, outputs
+                )
+            # outputs hardlinked from the cache are safe to convert over: every converter writes a new file and
+            # renames it onto the output (see atomic_output), so the cached copy is never rewritten in place
+
+        result = converter_registry.convert_file(file_path, output_type, **params)
+    except Exception as e:
+        return BatchResult(
+            file_path,
+            "failed",
+            time.perf_counter() - start,
+            [],
+            repr(e),
+            ErrorCategory.FAILED,
+        )
+
+    seconds = time.perf_counter() - start
+    if not result.ok:
+        return BatchResult(
+            file_path, "failed", seconds, [], result.message, result.error
+        )
+
+    if cache:
+        cache.store(key, result.outputs, output_stem, output_type=output_type, **params)
+    return BatchResult(file_path, "converted", seconds, result.outputs)
+
+
+# ConversionCache instances of the current process, by directory
+_caches = {}
+
+
+def _cache(cache_dir: str):
+    from conversion_cache import ConversionCache
+
+    if cache_dir not in _caches:
+        _caches[cache_dir] = ConversionCache(cache_dir)
+    return _caches[cache_dir]
+
+
+def _output_files(
+    file_path: str,
+    file_format: str,
+    output_type: str,
+    listings: dict[str, set[str]] | None = None,
+) -> list[str]:
+    """
+    Returns the outputs of a file converted with the default output name: `<name>.<ext>`, or `<name>_<i>.<ext>` for
+    each page or frame when the input has several.
+
+    The pages of PDF files and the frames of images are counted from the input. A Word document converted to images
+    goes through a PDF whose page count is only known once converted: its pages are the consecutive `<name>_<i>.<ext>`
+    files found in the directory. listings caches the names of each directory across the files of a batch.
+
+    Returns:
+        list[str]: The output paths, which may not exist. Empty when the page count cannot be read.
+    """
+    import os
+    import re
+
+    import converter_registry
+
+    stem = os.path.splitext(file_path)[0]
+    chain = converter_registry.route(file_format, output_type)
+    if not chain:
+        return []
+    pages = _page_count(file_path, file_format) if chain[-1].multi_page else 1
+    if pages == 1:
+        return [f"{stem}.{output_type}"]
+    if pages:
+        return [f"{stem}_{page}.{output_type}" for page in range(1, pages + 1)]
+
+    pattern = re.compile(
+        re.escape(os.path.basename(stem)) + r"_(\d+)\." + re.escape(output_type)
+    )
+    found = {
+        int(match.group(1))
+        for match in map(pattern.fullmatch, _listing(file_path, listings))
+        if match
+    }
+    if found != set(range(1, len(found) + 1)):
+        # missing pages, or `<name>_<i>` outputs of other inputs
+        return []
+    return [f"{stem}_{page}.{output_type}" for page in sorted(found)]
+
+
+def _first_output(
+    file_path: str, output_type: str, listings: dict[str, set[str]] | None = None
+) -> str | None:
+    """
+    Returns the path of the first output of a file found in its directory, `<name>.<ext>` or `<name>_1.<ext>`, or
+    None if the file has no output there. Unlike _output_files, this never opens the file.
+    """
+    import os
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    names = _listing(file_path, listings)
+    for output in (f"{name}.{output_type}", f"{name}_1.{output_type}"):
+        if output in names:
+            return os.path.join(os.path.dirname(file_path), output)
+    return None
+
+
+def _listing(file_path: str, listings: dict[str, set[str]] | None) -> set[str]:
+    """
+    Returns the names of the files in the directory of a file, read once per directory into listings.
+    """
+    import os
+
+    directory = os.path.dirname(file_path) or "."
+    if listings is None:
+        listings = {}
+    if directory not in listings:
+        listings[directory] = set(os.listdir(directory))
+    return listings[directory]
+
+
+def _page_count(file_path: str, file_format: str) -> int | None:
+    """
+    Returns the number of pages of a PDF file or of frames of an image, 0 if it cannot be read, or None for the
+    other formats.
+    """
+    from detect_format import IMAGE_FORMATS, MULTI_FRAME_FORMATS
+
+    try:
+        if file_format == "pdf":
+            from pdf2image import pdfinfo_from_path
+
+            return pdfinfo_from_path(file_path)["Pages"]
+        if file_format in MULTI_FRAME_FORMATS:
+            from PIL import Image
+
+            with Image.open(file_path) as im:
+                return getattr(im, "n_frames", 1)
+    except Exception:
+        return 0
+    return 1 if file_format in IMAGE_FORMATS else None
+
+
+def _up_to_date_outputs(
+    file_path: str,
+    file_format: str,
+    output_type: str,
+    listings: dict[str, set[str]] | None = None,
+) -> list[str]:
+    """
+    Returns the outputs of a file if they all exist and are newer than the file, an empty list otherwise. A file that
+    would be its own output, such as a PNG named .jpg, is never up to date.
+
+    The first output is looked up in the directory listing before the file is opened to count its pages, so that files
+    never converted, or changed since, cost no pdfinfo call.
+    """
+    import os
+
+    try:
+        source_mtime = os.path.getmtime(file_path)
+        first = _first_output(file_path, output_type, listings)
+        if first is None or os.path.getmtime(first) < source_mtime:
+            return []
+        outputs = _output_files(file_path, file_format, output_type, listings)
+        if (
+            outputs
+            and file_path not in outputs
+            and all(os.path.getmtime(o) >= source_mtime for o in outputs)
+        ):
+            return outputs
+    except OSError:
+        pass
+    return []
@@ -0,0 +1,32 @@
+"""
+Benchmarks for the conversion functions.
+
+Each benchmark is a standalone module run from the project root, e.g.:
+
+    python -m benchmarks.bench_pdf_workers
+"""
+
+
+def measure(func, *args, **kwargs) -> tuple[float, float]:
+    """
+    Runs func(*args, **kwargs) in a freshly spawned process, so that its peak memory is not hidden by whatever the
+    benchmark itself has allocated.
+
+    Returns:
+        tuple[float, float]: The wall time of the call in seconds and the peak RSS of the process in MiB.
+    """
+    import multiprocessing
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_measured, (func, args, kwargs))
+
+
+def _measured(func, args, kwargs) -> tuple[float, float]:
+    import resource
+    import time
+
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
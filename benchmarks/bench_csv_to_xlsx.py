@@ -0,0 +1,50 @@
+"""
+Measures CSV → XLSX throughput, in rows/s, and peak memory for exports of increasing length. Peak memory should stay
+flat as the row count grows.
+
+    python -m benchmarks.bench_csv_to_xlsx [--rows N [N ...]]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import measure
+from convert_to_xlsx import from_csv
+
+
+def make_export(path: str, rows: int) -> None:
+    """
+    Writes a CSV export mixing integer, decimal, date, identifier and text columns.
+    """
+    with open(path, "w", newline="") as f:
+        f.write("id,customer,amount,date,zip,comment\n")
+        for i in range(rows):
+            f.write(
+                f"{i},C{i % 5003:05d},{i % 10007 / 100},2024-{i % 12 + 1:02d}-{i % 28 + 1:02d},"
+                f"0{i % 9000 + 1000},order {i} shipped\n"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "out.xlsx")
+
+        print(f"{'rows':>10} {'seconds':>9} {'rows/s':>9} {'peak MiB':>9}")
+        for rows in args.rows:
+            csv_file = os.path.join(tmp, f"export_{rows}.csv")
+            make_export(csv_file, rows)
+
+            elapsed, peak = measure(from_csv, csv_file, output_file)
+            print(f"{rows:>10} {elapsed:>9.2f} {rows / elapsed:>9.0f} {peak:>9.1f}")
+            os.remove(csv_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures how fast a batch can be triaged with detect_format, compared with opening every image with PIL.
+
+    python -m benchmarks.bench_detect_format [--files N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from detect_format import detect_format
+
+
+def make_files(directory: str, files: int) -> list[str]:
+    """
+    Writes `files` small files cycling through images, PDFs, Word documents, text and garbage, some of them
+    mislabeled, and returns their paths.
+    """
+    import io
+
+    from PIL import Image
+
+    samples = []
+    for fmt, ext in [("PNG", "png"), ("JPEG", "jpg"), ("GIF", "gif"), ("JPEG", "png")]:
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 64), "red").save(buffer, fmt)
+        samples.append((ext, buffer.getvalue()))
+    samples += [
+        ("pdf", b"%PDF-1.4\n" + bytes(1024)),
+        ("docx", b"PK\x03\x04" + bytes(26) + b"word/document.xml" + bytes(1024)),
+        ("txt", b"lorem ipsum dolor sit amet\n" * 64),
+        ("jpg", os.urandom(2048)),
+    ]
+
+    paths = []
+    for i in range(files):
+        ext, data = samples[i % len(samples)]
+        path = os.path.join(directory, f"file_{i:06d}.{ext}")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def pil_open(file_path: str) -> str | None:
+    """
+    The decode-attempt approach: let PIL identify the file.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(file_path) as im:
+            return im.format
+    except UnidentifiedImageError:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_files(tmp, args.files)
+
+        print(f"{'method':>14} {'seconds':>9} {'files/sec':>10} {'rejected':>9}")
+        for name, func in [("detect_format", detect_format), ("PIL open", pil_open)]:
+            start = time.perf_counter()
+            rejected = sum(func(path) is None for path in paths)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>14} {elapsed:>9.2f} {len(paths) / elapsed:>10.0f} {rejected:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
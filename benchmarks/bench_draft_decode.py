@@ -0,0 +1,68 @@
+"""
+Measures time and peak memory of downscaling a large camera JPEG with from_image's max_size (JPEG draft mode) against
+decoding it at full resolution and resizing afterwards, at several scale factors.
+
+    python -m benchmarks.bench_draft_decode [--size WIDTHxHEIGHT] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import measure
+from convert_to_image import from_image
+
+SCALES = (1, 2, 4, 8)
+
+
+def make_photo(path: str, size: tuple[int, int]) -> None:
+    """
+    Writes a noisy JPEG of the given size, which does not compress much better than a real photo.
+    """
+    from PIL import Image
+
+    Image.effect_noise(size, 48).convert("RGB").save(path, quality=90)
+
+
+def full_decode(image_file: str, output_file: str, max_size: tuple[int, int]) -> int:
+    """
+    The path without draft mode: decode every pixel, then resize.
+    """
+    from PIL import Image
+
+    with Image.open(image_file) as im:
+        image = im.convert("RGB")
+    image.thumbnail(max_size)
+    image.save(output_file)
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="6000x4000", help="photo size in pixels")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    size = tuple(int(n) for n in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        photo = os.path.join(tmp, "photo.jpg")
+        make_photo(photo, size)
+        output_file = os.path.join(tmp, "out.png")
+
+        print(f"{'scale':>6} {'method':>12} {'ms/image':>9} {'peak MiB':>9}")
+        for scale in SCALES:
+            max_size = (size[0] // scale, size[1] // scale)
+            for name, func in [("full decode", full_decode), ("draft", from_image)]:
+                runs = [
+                    measure(func, photo, output_file, max_size=max_size)
+                    for _ in range(args.repeat)
+                ]
+                elapsed = min(seconds for seconds, _ in runs)
+                peak = min(peak for _, peak in runs)
+                print(
+                    f"{'1/' + str(scale):>6} {name:>12} {elapsed * 1000:>9.0f} {peak:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
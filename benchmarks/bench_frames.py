@@ -0,0 +1,77 @@
+"""
+Peak memory of converting long animations frame by frame, against copying every frame before saving them, as the
+frames would be kept by an image list.
+
+    python -m benchmarks.bench_frames [--frames 1000,3000] [--size WIDTHxHEIGHT]
+
+Each animation is an animated GIF of noisy frames; it is converted to PNG frames and to a PDF of one page per frame.
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import measure
+from convert_to_image import from_image
+from convert_to_pdf import from_image as image_to_pdf
+
+
+def make_animation(path: str, frames: int, size: tuple[int, int]) -> None:
+    """
+    Writes an animated GIF of `frames` noisy frames. The frames are generated as Pillow writes them.
+    """
+    from PIL import Image
+
+    noise = Image.effect_noise(size, 64).convert("P")
+    # distinct neighbours, which GIF would merge into one frame
+    variants = [
+        noise,
+        noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT),
+        noise.transpose(Image.Transpose.FLIP_TOP_BOTTOM),
+        noise.rotate(180),
+    ]
+    Image.new("P", size).save(
+        path,
+        save_all=True,
+        append_images=(variants[i % len(variants)] for i in range(frames - 1)),
+        duration=40,
+    )
+
+
+def copy_frames(image_file: str, output_file: str) -> None:
+    """
+    The list path: every frame is copied out of the animation before the first one is saved.
+    """
+    from PIL import Image, ImageSequence
+
+    stem, extension = os.path.splitext(output_file)
+    with Image.open(image_file) as im:
+        frames = [frame.copy() for frame in ImageSequence.Iterator(im)]
+    for i, frame in enumerate(frames, start=1):
+        frame.save(f"{stem}_{i}{extension}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", default="1000,3000")
+    parser.add_argument("--size", default="320x240", help="frame size in pixels")
+    args = parser.parse_args()
+    size = tuple(int(n) for n in args.size.split("x"))
+
+    print(f"{'frames':>7} {'method':>16} {'seconds':>9} {'peak MiB':>9}")
+    for frames in (int(n) for n in args.frames.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            animation = os.path.join(tmp, "anim.gif")
+            # in a separate process: a child starts with the peak RSS of the process it was forked from
+            measure(make_animation, animation, frames, size)
+            for name, func, output in [
+                ("copy frames", copy_frames, "copy.png"),
+                ("from_image", from_image, "frame.png"),
+                ("from_image pdf", image_to_pdf, "anim.pdf"),
+            ]:
+                elapsed, peak = measure(func, animation, os.path.join(tmp, output))
+                print(f"{frames:>7} {name:>16} {elapsed:>9.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Counts Pillow image allocations and wall time of converting a mixed corpus (RGB photos, RGBA logos, grayscale scans,
+palette GIFs) to PNG, GIF and JPG, with image_modes.prepare_image against always converting to RGB first.
+
+    python -m benchmarks.bench_image_modes [--size WIDTHxHEIGHT] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from image_modes import prepare_image
+
+TARGETS = ("png", "gif", "jpg")
+
+
+def make_corpus(directory: str, size: tuple[int, int]) -> list[str]:
+    """
+    Writes one image of each kind and returns their paths.
+    """
+    from PIL import Image
+
+    noise = Image.effect_noise(size, 48)
+    photo = Image.merge("RGB", (noise, noise.rotate(90), noise.rotate(180)))
+    logo = photo.copy()
+    logo.putalpha(noise)
+    corpus = {
+        "photo.jpg": photo,
+        "logo.png": logo,
+        "scan.png": noise,
+        "icon.gif": photo.quantize(64),
+    }
+    paths = []
+    for name, im in corpus.items():
+        path = os.path.join(directory, name)
+        im.save(path)
+        paths.append(path)
+    return paths
+
+
+def always_rgb(im, output_format: str):
+    """
+    The previous behaviour: a full RGB copy whatever the target.
+    """
+    return im.convert("RGB")
+
+
+def run(convert, image_files: list[str], directory: str) -> tuple[float, int]:
+    """
+    Converts every image to every other target format. Returns the wall time and the number of images Pillow
+    allocated.
+    """
+    from PIL import Image
+
+    allocations = Image.core.get_stats()["new_count"]
+    start = time.perf_counter()
+    for image_file in image_files:
+        for target in TARGETS:
+            if image_file.endswith(target):
+                continue
+            with Image.open(image_file) as im:
+                im.load()
+                convert(im, target).save(os.path.join(directory, f"out.{target}"))
+    return (
+        time.perf_counter() - start,
+        Image.core.get_stats()["new_count"] - allocations,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="2000x1500", help="image size in pixels")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    size = tuple(int(n) for n in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_files = make_corpus(tmp, size)
+
+        print(f"{'method':>14} {'seconds':>9} {'allocations':>12}")
+        for name, convert in [
+            ("always RGB", always_rgb),
+            ("prepare_image", prepare_image),
+        ]:
+            runs = [run(convert, image_files, tmp) for _ in range(args.repeat)]
+            seconds = min(elapsed for elapsed, _ in runs)
+            print(f"{name:>14} {seconds:>9.2f} {runs[0][1]:>12}")
+
+
+if __name__ == "__main__":
+    main()
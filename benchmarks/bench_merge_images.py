@@ -0,0 +1,63 @@
+"""
+Compares assembling many JPEG pages into one PDF with from_images against decoding every page to RGB and saving them
+with Pillow, the way from_image converts a single image.
+
+    python -m benchmarks.bench_merge_images [--pages N] [--size WIDTHxHEIGHT]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import measure
+from convert_to_pdf import from_images
+
+
+def make_pages(directory: str, pages: int, size: tuple[int, int]) -> list[str]:
+    """
+    Writes `pages` noisy JPEG scans of the given size and returns their paths.
+    """
+    from PIL import Image
+
+    page = Image.effect_noise(size, 32).convert("RGB")
+    paths = []
+    for i in range(pages):
+        path = os.path.join(directory, f"page_{i:04d}.jpg")
+        page.save(path, quality=85)
+        paths.append(path)
+    return paths
+
+
+def decode_rgb(image_files: list[str], output_file: str) -> None:
+    """
+    The decode + RGB path: every page is decoded and kept in memory until Pillow writes the PDF.
+    """
+    from PIL import Image
+
+    images = []
+    for image_file in image_files:
+        with Image.open(image_file) as im:
+            images.append(im.convert("RGB"))
+    images[0].save(output_file, save_all=True, append_images=images[1:])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--size", default="2480x3508", help="page size in pixels")
+    args = parser.parse_args()
+    size = tuple(int(n) for n in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_files = make_pages(tmp, args.pages, size)
+        output_file = os.path.join(tmp, "out.pdf")
+
+        print(f"{'method':>12} {'seconds':>9} {'peak MiB':>9} {'output MiB':>11}")
+        for name, func in [("decode+RGB", decode_rgb), ("from_images", from_images)]:
+            elapsed, peak = measure(func, image_files, output_file)
+            output_size = os.path.getsize(output_file) / 2**20
+            print(f"{name:>12} {elapsed:>9.2f} {peak:>9.1f} {output_size:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cost of the metrics spans: the time of an empty span with no sink, with a MemorySink and with a JsonLinesSink, and
+the wall time of converting small images with each, where that cost would show most.
+
+    python -m benchmarks.bench_metrics [--spans N] [--images N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import metrics
+from convert_to_image import from_image
+
+
+def span_cost(spans: int) -> float:
+    """
+    Returns the time of entering and leaving one span, in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(spans):
+        with metrics.span("encode", "bench") as s:
+            s.add(pages=1)
+    return (time.perf_counter() - start) / spans * 1e6
+
+
+def convert_images(directory: str, images: int) -> float:
+    """
+    Converts a 64x64 JPEG to PNG `images` times and returns the wall time.
+    """
+    from PIL import Image
+
+    source = os.path.join(directory, "small.jpg")
+    Image.effect_noise((64, 64), 48).convert("RGB").save(source)
+    start = time.perf_counter()
+    for _ in range(images):
+        from_image(source, os.path.join(directory, "small.png"))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--spans", type=int, default=1_000_000)
+    parser.add_argument("--images", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sinks = [
+            ("disabled", None),
+            ("MemorySink", metrics.MemorySink()),
+            ("JsonLinesSink", metrics.JsonLinesSink(os.path.join(tmp, "spans.jsonl"))),
+        ]
+        print(f"{'sink':>14} {'us/span':>9} {'convert s':>10}")
+        for name, sink in sinks:
+            if sink:
+                metrics.add_sink(sink)
+            try:
+                cost = span_cost(args.spans)
+                seconds = convert_images(tmp, args.images)
+            finally:
+                if sink:
+                    metrics.remove_sink(sink)
+            print(f"{name:>14} {cost:>9.3f} {seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures how PDF rasterization scales with the number of rendering workers.
+
+    python -m benchmarks.bench_pdf_workers [--pdf FILE] [--pages N] [--workers 1 2 4 8 16]
+
+Without --pdf a synthetic document of --pages pages is generated in a temporary directory.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from convert_to_image import from_pdf
+
+
+def make_pdf(pdf_file: str, pages: int) -> None:
+    """
+    Writes a synthetic multi-page PDF made of noisy A4-sized pages at 150 DPI.
+    """
+    from PIL import Image
+
+    images = [Image.effect_noise((1240, 1754), 64).convert("RGB") for _ in range(pages)]
+    images[0].save(pdf_file, save_all=True, append_images=images[1:], resolution=150)
+
+
+def run(pdf_file: str, worker_counts: list[int], output_type: str) -> list[tuple]:
+    """
+    Converts pdf_file once per worker count and returns (workers, seconds, pages/sec) rows.
+    """
+    from pdf2image import pdfinfo_from_path
+
+    page_count = pdfinfo_from_path(pdf_file)["Pages"]
+    rows = []
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            res = from_pdf(
+                pdf_file, output_dir + os.sep, "page", output_type, workers=workers
+            )
+            elapsed = time.perf_counter() - start
+        if res == -1:
+            raise RuntimeError(f"conversion failed with {workers} workers")
+        rows.append((workers, elapsed, page_count / elapsed))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", help="PDF to render (default: synthetic document)")
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--type", default="png", dest="output_type")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_file = args.pdf
+        if not pdf_file:
+            pdf_file = os.path.join(tmp, "synthetic.pdf")
+            make_pdf(pdf_file, args.pages)
+
+        print(f"{'workers':>8} {'seconds':>9} {'pages/sec':>10}")
+        for workers, elapsed, rate in run(pdf_file, args.workers, args.output_type):
+            print(f"{workers:>8} {elapsed:>9.2f} {rate:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Output size and wall time of each encoding profile, on the corpus of the benchmark suite.
+
+    python -m benchmarks.bench_profiles [--scale 0.25] [--repeat 3]
+
+Every case is converted with the encoders' defaults and with each profile of encoding_profiles.PROFILES; the size is
+relative to the defaults. PDF to image cases are skipped without pdftoppm.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks import measure
+from benchmarks.corpus import make_corpus
+from benchmarks.suite import Case, _convert, _missing_requirement
+from encoding_profiles import PROFILES
+
+CASES = [
+    Case("image/jpg_to_png", "convert_to_image:from_image", "photo.jpg", "png"),
+    Case("image/png_rgba_to_jpg", "convert_to_image:from_image", "logo.png", "jpg"),
+    Case("image/jpg_to_webp", "convert_to_image:from_image", "photo.jpg", "webp"),
+    Case("image/tiff_to_png", "convert_to_image:from_image", "scan.tiff", "png"),
+    Case("image/gif_to_tiff", "convert_to_image:from_image", "icon.gif", "tiff"),
+    Case(
+        "image/pdf_to_png",
+        "converter_registry:_pdf_to_image",
+        "document.pdf",
+        "png",
+        requires="pdftoppm",
+    ),
+    Case("pdf/png_rgba", "convert_to_pdf:from_image", "logo.png", "pdf"),
+    Case("pdf/tiff", "convert_to_pdf:from_image", "scan.tiff", "pdf"),
+    Case("pdf/txt", "convert_to_pdf:from_text", "log.txt", "pdf"),
+]
+
+
+def run_profile(
+    case: Case, corpus: dict, directory: str, profile: str | None, repeat: int
+) -> tuple[float, int]:
+    """
+    Converts a case with a profile repeat times into an empty directory.
+
+    Returns:
+        tuple[float, int]: The best wall time in seconds and the total size of the outputs in bytes.
+    """
+    options = dict(case.options, profile=profile) if profile else case.options
+    seconds = None
+    for _ in range(repeat):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.mkdir(directory)
+        elapsed, _ = measure(
+            _convert,
+            case.handler,
+            corpus[case.source],
+            os.path.join(directory, f"output.{case.target}"),
+            options,
+        )
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    size = sum(entry.stat().st_size for entry in os.scandir(directory))
+    return seconds, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scale", type=float, default=0.25, help="corpus size factor (default: 0.25)"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = make_corpus(tmp, args.seed, args.scale)
+        output_dir = os.path.join(tmp, "output")
+
+        print(f"{'case':<22} {'profile':>9} {'seconds':>9} {'KiB':>9} {'size':>6}")
+        for case in CASES:
+            missing = _missing_requirement(case.requires)
+            if missing:
+                print(f"{case.name:<22} skipped: {missing} not available")
+                continue
+            default_size = None
+            for profile in (None, *PROFILES):
+                seconds, size = run_profile(
+                    case, corpus, output_dir, profile, args.repeat
+                )
+                default_size = default_size or size
+                print(
+                    f"{case.name:<22} {profile or 'default':>9} {seconds:>9.2f} "
+                    f"{size / 1024:>9.0f} {size / default_size:>6.0%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test of the conversion service: latency percentiles and throughput of small image conversions at increasing
+client concurrency, against starting a convert_cli.py process per file.
+
+    python -m benchmarks.bench_service [--workers N] [--jobs N] [--concurrency 1,2,4,8,16]
+
+Latency is measured by the client, from submitting a job to receiving its final status on the events stream.
+Jobs refused with 503 (queue full) are retried after the Retry-After delay and counted.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from conversion_service import request
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_level(
+    socket: str, source: str, directory: str, jobs: int, concurrency: int
+):
+    """
+    Runs jobs conversions from `concurrency` concurrent clients. Returns the latencies, the wall time and the number
+    of 503 answers.
+    """
+    latencies = []
+    refused = 0
+    pending = iter(range(jobs))
+
+    async def client():
+        nonlocal refused
+        for i in pending:
+            job = {
+                "file": source,
+                "target": "gif",
+                "output": os.path.join(directory, f"out_{concurrency}_{i}.gif"),
+            }
+            start = time.perf_counter()
+            while True:
+                status, (document,) = await request(socket, "POST", "/jobs", job)
+                if status != 503:
+                    break
+                refused += 1
+                await asyncio.sleep(1)
+            _, events = await request(socket, "GET", f"/jobs/{document['id']}/events")
+            if events[-1]["status"] != "done":
+                raise RuntimeError(events[-1])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, refused
+
+
+def run_processes(source: str, directory: str, jobs: int) -> list[float]:
+    """
+    The previous way: one interpreter per conversion, run one after the other.
+    """
+    latencies = []
+    for i in range(jobs):
+        target = os.path.join(directory, f"cli_{i}.png")
+        os.link(source, target)
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "convert_cli.py", "--to", "gif", target],
+            check=True,
+            capture_output=True,
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--jobs", type=int, default=200, help="jobs per level")
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--size", default="640x480", help="image size in pixels")
+    args = parser.parse_args()
+    size = tuple(int(n) for n in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "photo.png")
+        noise = Image.effect_noise(size, 48)
+        Image.merge("RGB", (noise, noise.rotate(90), noise.rotate(180))).save(source)
+
+        socket = os.path.join(tmp, "converter.sock")
+        service = subprocess.Popen(
+            [
+                sys.executable,
+                "conversion_service.py",
+                "--socket",
+                socket,
+                "--workers",
+                str(args.workers),
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            # printed once the workers are up and the socket listens
+            service.stdout.readline()
+
+            print(
+                f"{'clients':>8} {'p50 ms':>8} {'p99 ms':>8} {'jobs/s':>8} {'503s':>6}"
+            )
+            cli = run_processes(source, tmp, max(1, args.jobs // 10))
+            print(
+                f"{'cli':>8} {percentile(cli, 50) * 1000:>8.1f} {percentile(cli, 99) * 1000:>8.1f} "
+                f"{len(cli) / sum(cli):>8.1f} {'-':>6}"
+            )
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                latencies, seconds, refused = asyncio.run(
+                    run_level(socket, source, tmp, args.jobs, concurrency)
+                )
+                print(
+                    f"{concurrency:>8} {percentile(latencies, 50) * 1000:>8.1f} "
+                    f"{percentile(latencies, 99) * 1000:>8.1f} {args.jobs / seconds:>8.1f} {refused:>6}"
+                )
+        finally:
+            service.terminate()
+            service.wait()
+
+
+if __name__ == "__main__":
+    main()
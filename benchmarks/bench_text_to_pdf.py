@@ -0,0 +1,59 @@
+"""
+Measures TXT → PDF throughput, in MB/s of input text, and peak memory for log files of increasing size. Peak memory
+should stay flat as the input grows.
+
+    python -m benchmarks.bench_text_to_pdf [--sizes MB [MB ...]]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import measure
+from convert_to_pdf import from_text
+
+
+def make_log(path: str, megabytes: int) -> None:
+    """
+    Writes a log file of about the given size, with lines of varying length, a few of them wider than a page.
+    """
+    levels = ("INFO", "DEBUG", "WARNING", "ERROR")
+    with open(path, "w") as f:
+        i = 0
+        while f.tell() < megabytes * 2**20:
+            f.write(
+                f"2024-05-01 12:{i // 60 % 60:02d}:{i % 60:02d} {levels[i % 4]:<7} "
+                f"worker-{i % 16} request {i} done in {i % 997} ms"
+                + (" (retried)" * (i % 23) if i % 7 == 0 else "")
+                + "\n"
+            )
+            i += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "out.pdf")
+
+        print(
+            f"{'input MB':>9} {'seconds':>9} {'MB/s':>7} {'peak MiB':>9} {'pages':>7}"
+        )
+        for megabytes in args.sizes:
+            text_file = os.path.join(tmp, f"log_{megabytes}.txt")
+            make_log(text_file, megabytes)
+            size = os.path.getsize(text_file) / 2**20
+
+            elapsed, peak = measure(from_text, text_file, output_file)
+            with open(output_file, "rb") as f:
+                pages = f.read().count(b"/Type /Page ")
+            print(
+                f"{size:>9.0f} {elapsed:>9.2f} {size / elapsed:>7.1f} {peak:>9.1f} {pages:>7}"
+            )
+            os.remove(text_file)
+
+
+if __name__ == "__main__":
+    main()
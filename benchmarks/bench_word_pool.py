@@ -0,0 +1,83 @@
+"""
+Compares converting many small Word documents with from_word, one call per document, against a WordConverterPool.
+
+    python -m benchmarks.bench_word_pool [--documents N] [--workers N]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks import measure
+from convert_to_pdf import from_word
+from word_pool import WordConverterPool
+
+
+def make_documents(directory: str, documents: int) -> list[str]:
+    """
+    Writes `documents` copies of a small one-page .docx file and returns their paths.
+    """
+    from spire.doc import Document
+
+    template = os.path.join(directory, "template.docx")
+    document = Document()
+    section = document.AddSection()
+    for i in range(20):
+        section.AddParagraph().AppendText(f"Paragraph {i}: " + "lorem ipsum " * 10)
+    document.SaveToFile(template)
+    document.Close()
+
+    paths = []
+    for i in range(documents):
+        path = os.path.join(directory, f"doc_{i:05d}.docx")
+        shutil.copyfile(template, path)
+        paths.append(path)
+    return paths
+
+
+def per_call(word_files: list[str]) -> None:
+    for word_file in word_files:
+        from_word(word_file, word_file.removesuffix(".docx") + ".pdf")
+
+
+def pooled(word_files: list[str], workers: int) -> None:
+    with WordConverterPool(workers=workers) as pool:
+        futures = [
+            pool.submit(word_file, word_file.removesuffix(".docx") + ".pdf")
+            for word_file in word_files
+        ]
+        for future in futures:
+            future.result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        word_files = make_documents(tmp, args.documents)
+
+        print(f"{'method':>24} {'seconds':>9} {'docs/sec':>9}")
+
+        # in a fresh process, so that the spire.doc import and warm-up are paid like on a real per-call path
+        start = time.perf_counter()
+        measure(per_call, word_files)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'from_word per call':>24} {elapsed:>9.2f} {len(word_files) / elapsed:>9.1f}"
+        )
+
+        # the pool starts its own processes: it cannot run inside a measure() worker, which is daemonic
+        start = time.perf_counter()
+        pooled(word_files, args.workers)
+        elapsed = time.perf_counter() - start
+        name = f"pool ({args.workers} workers)"
+        print(f"{name:>24} {elapsed:>9.2f} {len(word_files) / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Reproducible synthetic corpus for the benchmark suite.
+
+Every file is generated from a seeded random generator, so two runs with the same seed and scale convert the same
+bytes and their timings can be compared.
+"""
+
+import os
+import random
+import time
+import zipfile
+
+# Number of pages of the multi-page documents, at scale 1
+PDF_PAGES = 16
+MERGED_PAGES = 32
+
+# Timestamp written into the generated documents
+FIXED_DATE = time.strptime("2024-01-01", "%Y-%m-%d")
+
+
+def make_corpus(directory: str, seed: int = 0, scale: float = 1.0) -> dict:
+    """
+    Writes the corpus into directory.
+
+    Args:
+        directory (str): An existing directory.
+        seed (int): The seed of the random generator.
+        scale (float): Multiplies the pixel counts, page counts, lines and rows of the corpus; 0.1 makes a quick
+            smoke-test corpus.
+
+    Returns:
+        dict: The corpus entries by name: a path, or a list of paths for 'pages', plus their page counts under
+            'pages_of/<name>'.
+    """
+    rng = random.Random(seed)
+
+    def pixels(width: int, height: int) -> tuple[int, int]:
+        factor = scale**0.5
+        return max(16, int(width * factor)), max(16, int(height * factor))
+
+    corpus = {}
+
+    def add(name: str, path):
+        corpus[name] = path
+        return path
+
+    photo = _photo(rng, pixels(6000, 4000))
+    photo.save(add("photo.jpg", os.path.join(directory, "photo.jpg")), quality=90)
+    logo = _photo(rng, pixels(1600, 1600), "RGBA")
+    logo.save(add("logo.png", os.path.join(directory, "logo.png")))
+    icon = _photo(rng, pixels(800, 600)).quantize(64)
+    icon.save(add("icon.gif", os.path.join(directory, "icon.gif")))
+    scan = _photo(rng, pixels(2480, 3508), "L")
+    scan.save(add("scan.tiff", os.path.join(directory, "scan.tiff")))
+
+    pdf_pages = max(1, int(PDF_PAGES * scale))
+    pages = [_photo(rng, pixels(1240, 1754)) for _ in range(pdf_pages)]
+    pages[0].save(
+        add("document.pdf", os.path.join(directory, "document.pdf")),
+        save_all=True,
+        append_images=pages[1:],
+        resolution=150,
+        # fixed dates: the file must not depend on when it was generated
+        creationDate=FIXED_DATE,
+        modDate=FIXED_DATE,
+    )
+    corpus["pages_of/document.pdf"] = pdf_pages
+
+    merged = []
+    page = _photo(rng, pixels(2480, 3508))
+    for i in range(max(1, int(MERGED_PAGES * scale))):
+        path = os.path.join(directory, f"page_{i:04d}.jpg")
+        page.save(path, quality=85)
+        merged.append(path)
+    add("pages", merged)
+    corpus["pages_of/pages"] = len(merged)
+
+    _docx(rng, add("report.docx", os.path.join(directory, "report.docx")), scale)
+    _text(rng, add("log.txt", os.path.join(directory, "log.txt")), scale)
+    _csv(rng, add("export.csv", os.path.join(directory, "export.csv")), scale)
+    return corpus
+
+
+def _photo(rng: random.Random, size: tuple[int, int], mode: str = "RGB"):
+    """
+    Returns a gradient overlaid with seeded noise: smooth areas and detail, like a photo or a scan.
+    """
+    from PIL import Image
+
+    width, height = size
+    gradient = Image.linear_gradient("L").resize(size)
+    bands = []
+    for band in range(len(mode)):
+        noise = Image.frombytes("L", size, rng.randbytes(width * height))
+        bands.append(Image.blend(gradient.rotate(90 * band), noise, 0.3))
+    return Image.merge(mode, bands) if len(mode) > 1 else bands[0]
+
+
+def _docx(rng: random.Random, path: str, scale: float):
+    """
+    Writes a minimal Word document of paragraphs of random words.
+    """
+    words = ["conversion", "page", "report", "quarter", "figure", "total", "the", "of"]
+    paragraphs = "".join(
+        "<w:p><w:r><w:t>"
+        + " ".join(rng.choice(words) for _ in range(rng.randint(20, 80)))
+        + "</w:t></w:r></w:p>"
+        for _ in range(max(1, int(400 * scale)))
+    )
+
+    def part(name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, FIXED_DATE[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    with zipfile.ZipFile(path, "w") as docx:
+        docx.writestr(
+            part("[Content_Types].xml"),
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" '
+            'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>",
+        )
+        docx.writestr(
+            part("_rels/.rels"),
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="word/document.xml"/>'
+            "</Relationships>",
+        )
+        docx.writestr(
+            part("word/document.xml"),
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{paragraphs}</w:body></w:document>",
+        )
+
+
+def _text(rng: random.Random, path: str, scale: float):
+    """
+    Writes a log file of about 20 MB at scale 1.
+    """
+    levels = ("INFO", "DEBUG", "WARNING", "ERROR")
+    with open(path, "w") as f:
+        for i in range(max(1, int(250_000 * scale))):
+            f.write(
+                f"2024-05-01 12:{i // 60 % 60:02d}:{i % 60:02d} {rng.choice(levels):<7} "
+                f"worker-{rng.randrange(16)} request {i} done in {rng.randrange(1000)} ms\n"
+            )
+
+
+def _csv(rng: random.Random, path: str, scale: float):
+    """
+    Writes a CSV export mixing integer, decimal, date, identifier and text columns.
+    """
+    with open(path, "w", newline="") as f:
+        f.write("id,customer,amount,date,zip,comment\n")
+        for i in range(max(1, int(100_000 * scale))):
+            f.write(
+                f"{i},C{rng.randrange(5000):05d},{rng.randrange(100000) / 100},"
+                f"2024-{rng.randrange(12) + 1:02d}-{rng.randrange(28) + 1:02d},"
+                f"0{rng.randrange(1000, 9999)},order {i} shipped\n"
+            )
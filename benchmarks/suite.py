@@ -0,0 +1,290 @@
+"""
+Times every conversion path on a reproducible synthetic corpus and checks the results against a stored baseline.
+
+    python -m benchmarks.suite [--scale 0.1] [--output results.json] [--baseline baseline.json] [--save-baseline]
+
+Each case runs in a freshly spawned process (see benchmarks.measure) and records its best wall time over --repeat
+runs, its peak RSS and its throughput. With --baseline, the exit status is 1 if any case got slower, or used more
+memory, than the baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from typing import NamedTuple
+
+from benchmarks import measure
+from benchmarks.corpus import make_corpus
+
+RESULTS_VERSION = 1
+
+# Default location of the baseline, written by --save-baseline
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+class Case(NamedTuple):
+    """
+    A benchmarked conversion: handler(corpus[source], <output>.<target>, **options).
+
+    Attributes:
+        name (str): The case name, stable across runs: results are compared by name.
+        handler (str): The conversion function, as 'module:function' (see converter_registry).
+        source (str): The corpus entry converted.
+        target (str): The output extension.
+        options (dict): Keyword options of the handler.
+        requires (str): An executable or module the case needs, checked before running it.
+    """
+
+    name: str
+    handler: str
+    source: str
+    target: str
+    options: dict = {}
+    requires: str = ""
+
+
+CASES = [
+    Case("image/jpg_to_png", "convert_to_image:from_image", "photo.jpg", "png"),
+    Case(
+        "image/jpg_to_png_preview",
+        "convert_to_image:from_image",
+        "photo.jpg",
+        "png",
+        {"max_size": (640, 640)},
+    ),
+    Case("image/png_rgba_to_jpg", "convert_to_image:from_image", "logo.png", "jpg"),
+    Case("image/png_rgba_to_gif", "convert_to_image:from_image", "logo.png", "gif"),
+    Case("image/gif_to_png", "convert_to_image:from_image", "icon.gif", "png"),
+    Case("image/tiff_to_jpg", "convert_to_image:from_image", "scan.tiff", "jpg"),
+    Case(
+        "image/pdf_to_png",
+        "converter_registry:_pdf_to_image",
+        "document.pdf",
+        "png",
+        requires="pdftoppm",
+    ),
+    Case(
+        "image/pdf_to_jpg_streaming",
+        "converter_registry:_pdf_to_image",
+        "document.pdf",
+        "jpg",
+        {"chunk_size": 4},
+        "pdftoppm",
+    ),
+    Case(
+        "image/pdf_to_jpg_parallel",
+        "converter_registry:_pdf_to_image",
+        "document.pdf",
+        "jpg",
+        {"workers": 0},
+        "pdftoppm",
+    ),
+    Case("pdf/jpg", "convert_to_pdf:from_image", "photo.jpg", "pdf"),
+    Case("pdf/png_rgba", "convert_to_pdf:from_image", "logo.png", "pdf"),
+    Case("pdf/merge_jpgs", "convert_to_pdf:from_images", "pages", "pdf"),
+    Case("pdf/docx", "convert_to_pdf:from_word", "report.docx", "pdf", {}, "spire.doc"),
+    Case("pdf/txt", "convert_to_pdf:from_text", "log.txt", "pdf"),
+    Case("xlsx/csv", "convert_to_xlsx:from_csv", "export.csv", "xlsx", {}, "openpyxl"),
+]
+
+
+def run_case(case: Case, corpus: dict, directory: str, repeat: int) -> dict:
+    """
+    Runs a case repeat times and returns its result: status ('ok', 'skipped' or 'failed'), best wall time, peak RSS
+    and throughput in MB/s of input, plus pages/s for multi-page inputs.
+    """
+    missing = _missing_requirement(case.requires)
+    if missing:
+        return {"status": "skipped", "reason": f"{missing} not available"}
+
+    source = corpus[case.source]
+    output_file = os.path.join(directory, f"output.{case.target}")
+    try:
+        runs = [
+            measure(_convert, case.handler, source, output_file, case.options)
+            for _ in range(repeat)
+        ]
+    except Exception as e:
+        return {"status": "failed", "reason": repr(e)}
+
+    seconds = min(elapsed for elapsed, _ in runs)
+    sources = source if isinstance(source, list) else [source]
+    input_mb = sum(os.path.getsize(path) for path in sources) / 2**20
+    result = {
+        "status": "ok",
+        "seconds": seconds,
+        "peak_rss_mib": max(peak for _, peak in runs),
+        "input_mb": input_mb,
+        "mb_per_s": input_mb / seconds,
+    }
+    pages = corpus.get(f"pages_of/{case.source}")
+    if pages:
+        result["pages_per_s"] = pages / seconds
+    return result
+
+
+def run_suite(
+    directory: str,
+    seed: int = 0,
+    scale: float = 1.0,
+    repeat: int = 3,
+    only: list[str] | None = None,
+) -> dict:
+    """
+    Generates the corpus in directory and runs the cases whose name starts with one of `only` (all by default).
+
+    Returns:
+        dict: The results document: environment, corpus parameters and the result of each case by name.
+    """
+    corpus = make_corpus(directory, seed, scale)
+    results = {}
+    for case in CASES:
+        if only and not any(case.name.startswith(prefix) for prefix in only):
+            continue
+        results[case.name] = run_case(case, corpus, directory, repeat)
+        _print_result(case.name, results[case.name])
+
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "scale": scale,
+        "cases": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    Compares results with a baseline produced with the same corpus parameters.
+
+    Args:
+        results (dict): A results document returned by run_suite.
+        baseline (dict): The baseline results document.
+        tolerance (float): The allowed relative increase of wall time and peak RSS.
+
+    Returns:
+        list[str]: One message per regression: a case slower, heavier or failing where the baseline succeeded. Cases
+            missing from either side are ignored.
+    """
+    if (results["seed"], results["scale"]) != (baseline["seed"], baseline["scale"]):
+        return [
+            f"baseline corpus (seed {baseline['seed']}, scale {baseline['scale']}) differs from this run's "
+            f"(seed {results['seed']}, scale {results['scale']})"
+        ]
+
+    regressions = []
+    for name, result in results["cases"].items():
+        reference = baseline["cases"].get(name)
+        if not reference or reference["status"] != "ok":
+            continue
+        if result["status"] == "failed":
+            regressions.append(f"{name}: failed ({result['reason']})")
+            continue
+        if result["status"] != "ok":
+            continue
+        for metric, label in (("seconds", "wall time"), ("peak_rss_mib", "peak RSS")):
+            if result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {label} {result[metric]:.2f} vs {reference[metric]:.2f} "
+                    f"(+{result[metric] / reference[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def _convert(handler: str, source, output_file: str, options: dict):
+    """
+    Runs a case in the measuring process. Raises if the conversion fails, so that the failure reaches run_case.
+    """
+    import importlib
+
+    module, function = handler.split(":")
+    convert = getattr(importlib.import_module(module), function)
+    if convert(source, output_file, **options) == -1:
+        raise RuntimeError(f"{handler} returned -1")
+
+
+def _missing_requirement(requirement: str) -> str:
+    import importlib.util
+    import shutil
+
+    if not requirement:
+        return ""
+    if shutil.which(requirement):
+        return ""
+    try:
+        if importlib.util.find_spec(requirement):
+            return ""
+    except ModuleNotFoundError:
+        pass
+    return requirement
+
+
+def _print_result(name: str, result: dict):
+    if result["status"] != "ok":
+        print(f"{name:<28} {result['status']}: {result['reason']}")
+        return
+    pages = f" {result['pages_per_s']:>8.1f} pages/s" if "pages_per_s" in result else ""
+    print(
+        f"{name:<28} {result['seconds']:>8.2f}s {result['peak_rss_mib']:>8.1f} MiB "
+        f"{result['mb_per_s']:>8.1f} MB/s{pages}"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="corpus size factor (default: 1)"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--only", nargs="+", metavar="PREFIX", help="run the cases with these prefixes"
+    )
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument(
+        "--baseline",
+        help=f"compare with this results file (default: {BASELINE} if it exists)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown or memory growth (default: 0.2)",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(tmp, args.seed, args.scale, args.repeat, args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    baseline_file = args.baseline or BASELINE
+    if args.save_baseline:
+        with open(baseline_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {baseline_file}")
+        return 0
+
+    if not os.path.exists(baseline_file):
+        return 0
+    with open(baseline_file) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+On-disk cache of conversion outputs, keyed by the content of the input file and the conversion parameters.
+
+Each entry is a directory `<cache>/<key[:2]>/<key>` holding the output files and a `manifest.json`. The output files are
+named after the suffix they carry after the output stem (e.g. `.pdf`, `_3.png`), so a hit can recreate them next to any
+input with the same content.
+"""
+
+import json
+import os
+import shutil
+
+# Part of every key: bump it when a converter starts producing different output for the same parameters.
+CACHE_VERSION = 1
+
+MANIFEST = "manifest.json"
+
+
+class ConversionCache:
+    """
+    Content-addressed conversion cache with size-based LRU eviction.
+
+    Args:
+        directory (str): The cache directory, created if needed.
+        max_bytes (int): The total size of cached outputs above which the least recently used entries are evicted.
+        link (bool): Hardlink outputs into and out of the cache instead of copying them, when the filesystem allows it.
+            Linked outputs share their data with the cache entry, so they must be replaced rather than rewritten in
+            place.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30, link: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        # total size of the entries, computed on first store
+        self._bytes = None
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, file_path: str, **params) -> str:
+        """
+        Returns the cache key of converting file_path with the given parameters (target format, DPI, quality...).
+        """
+        import hashlib
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(
+            json.dumps([CACHE_VERSION, params], sort_keys=True, default=str).encode()
+        )
+        return digest.hexdigest()
+
+    def fetch(self, key: str, output_stem: str) -> list[str] | None:
+        """
+        Recreates the outputs of a cached conversion as `<output_stem><suffix>` files.
+
+        Returns:
+            list[str] | None: The output paths on a hit, None on a miss.
+        """
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, MANIFEST)) as f:
+                manifest = json.load(f)
+            outputs = []
+            for suffix in manifest["suffixes"]:
+                output = output_stem + suffix
+                self._place(os.path.join(entry, _entry_name(suffix)), output)
+                outputs.append(output)
+            # the manifest modification time is the entry's last use
+            os.utime(os.path.join(entry, MANIFEST))
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return outputs
+
+    def store(self, key: str, outputs: list[str], output_stem: str, **params):
+        """
+        Adds the outputs of a conversion to the cache, then evicts entries if the cache is over its size budget.
+
+        Args:
+            key (str): The key returned by key().
+            outputs (list[str]): The output files, all named `<output_stem><suffix>`.
+            output_stem (str): The common prefix of the outputs.
+            **params: The conversion parameters, recorded so that invalidate() can find the entry.
+        """
+        import tempfile
+
+        entry = self._entry(key)
+        if os.path.exists(entry):
+            return
+
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(entry))
+        try:
+            suffixes = [output.removeprefix(output_stem) for output in outputs]
+            size = 0
+            for output, suffix in zip(outputs, suffixes):
+                self._place(output, os.path.join(staging, _entry_name(suffix)))
+                size += os.path.getsize(output)
+            with open(os.path.join(staging, MANIFEST), "w") as f:
+                json.dump({"suffixes": suffixes, "bytes": size, "params": params}, f)
+            # another process may have stored the same entry meanwhile: keep theirs
+            os.rename(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        if self._bytes is None:
+            self._bytes = sum(e[2] for e in self._entries())
+        else:
+            self._bytes += size
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, entry, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+        self._bytes = total
+
+    def invalidate(self, **params) -> int:
+        """
+        Removes the entries stored with all of the given parameter values, e.g. invalidate(output_type="png", dpi=200)
+        after changing how PNG pages are rendered at 200 DPI. Without parameters, removes every entry.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        removed = 0
+        for _, entry, _ in self._entries():
+            try:
+                with open(os.path.join(entry, MANIFEST)) as f:
+                    stored = json.load(f).get("params", {})
+            except (OSError, ValueError):
+                continue
+            if all(stored.get(name) == value for name, value in params.items()):
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        self._bytes = None
+        return removed
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        self.invalidate()
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counters of this instance with the number and total size of the entries.
+        """
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+        }
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _entries(self) -> list[tuple[float, str, int]]:
+        """
+        Lists the entries as (last use time, entry directory, size) tuples.
+        """
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                manifest = os.path.join(entry.path, MANIFEST)
+                try:
+                    with open(manifest) as f:
+                        size = json.load(f)["bytes"]
+                    entries.append((os.path.getmtime(manifest), entry.path, size))
+                except (OSError, ValueError, KeyError):
+                    # an entry being written or removed by another process
+                    continue
+        return entries
+
+    def _place(self, source: str, destination: str):
+        """
+        Hardlinks, or copies, source to destination, replacing destination if it exists.
+        """
+        if os.path.exists(destination):
+            os.remove(destination)
+        if self.link:
+            try:
+                os.link(source, destination)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, destination)
+
+
+def _entry_name(suffix: str) -> str:
+    """
+    Returns the name under which an output with the given suffix is stored in its entry.
+    """
+    return "output" + suffix
@@ -0,0 +1,579 @@
+"""
+Long-running conversion service over a local HTTP or Unix socket API.
+
+Starting Python and importing the imaging and document libraries costs more than converting a typical file. The
+service pays that once: its worker processes stay up with the backends imported, and jobs reach them through a
+bounded queue. When the queue is full, new jobs are refused with 503 so that clients back off instead of piling up
+work the service cannot keep up with.
+
+    python conversion_service.py --socket /run/converter.sock
+    python conversion_service.py --port 8765 --workers 4
+
+API (JSON bodies, one request per connection):
+
+    POST   /jobs              {"file": "/abs/in.docx", "target": "pdf", "output": "", "options": {"dpi": 100}}
+                              202 and the job, 400 on a bad request, 503 when the queue is full
+    GET    /jobs/<id>         the job: id, status (queued, running, done, failed, cancelled), progress and, once
+                              finished, its result (see result.ConversionResult)
+    GET    /jobs/<id>/events  the job as one JSON line at every change, until it finishes
+    DELETE /jobs/<id>         cancels a queued job; 409 once it runs
+    GET    /health            queue length, running jobs and worker count
+
+Paths are read and written by the service itself: only expose it to the users who may access those files (a Unix
+socket in a directory they own, or the loopback interface).
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+
+# Jobs waiting for a worker beyond which submissions are refused
+DEFAULT_QUEUE_SIZE = 64
+
+# Finished jobs kept for status requests; the oldest are forgotten first
+FINISHED_JOBS_KEPT = 1000
+
+# Largest request head and body accepted
+MAX_HEADER_BYTES = 1 << 16
+MAX_BODY_BYTES = 1 << 20
+
+FINISHED = ("done", "failed", "cancelled")
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class Job:
+    """
+    A conversion submitted to the service.
+
+    Attributes:
+        id (str): The job identifier.
+        file (str): The input file.
+        target (str): The target format.
+        output (str): The output file, empty for the default name next to the input.
+        options (dict): The handler options.
+        status (str): 'queued', 'running', 'done', 'failed' or 'cancelled'.
+        progress (tuple[int, int]): The last (done, total) reported by the converter.
+        result (dict | None): The ConversionResult fields, once finished.
+    """
+
+    def __init__(self, id: str, file: str, target: str, output: str, options: dict):
+        self.id = id
+        self.file = file
+        self.target = target
+        self.output = output
+        self.options = options
+        self.status = "queued"
+        self.progress = (0, 0)
+        self.result = None
+        # replaced by a new event at every change, see ConversionService._update
+        self.changed = asyncio.Event()
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "file": self.file,
+            "target": self.target,
+            "output": self.output,
+            "status": self.status,
+            "progress": list(self.progress),
+            "result": self.result,
+        }
+
+
+class ConversionService:
+    """
+    Runs conversions on a pool of warm worker processes, fed by a bounded queue.
+
+    Args:
+        workers (int): The number of worker processes, i.e. of conversions running at once.
+        queue_size (int): The number of jobs that may wait for a worker.
+        warm_word (bool): Load the Word engine in every worker at start-up (see word_pool), so the first Word job does
+            not pay for it.
+        mp_context: The multiprocessing context of the workers. Defaults to 'spawn', like WordConverterPool.
+
+    Example:
+        service = ConversionService(workers=4)
+        await service.start(path="/run/converter.sock")
+        await service.serve_forever()
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        warm_word: bool = False,
+        mp_context=None,
+    ):
+        import multiprocessing
+
+        self.workers = workers
+        self.queue_size = queue_size
+        self.warm_word = warm_word
+        self.mp_context = mp_context or multiprocessing.get_context("spawn")
+        self.jobs = OrderedDict()
+        self.running = 0
+        self._queue = None
+        self._executor = None
+        self._progress = None
+        self._progress_thread = None
+        self._dispatchers = []
+        self._server = None
+        self._loop = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str = ""):
+        """
+        Starts the workers and listens on the Unix socket path, or on host:port when path is empty.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.queue_size)
+        # progress reports of the workers, forwarded to the event loop by a thread
+        self._progress = self.mp_context.Queue()
+        self._progress_thread = threading.Thread(
+            target=self._forward_progress, daemon=True
+        )
+        self._progress_thread.start()
+        self._executor = self._start_workers()
+        # start every worker now rather than on the first jobs
+        await asyncio.gather(
+            *(
+                self._loop.run_in_executor(self._executor, _ping)
+                for _ in range(self.workers)
+            )
+        )
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        ]
+
+        if path:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+
+    def _start_workers(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(self._progress, self.warm_word),
+        )
+
+    @property
+    def address(self):
+        """
+        The listening address: a socket path or a (host, port) tuple.
+        """
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening, cancels the queued jobs and waits for the running ones.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        while not self._queue.empty():
+            self._update(self._queue.get_nowait(), status="cancelled")
+        await self._loop.run_in_executor(None, self._executor.shutdown)
+        self._progress.put(None)
+        self._progress_thread.join()
+
+    def submit(self, file: str, target: str, output: str = "", options=None) -> Job:
+        """
+        Queues a conversion.
+
+        Raises:
+            asyncio.QueueFull: If queue_size jobs are already waiting.
+        """
+        import uuid
+
+        job = Job(uuid.uuid4().hex, file, target, output, dict(options or {}))
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self._forget_finished()
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        """
+        Cancels a queued job. Returns False if it already runs or finished.
+        """
+        if job.status != "queued":
+            return False
+        # the dispatchers skip cancelled jobs when they reach them
+        self._update(job, status="cancelled")
+        return True
+
+    def health(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+        }
+
+    async def _dispatch(self):
+        from concurrent.futures.process import BrokenProcessPool
+
+        while True:
+            job = await self._queue.get()
+            if job.status == "cancelled":
+                continue
+            self.running += 1
+            self._update(job, status="running")
+            executor = self._executor
+            try:
+                result, progress = await self._loop.run_in_executor(
+                    executor,
+                    _run_job,
+                    job.id,
+                    job.file,
+                    job.target,
+                    job.output,
+                    job.options,
+                )
+                fields = result._asdict()
+                if progress is not None:
+                    # reports travel apart from the result and may arrive after it
+                    job.progress = progress
+            except Exception as e:
+                # a worker died (e.g. killed by the OOM killer) and took its pool down: the jobs it held fail, the
+                # next ones run on a new pool
+                if isinstance(e, BrokenProcessPool) and self._executor is executor:
+                    executor.shutdown(wait=False)
+                    self._executor = self._start_workers()
+                fields = {"outputs": [], "error": "failed", "message": repr(e)}
+            finally:
+                self.running -= 1
+            self._update(
+                job,
+                status="done" if fields["error"] is None else "failed",
+                result=fields,
+            )
+
+    def _update(self, job: Job, **changes):
+        for name, value in changes.items():
+            setattr(job, name, value)
+        changed, job.changed = job.changed, asyncio.Event()
+        changed.set()
+
+    def _forget_finished(self):
+        finished = [
+            job_id for job_id, job in self.jobs.items() if job.status in FINISHED
+        ]
+        for job_id in finished[: max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self.jobs[job_id]
+
+    def _forward_progress(self):
+        while True:
+            report = self._progress.get()
+            if report is None:
+                break
+            self._loop.call_soon_threadsafe(self._on_progress, *report)
+
+    def _on_progress(self, job_id: str, done: int, total: int):
+        job = self.jobs.get(job_id)
+        if job and job.status == "running":
+            self._update(job, progress=(done, total))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            method, path, body = request
+            if isinstance(method, int):
+                await _respond(writer, method, {"error": path})
+                return
+            await self._route(writer, method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, writer, method: str, path: str, body: bytes):
+        import converter_registry
+
+        parts = path.split("?", 1)[0].strip("/").split("/")
+
+        if parts == ["health"] and method == "GET":
+            await _respond(writer, 200, self.health())
+            return
+
+        if parts == ["jobs"] and method == "POST":
+            try:
+                request = json.loads(body or b"{}")
+                file, target = request["file"], request["target"]
+                output = request.get("output", "")
+                options = request.get("options", {})
+                if not isinstance(options, dict) or "progress" in options:
+                    raise ValueError("options must be an object of handler options")
+            except (ValueError, KeyError, TypeError) as e:
+                await _respond(writer, 400, {"error": f"bad job: {e!r}"})
+                return
+            if target not in converter_registry.targets():
+                await _respond(writer, 400, {"error": f"unknown target {target}"})
+                return
+            try:
+                job = self.submit(file, target, output, options)
+            except asyncio.QueueFull:
+                await _respond(
+                    writer, 503, {"error": "queue full"}, {"Retry-After": "1"}
+                )
+                return
+            await _respond(writer, 202, job.as_dict())
+            return
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await _respond(writer, 404, {"error": "unknown job"})
+            elif len(parts) == 3 and parts[2] == "events" and method == "GET":
+                await self._stream(writer, job)
+            elif len(parts) == 2 and method == "GET":
+                await _respond(writer, 200, job.as_dict())
+            elif len(parts) == 2 and method == "DELETE":
+                if self.cancel(job):
+                    await _respond(writer, 200, job.as_dict())
+                else:
+                    await _respond(writer, 409, job.as_dict())
+            else:
+                await _respond(writer, 405, {"error": "method not allowed"})
+            return
+
+        await _respond(writer, 404, {"error": "not found"})
+
+    async def _stream(self, writer: asyncio.StreamWriter, job: Job):
+        """
+        Writes the job as a JSON line now and after every change, one line per HTTP chunk, until it finishes.
+        """
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+        )
+        while True:
+            # taken before writing: a change made while the line is sent sets it
+            changed = job.changed
+            line = json.dumps(job.as_dict()).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+            if job.status in FINISHED:
+                break
+            await changed.wait()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """
+    Reads an HTTP request. Returns (method, path, body), (status, error) for a malformed request, or None if the
+    client closed the connection.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        return 413, "request head too large"
+    if len(head) > MAX_HEADER_BYTES:
+        return 413, "request head too large"
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        return 400, "malformed request line"
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        return 400, "malformed Content-Length"
+    if length > MAX_BODY_BYTES:
+        return 413, "request body too large"
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body
+
+
+async def _respond(
+    writer: asyncio.StreamWriter, status: int, body: dict, headers: dict | None = None
+):
+    payload = json.dumps(body).encode()
+    head = [
+        f"HTTP/1.1 {status} {_REASONS[status]}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(payload)}",
+        "Connection: close",
+    ]
+    head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+    await writer.drain()
+
+
+async def request(address, method: str, path: str, body: dict | None = None):
+    """
+    Sends a request to a conversion service: a small client for scripts and tests.
+
+    Args:
+        address (str | tuple[str, int]): The service address: a Unix socket path or a (host, port) tuple.
+        method (str): The HTTP method.
+        path (str): The request path, e.g. '/jobs'.
+        body (dict | None): The JSON body.
+
+    Returns:
+        tuple[int, list[dict]]: The status code and the JSON documents of the response: one, or one per line for an
+            events stream.
+    """
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address[:2])
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    try:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(head[0].split()[1])
+        headers = {}
+        for line in head[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding") == "chunked":
+            documents = []
+            while size := int(await reader.readuntil(b"\r\n"), 16):
+                documents.append(json.loads(await reader.readexactly(size)))
+                await reader.readexactly(2)
+        else:
+            length = int(headers.get("content-length", 0))
+            documents = [json.loads(await reader.readexactly(length))]
+    finally:
+        writer.close()
+    return status, documents
+
+
+# Progress queue of the current worker process
+_progress_queue = None
+
+
+def _init_worker(progress_queue, warm_word: bool):
+    """
+    Worker start-up: imports the converters and their backends before the first job.
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+
+    import converter_registry  # noqa: F401
+    import convert_to_image  # noqa: F401
+    import convert_to_pdf  # noqa: F401
+
+    try:
+        from PIL import Image
+
+        Image.init()
+        import pdf2image  # noqa: F401
+    except ImportError:
+        pass
+
+    if warm_word:
+        from word_pool import warm_up
+
+        try:
+            warm_up()
+        except ImportError:
+            pass
+
+
+def _ping():
+    pass
+
+
+def _run_job(job_id: str, file: str, target: str, output: str, options: dict):
+    """
+    Runs a job in a worker process. Returns its ConversionResult and the last (done, total) progress reported, if any.
+    """
+    import converter_registry
+
+    last = None
+
+    def progress(done: int, total: int):
+        nonlocal last
+        last = (done, total)
+        _progress_queue.put((job_id, done, total))
+
+    result = converter_registry.convert_file(
+        file, target, output, progress=progress, **options
+    )
+    return result, last
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+    import os
+    import signal
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", help="listen on this Unix socket path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"jobs waiting for a worker before new ones are refused (default: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--warm-word",
+        action="store_true",
+        help="load the Word engine in every worker at start-up",
+    )
+    args = parser.parse_args(argv)
+
+    async def run():
+        service = ConversionService(args.workers, args.queue_size, args.warm_word)
+        await service.start(args.host, args.port, args.socket or "")
+        print(f"Listening on {service.address}")
+
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        await stop.wait()
+        await service.close()
+        if args.socket:
+            os.remove(args.socket)
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Headless command-line front end for the converters.
+
+    python convert_cli.py --to pdf scan1.jpg scan2.png report.docx
+    python convert_cli.py --to png --jobs 8 "contracts/*.pdf"
+    python convert_cli.py --to pdf --merge book.pdf "pages/*.jpg"
+    python convert_cli.py --to png --profile smallest "scans/*.jpg"
+
+Only the standard library is imported at start-up: the conversion backends (PIL, pdf2image, spire.doc) are imported
+by the conversion functions themselves, on first use, so converting images never loads spire.doc and nothing here
+loads tkinter or ttkthemes.
+"""
+
+import argparse
+import sys
+
+# Start-up budget, in seconds, for `python convert_cli.py --help`. Checked by test_convert_cli.py.
+STARTUP_BUDGET_SECONDS = 0.5
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    import converter_registry
+    from encoding_profiles import PROFILES
+
+    parser = argparse.ArgumentParser(
+        prog="convert_cli.py",
+        description="Convert files without the GUI.",
+    )
+    parser.add_argument(
+        "files", nargs="+", help="files, directories or glob patterns to convert"
+    )
+    parser.add_argument(
+        "-t",
+        "--to",
+        required=True,
+        dest="output_type",
+        choices=converter_registry.targets(),
+        help="target format",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1, convert in this process; 0: one per CPU)",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="walk directories recursively"
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="convert even when the outputs are up to date",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="reuse the outputs of inputs with the same content from the conversion cache in DIR",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        choices=PROFILES,
+        help="encoding profile of the outputs (default: the encoders' defaults)",
+    )
+    parser.add_argument(
+        "-m",
+        "--merge",
+        metavar="OUTPUT",
+        help="assemble all the images into the single PDF file OUTPUT, in argument order",
+    )
+    args = parser.parse_args(argv)
+    if args.merge and args.output_type != "pdf":
+        parser.error("--merge requires --to pdf")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Runs the command line.
+
+    Returns:
+        int: The process exit status: 0 if every file was converted or skipped, 1 if any file was rejected or failed.
+    """
+    args = parse_args(argv)
+
+    if args.merge:
+        return merge(args.files, args.merge, args.recursive, args.profile)
+
+    from batch_convert import convert_batch
+
+    status = 0
+    for result in convert_batch(
+        args.files,
+        args.output_type,
+        workers=args.jobs or None,
+        recursive=args.recursive,
+        force=args.force,
+        cache_dir=args.cache,
+        profile=args.profile,
+    ):
+        if result.status in ("rejected", "failed"):
+            status = 1
+            print(f"{result.file_path}: {result.error}", file=sys.stderr)
+        else:
+            print(
+                f"{result.file_path}: {result.status} in {result.seconds:.2f}s -> "
+                + ", ".join(result.outputs)
+            )
+
+    return status
+
+
+def merge(
+    sources: list[str],
+    output_file: str,
+    recursive: bool = False,
+    profile: str | None = None,
+) -> int:
+    """
+    Assembles the images matched by sources into the PDF file output_file. Sources keep their argument order; the
+    files of a directory or glob pattern are taken in name order.
+
+    Returns:
+        int: The process exit status: 0 on success, 1 on failure.
+    """
+    from batch_convert import collect_files
+    from convert_to_pdf import from_images
+
+    image_files = [
+        path for source in sources for path in collect_files(source, recursive)
+    ]
+    if from_images(image_files, output_file, profile=profile) == -1:
+        return 1
+
+    print(f"{len(image_files)} images -> {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Audio extraction with a local ffmpeg.
+
+ffmpeg runs as a subprocess that writes the output file itself; this process only reads its `-progress` reports, so
+conversions never hold audio data in Python memory.
+"""
+
+import os
+import threading
+from typing import Callable
+
+from atomic_output import discard, partial_path
+from detect_format import detect_format, is_type
+from result import ErrorCategory, produced, report_error
+
+# Audio codecs, by output format, that are copied into the output instead of being re-encoded
+COPY_CODECS = {"mp3": ("mp3",)}
+
+# ffmpeg encoders, by output format
+ENCODERS = {"mp3": "libmp3lame"}
+
+# Bitrate of re-encoded audio, in ffmpeg notation
+DEFAULT_BITRATE = "192k"
+
+# ffmpeg processes allowed to run at once in this process. An encoder keeps about one core busy.
+MAX_CONCURRENT_ENCODES = os.cpu_count() or 1
+
+_encode_slots = threading.BoundedSemaphore(MAX_CONCURRENT_ENCODES)
+
+
+def set_concurrency_limit(limit: int):
+    """
+    Sets the number of ffmpeg processes allowed to run at once in this process, e.g. for a batch converting many
+    videos on a thread pool. Conversions already running are not affected.
+    """
+    global _encode_slots
+    _encode_slots = threading.BoundedSemaphore(max(1, limit))
+
+
+def convert_to_audio(
+    file_type: str, output_type: str, file_path: str, output_file: str
+) -> int:
+    """
+    Extracts the audio track of a video file.
+
+    Args:
+        file_type (str): The type of the file to convert. The only supported type is 'mp4'.
+        output_type (str): The audio format. The only supported format is 'mp3'.
+        file_path (str): The path to the input file that needs to be converted.
+        output_file (str): The desired path for the output audio file. If not provided, the output file will have the
+            same name as the input file with the output_type extension.
+
+    Returns:
+        int: Returns 0 on successful conversion, -1 if the file does not exist or if the file type is unsupported.
+    """
+    if not os.path.exists(file_path):
+        return report_error(ErrorCategory.NOT_FOUND, f"{file_path} not found")
+
+    file_name = os.path.basename(file_path)
+    if not output_file:
+        output_file = os.path.splitext(file_name)[0] + "." + output_type
+    if not output_file.endswith("." + output_type):
+        output_file = output_file + "." + output_type
+    output_file = os.path.join(os.path.dirname(file_path), output_file)
+
+    if not is_type(detect_format(file_path, fallback_to_extension=True), file_type):
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_name} is not a {file_type} file"
+        )
+
+    if file_type == "mp4":
+        return from_video(file_path, output_file)
+    return report_error(
+        ErrorCategory.UNSUPPORTED, f"{file_name} cannot be converted to audio"
+    )
+
+
+def from_video(
+    video_file: str,
+    output_file: str,
+    bitrate: str | None = None,
+    progress: Callable[[int, int], bool | None] | None = None,
+) -> int:
+    """
+    Extracts the first audio track of a video file with ffmpeg.
+
+    When the track is already in the output format (e.g. MP3 audio in an MP4 file) and no bitrate is requested, the
+    stream is copied without re-encoding, which takes about as long as reading the file.
+
+    Args:
+        video_file (str): The path to the input video file. Must be an MP4 file.
+        output_file (str): The path to the output audio file. Its extension sets the format (see ENCODERS).
+        bitrate (str | None): The bitrate of the encoded audio, e.g. '128k'. Forces re-encoding. Defaults to
+            DEFAULT_BITRATE when the track cannot be copied.
+        progress (Callable[[int, int], bool | None] | None): Called with (microseconds of audio written, duration in
+            microseconds) as ffmpeg reports progress. The duration is 0 when the container does not tell it.
+            Returning False stops ffmpeg and cancels the conversion.
+
+    Returns:
+        int: Returns 0 if the conversion is successful, -1 if the input is not an MP4 file or has no audio track, if
+            ffmpeg is not installed or fails, or if the conversion is cancelled. No output file is left behind on
+            failure.
+    """
+    import shutil
+
+    if detect_format(video_file, fallback_to_extension=True) != "mp4":
+        return report_error(ErrorCategory.UNSUPPORTED, "Video file must be an mp4 file")
+
+    output_format = output_file.rsplit(".", 1)[-1].lower()
+    if output_format not in ENCODERS:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"Audio file must be one of the following types: {tuple(ENCODERS)}",
+        )
+
+    ffmpeg, ffprobe = shutil.which("ffmpeg"), shutil.which("ffprobe")
+    if not ffmpeg or not ffprobe:
+        return report_error(ErrorCategory.UNSUPPORTED, "ffmpeg is not installed")
+
+    probe = _probe(ffprobe, video_file)
+    if probe is None:
+        return -1
+    codec, duration = probe
+
+    if bitrate is None and codec in COPY_CODECS[output_format]:
+        codec_args = ["-c:a", "copy"]
+    else:
+        codec_args = [
+            "-c:a",
+            ENCODERS[output_format],
+            "-b:a",
+            bitrate or DEFAULT_BITRATE,
+        ]
+    args = [
+        ffmpeg,
+        "-nostdin",
+        "-y",
+        "-v",
+        "error",
+        "-i",
+        video_file,
+        "-map",
+        "0:a:0",
+        "-vn",
+        *codec_args,
+        "-progress",
+        "pipe:1",
+        "-nostats",
+        partial_path(output_file),
+    ]
+
+    with _encode_slots:
+        res = _run_ffmpeg(args, duration, progress)
+
+    if res == -1:
+        discard(partial_path(output_file))
+        return -1
+    os.replace(partial_path(output_file), output_file)
+    produced(output_file)
+    return 0
+
+
+def _probe(ffprobe: str, video_file: str) -> tuple[str, int] | None:
+    """
+    Returns the codec name of the first audio track and the duration of a media file, in microseconds (0 if
+    unknown), or None if the file cannot be read or has no audio track.
+    """
+    import json
+    import subprocess
+
+    result = subprocess.run(
+        [
+            ffprobe,
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name:format=duration",
+            "-of",
+            "json",
+            video_file,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        report_error(
+            ErrorCategory.DECODE_FAILURE, f"{video_file}: {result.stderr.strip()}"
+        )
+        return None
+
+    info = json.loads(result.stdout or "{}")
+    streams = info.get("streams") or []
+    if not streams:
+        report_error(ErrorCategory.UNSUPPORTED, f"{video_file} has no audio track")
+        return None
+
+    try:
+        duration = int(float(info.get("format", {}).get("duration", 0)) * 1_000_000)
+    except ValueError:
+        duration = 0
+    return streams[0].get("codec_name", ""), duration
+
+
+def _run_ffmpeg(
+    args: list[str],
+    duration: int,
+    progress: Callable[[int, int], bool | None] | None = None,
+) -> int:
+    """
+    Runs ffmpeg with `-progress pipe:1`, reading its key=value progress blocks as they are written.
+    """
+    import subprocess
+    import tempfile
+
+    # stderr goes to a file: a full pipe nobody reads would block ffmpeg
+    with tempfile.TemporaryFile(mode="w+") as errors:
+        process = subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=errors, text=True
+        )
+        with process:
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                # out_time_us is the position in the output, in microseconds ('N/A' until the first packet)
+                if key != "out_time_us" or not value.isdigit():
+                    continue
+                if progress and progress(int(value), duration) is False:
+                    process.terminate()
+                    process.wait()
+                    return report_error(ErrorCategory.CANCELLED, "Conversion cancelled")
+
+        if process.returncode != 0:
+            errors.seek(0)
+            return report_error(
+                ErrorCategory.FAILED, f"ffmpeg failed: {errors.read().strip()}"
+            )
+
+    if progress:
+        progress(duration, duration)
+    return 0
@@ -1,14 +1,33 @@
+from typing import Callable
+
+from atomic_output import PageManifest, atomic_output
+from detect_format import (
+    IMAGE_FORMATS,
+    MULTI_FRAME_FORMATS,
+    detect_format,
+    is_type,
+    normalize,
+)
+from encoding_profiles import encoder_options
+from result import ErrorCategory, produced, report_error
+
+
 def convert_to_image(
-    file_type: str, output_type: str, file_path: str, output_file: str
+    file_type: str, output_type: str, file_path: str, output_file: str, **options
 ) -> int:
     """
     Converts a file to an image of the specified output type.
 
     Args:
-        file_type (str): The type of the input file (e.g., 'png', 'jpg', 'jpeg', 'gif', 'pdf').
+        file_type (str): The type of the input file (e.g., 'png', 'jpg', 'jpeg', 'gif', 'pdf'). The conversion is chosen from
+            the detected content of the file, which must be of this type.
         output_type (str): The desired output image type (e.g., 'png', 'jpg', 'jpeg', 'gif').
         file_path (str): The path to the input file.
         output_file (str): The path to the output file. If not provided, it will be generated based on the input file name and output type.
+        **options: Keyword options of the conversion. The conversion function is the handler converter_registry
+            registers for the detected format, and receives the options it declares there: max_size and profile for
+            images; chunk_size, workers, progress, dpi and profile for PDF files, whose pages are named after
+            output_file. Other options are ignored.
 
     Returns:
         int: Returns 0 on success, -1 on failure (e.g., if the file does not exist or the conversion type is invalid).
@@ -19,9 +38,10 @@ def convert_to_image(
     """
     import os
 
+    import converter_registry
+
     if not os.path.exists(file_path):
-        print(f"{file_path} not found")
-        return -1
+        return report_error(ErrorCategory.NOT_FOUND, f"{file_path} not found")
 
     file_name = (
         file_path.split("/")[-1] if "/" in file_path else file_path.split("\\")[-1]
@@ -37,83 +57,505 @@ def convert_to_image(
 
     output_file = output_path + output_file
 
-    match file_type:
-        case "png" | "jpg" | "jpeg" | "gif":
-            if file_extension == output_type:
-                print("The converted type must be different from the original type")
-                return -1
-            return from_image(file_path, output_file)
-        case "pdf":
-            return from_pdf(
-                file_path, output_path, file_name.removesuffix(".pdf"), output_type
-            )
+    file_format = detect_format(file_path, fallback_to_extension=True)
+    if not is_type(file_format, file_type):
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_name} is not a {file_type} file"
+        )
+
+    if file_format == normalize(output_type):
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            "The converted type must be different from the original type",
+        )
+    converter = converter_registry.find(file_format, output_type)
+    if converter is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_name} cannot be converted to an image"
+        )
+    return converter_registry.call(converter, file_path, output_file, **options)
 
-    return -1
 
+# pdf2image's default rendering resolution
+DEFAULT_DPI = 200
 
-def from_image(image_file: str, output_file: str) -> int:
+
+def from_image(
+    image_file: str,
+    output_file: str,
+    max_size: tuple[int, int] | None = None,
+    profile: str | None = None,
+) -> int:
     """
     Converts an image file to a different format and saves it to the specified output file.
 
     Args:
-        image_file (str): The path to the input image file. Must be one of the following types: png, jpg, jpeg, gif.
-        output_file (str): The path to the output file where the converted image will be saved.
+        image_file (str): The path to the input image file. Its content must be one of the following types: png, jpg,
+            gif, tiff, bmp, webp.
+        output_file (str): The path to the output file where the converted image will be saved. Its extension sets the
+            format; the image is converted only to a mode that format cannot store (see image_modes.prepare_image), so
+            palette and transparent images keep their palette and alpha in PNG and GIF outputs.
+        max_size (tuple[int, int] | None): The (width, height) box the output must fit in, keeping the aspect ratio.
+            Images are never enlarged. JPEG sources are decoded directly at 1/2, 1/4 or 1/8 scale when that is still
+            larger than the box, so a preview of a large photo never holds the full-resolution pixels.
+        profile (str | None): An encoding profile (see encoding_profiles) setting the encoder options of the output
+            format, e.g. the PNG zlib level or the JPEG quality. None keeps the encoder's defaults.
+
+    Animated GIF and WebP images and multi-page TIFF images are saved frame by frame, each frame to its own
+    `<name>_<frame>.<ext>` file. Frames are decoded one at a time, so memory does not grow with the frame count.
 
     Returns:
-        int: Returns 0 if the conversion is successful, -1 if the input file is not an image or if the file is not found.
+        int: Returns 0 if the conversion is successful, -1 if the input file is not an image, if the file is not found
+            or if the profile is unknown.
 
     Raises:
         FileNotFoundError: If the input image file does not exist.
     """
     from PIL import Image
 
-    image_extensions = ["png", "jpg", "jpeg", "gif"]
+    from image_modes import prepare_image
+    from metrics import span
 
-    if image_file.split(".")[-1] not in image_extensions:
-        print("Image file must be one of the following types: ", image_extensions)
-        return -1
+    file_format = detect_format(image_file, fallback_to_extension=True)
+    if file_format not in IMAGE_FORMATS:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"Image file must be one of the following types: {IMAGE_FORMATS}",
+        )
+    output_format = normalize(output_file.rsplit(".", 1)[-1])
+    save_options = encoder_options(profile, output_format)
+    if save_options is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"Unknown encoding profile: {profile}"
+        )
 
     try:
-        with Image.open(image_file) as im:
-            image = im.convert("RGB")
-            image.save(output_file)
+        with span("open", "image.from_image", image_file):
+            opened = Image.open(image_file)
+        with opened as im:
+            if file_format in MULTI_FRAME_FORMATS and getattr(im, "n_frames", 1) > 1:
+                return _save_frames(im, output_file, max_size, save_options)
+            with span("decode", "image.from_image") as s:
+                if max_size:
+                    # JPEG draft mode: the decoder scales the DCT blocks down, before any pixel is produced
+                    im.draft("RGB", max_size)
+                im.load()
+                s.add(pages=1)
+            with span("convert", "image.from_image"):
+                if max_size:
+                    im.thumbnail(max_size)
+                image = prepare_image(im, output_format)
+            with (
+                span("encode", "image.from_image", output_file),
+                atomic_output(output_file) as partial,
+            ):
+                image.save(partial, **save_options)
     except FileNotFoundError:
-        print("Image file not found")
-        return -1
+        return report_error(ErrorCategory.NOT_FOUND, "Image file not found")
+
+    produced(output_file, 1)
+    return 0
 
+
+def _save_frames(
+    im, output_file: str, max_size: tuple[int, int] | None, save_options: dict
+) -> int:
+    """
+    Saves each frame of a multi-frame image to `<name>_<frame>.<ext>` with the given encoder options, decoding the next
+    frame only once the previous one is saved.
+
+    Returns:
+        int: Returns 0 once every frame is saved.
+    """
+    import os
+
+    from PIL import ImageSequence
+
+    from image_modes import prepare_image
+    from metrics import span
+
+    stem, extension = os.path.splitext(output_file)
+    output_format = normalize(extension[1:])
+    for i, frame in enumerate(ImageSequence.Iterator(im), start=1):
+        frame_file = f"{stem}_{i}{extension}"
+        with span("decode", "image.from_image") as s:
+            frame.load()
+            s.add(pages=1)
+        with span("convert", "image.from_image"):
+            if max_size:
+                # thumbnail() works in place, and the next frame may be drawn over this one
+                frame = frame.copy()
+                frame.thumbnail(max_size)
+            image = prepare_image(frame, output_format)
+        with (
+            span("encode", "image.from_image", frame_file),
+            atomic_output(frame_file) as partial,
+        ):
+            image.save(partial, **save_options)
+        produced(frame_file, 1)
     return 0
 
 
 def from_pdf(
-    pdf_file: str, output_path: str, file_name_without_ext: str, output_type: str
+    pdf_file: str,
+    output_path: str,
+    file_name_without_ext: str,
+    output_type: str,
+    chunk_size: int = 0,
+    workers: int = 1,
+    progress: Callable[[int, int], bool | None] | None = None,
+    dpi: int = DEFAULT_DPI,
+    profile: str | None = None,
 ) -> int:
     """
     Converts a PDF file to images and saves them to the specified output path.
 
+    Each page is written to a partial file renamed onto its output once complete (see atomic_output), and recorded in
+    a manifest next to the outputs until every page is written. A conversion that finds the manifest of an interrupted
+    one (killed, cancelled or failed) with the same input, DPI and profile only renders the pages whose files are missing or
+    changed since.
+
     Args:
         pdf_file (str): The path to the PDF file to be converted.
         output_path (str): The directory where the output images will be saved.
         file_name_without_ext (str): The base name for the output image files, without extension.
         output_type (str): The image file format (e.g., 'png', 'jpg').
+        chunk_size (int): The number of pages rendered at a time. With 0 (the default) every page is rendered in a single
+            poppler call; with a positive value pages are rendered, saved and released in windows of that many pages, so
+            memory stays bounded by the chunk size instead of the document length.
+        workers (int): The number of processes rendering pages in parallel. With 1 (the default) pages are rendered in
+            the current process; with 0 the count is picked from the page count and the available cores.
+        progress (Callable[[int, int], bool | None] | None): Called with (pages done, page count) as pages are saved
+            (as whole worker ranges complete when workers > 1). Returning False cancels the conversion.
+        dpi (int): The rendering resolution. Memory and time grow with its square: 72 renders pages at their
+            nominal size, enough for previews.
+        profile (str | None): An encoding profile (see encoding_profiles) setting the encoder options of the pages.
+            None keeps the encoder's defaults.
 
     Returns:
-        int: Returns 0 if the conversion is successful, -1 if no images are created or if a FileNotFoundError occurs.
+        int: Returns 0 if the conversion is successful, -1 if no images are created, if a FileNotFoundError occurs,
+            if the profile is unknown or if the conversion is cancelled.
     """
+    import os
+
+    save_options = encoder_options(profile, normalize(output_type))
+    if save_options is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"Unknown encoding profile: {profile}"
+        )
+
+    manifest_file = _manifest_file(output_path, file_name_without_ext, output_type)
+    if chunk_size > 0 or workers != 1 or os.path.exists(manifest_file):
+        from pdf2image import pdfinfo_from_path
+
+        page_count = pdfinfo_from_path(pdf_file)["Pages"]
+        if page_count < 1:
+            return report_error(ErrorCategory.DECODE_FAILURE, "No images created")
+
+        manifest = PageManifest(manifest_file, pdf_file, dpi=dpi, profile=profile)
+        done = manifest.resume(
+            {
+                page: _page_file(
+                    output_path, file_name_without_ext, output_type, page, page_count
+                )
+                for page in range(1, page_count + 1)
+            }
+        )
+
+        workers = _worker_count(workers, page_count - len(done))
+        if workers > 1:
+            res = _render_pages_parallel(
+                pdf_file,
+                page_count,
+                output_path,
+                file_name_without_ext,
+                output_type,
+                chunk_size,
+                workers,
+                progress,
+                dpi,
+                manifest,
+                done,
+                profile,
+            )
+        else:
+            res = _render_pages(
+                pdf_file,
+                1,
+                page_count,
+                page_count,
+                output_path,
+                file_name_without_ext,
+                output_type,
+                chunk_size or page_count,
+                progress,
+                dpi,
+                manifest,
+                done,
+                profile,
+            )
+        if res == 0:
+            manifest.remove()
+        return res
+
     from pdf2image import convert_from_path
 
-    images = convert_from_path(pdf_file)
+    from metrics import span
+
+    with span("render", "image.from_pdf", pdf_file) as s:
+        images = convert_from_path(pdf_file, dpi=dpi)
+        s.add(pages=len(images))
     if not images:
-        print("No images created")
-        return -1
+        return report_error(ErrorCategory.DECODE_FAILURE, "No images created")
 
     try:
-        if len(images) == 1:
-            images[0].save(f"{output_path}{file_name_without_ext}.{output_type}")
-        else:
-            for i, image in enumerate(images):
-                image.save(f"{output_path}{file_name_without_ext}_{i+1}.{output_type}")
+        manifest = PageManifest(manifest_file, pdf_file, dpi=dpi, profile=profile)
+        manifest.start(len(images))
+        for i, image in enumerate(images):
+            page_file = _page_file(
+                output_path, file_name_without_ext, output_type, i + 1, len(images)
+            )
+            with (
+                span("encode", "image.from_pdf", page_file) as s,
+                atomic_output(page_file) as partial,
+            ):
+                image.save(partial, **save_options)
+                s.add(pages=1)
+            manifest.add(i + 1, page_file)
+            produced(page_file, 1)
+            if progress and progress(i + 1, len(images)) is False:
+                return report_error(ErrorCategory.CANCELLED, "Conversion cancelled")
     except FileNotFoundError:
-        print("Image file not found")
-        return -1
+        return report_error(ErrorCategory.NOT_FOUND, "Image file not found")
+
+    manifest.remove()
+    return 0
+
+
+def _page_file(
+    output_path: str,
+    file_name_without_ext: str,
+    output_type: str,
+    page: int,
+    page_count: int,
+) -> str:
+    """
+    Returns the output path of a rendered page: `<name>.<ext>` for single page documents, `<name>_<page>.<ext>` otherwise.
+    """
+    if page_count == 1:
+        return f"{output_path}{file_name_without_ext}.{output_type}"
+    return f"{output_path}{file_name_without_ext}_{page}.{output_type}"
+
+
+def _manifest_file(
+    output_path: str, file_name_without_ext: str, output_type: str
+) -> str:
+    """
+    Returns the path of the manifest of the pages of a PDF conversion: `.<name>.<ext>.manifest`, next to the pages.
+    """
+    return f"{output_path}.{file_name_without_ext}.{output_type}.manifest"
+
+
+def _windows(pages: list[int], chunk_size: int):
+    """
+    Yields the (first, last) page ranges covering pages, in order: runs of consecutive pages of at most chunk_size pages.
+    """
+    first = last = None
+    for page in pages:
+        if first is not None and page == last + 1 and page - first < chunk_size:
+            last = page
+            continue
+        if first is not None:
+            yield first, last
+        first = last = page
+    if first is not None:
+        yield first, last
+
+
+def _render_pages(
+    pdf_file: str,
+    first_page: int,
+    last_page: int,
+    page_count: int,
+    output_path: str,
+    file_name_without_ext: str,
+    output_type: str,
+    chunk_size: int,
+    progress: Callable[[int, int], bool | None] | None = None,
+    dpi: int = DEFAULT_DPI,
+    manifest: PageManifest | None = None,
+    done: set[int] = frozenset(),
+    profile: str | None = None,
+) -> int:
+    """
+    Renders the pages first_page..last_page (inclusive) of a PDF file in windows of chunk_size pages, saving and closing
+    every page of a window before the next one is rendered. Pages in done are skipped, and the pages saved are added to
+    manifest if given. Pages are saved with the encoder options of profile.
+
+    Returns:
+        int: Returns 0 if every page was saved, -1 if poppler produced no image for a window, if a FileNotFoundError
+            occurs or if progress returned False.
+    """
+    from pdf2image import convert_from_path
+
+    from metrics import span
+
+    def page_file(page: int) -> str:
+        return _page_file(
+            output_path, file_name_without_ext, output_type, page, page_count
+        )
+
+    save_options = encoder_options(profile, normalize(output_type))
+    pages = [page for page in range(first_page, last_page + 1) if page not in done]
+    count = last_page - first_page + 1 - len(pages)
+    # the next page to report as produced, so that outputs stay in page order
+    next_page = first_page
+
+    for first, last in _windows(pages, chunk_size):
+        for page in range(next_page, first):
+            produced(page_file(page), 1)
+        with span("render", "image.from_pdf") as s:
+            images = convert_from_path(
+                pdf_file, dpi=dpi, first_page=first, last_page=last
+            )
+            s.add(pages=len(images))
+        if not images:
+            return report_error(ErrorCategory.DECODE_FAILURE, "No images created")
+
+        try:
+            for page, image in enumerate(images, start=first):
+                with (
+                    span("encode", "image.from_pdf", page_file(page)) as s,
+                    atomic_output(page_file(page)) as partial,
+                ):
+                    image.save(partial, **save_options)
+                    s.add(pages=1)
+                image.close()
+                if manifest is not None:
+                    manifest.add(page, page_file(page))
+                produced(page_file(page), 1)
+                next_page = page + 1
+                count += 1
+                if progress and progress(count, page_count) is False:
+                    return report_error(ErrorCategory.CANCELLED, "Conversion cancelled")
+        except FileNotFoundError:
+            return report_error(ErrorCategory.NOT_FOUND, "Image file not found")
+        finally:
+            del images
+
+    for page in range(next_page, last_page + 1):
+        produced(page_file(page), 1)
+    return 0
+
 
+# Fewest pages worth handing to a separate process: below this the process start-up and poppler launch cost more than
+# the rendering they parallelize.
+MIN_PAGES_PER_WORKER = 4
+
+
+def _worker_count(workers: int, page_count: int) -> int:
+    """
+    Resolves the requested worker count: 0 picks one worker per MIN_PAGES_PER_WORKER pages, capped by the CPU count.
+    The result never exceeds the page count.
+    """
+    import os
+
+    if workers <= 0:
+        workers = min(os.cpu_count() or 1, -(-page_count // MIN_PAGES_PER_WORKER))
+    return max(1, min(workers, page_count))
+
+
+def _render_pages_parallel(
+    pdf_file: str,
+    page_count: int,
+    output_path: str,
+    file_name_without_ext: str,
+    output_type: str,
+    chunk_size: int,
+    workers: int,
+    progress: Callable[[int, int], bool | None] | None = None,
+    dpi: int = DEFAULT_DPI,
+    manifest: PageManifest | None = None,
+    done: set[int] = frozenset(),
+    profile: str | None = None,
+) -> int:
+    """
+    Splits the pages of a PDF file not in done into one contiguous range per worker and renders the ranges on a process
+    pool. Each worker writes its pages to their final `<name>_<page>.<ext>` paths and adds them to manifest. The error
+    of a failed range is reported here, with its category, and a worker that died as ErrorCategory.FAILED.
+
+    Returns:
+        int: Returns 0 if every range was rendered, -1 otherwise. A failure or a cancel returns at once, without
+            waiting for the ranges still rendering.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    pages = [page for page in range(1, page_count + 1) if page not in done]
+    pages_per_worker = -(-len(pages) // workers)
+    ranges = [
+        (pages[i], pages[min(i + pages_per_worker, len(pages)) - 1])
+        for i in range(0, len(pages), pages_per_worker)
+    ]
+
+    executor = ProcessPoolExecutor(max_workers=len(ranges))
+    try:
+        futures = {
+            executor.submit(
+                _render_range,
+                pdf_file,
+                first,
+                last,
+                page_count,
+                output_path,
+                file_name_without_ext,
+                output_type,
+                chunk_size or last - first + 1,
+                None,
+                dpi,
+                manifest,
+                done,
+                profile,
+            ): last
+            - first
+            + 1
+            - len(done.intersection(range(first, last + 1)))
+            for first, last in ranges
+        }
+        count = len(done)
+        for future in as_completed(futures):
+            error, message = future.result()
+            if error is not None:
+                return report_error(error, message)
+            count += futures[future]
+            if progress and progress(count, page_count) is False:
+                return report_error(ErrorCategory.CANCELLED, "Conversion cancelled")
+    except BrokenProcessPool:
+        return report_error(
+            ErrorCategory.FAILED, f"{pdf_file}: a rendering worker died"
+        )
+    finally:
+        # on an error or a cancel, the ranges already rendering finish in the background: their pages are complete
+        # and in the manifest, so returning does not wait for them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # the workers cannot report their pages to this process's result collection
+    for page in range(1, page_count + 1):
+        produced(
+            _page_file(
+                output_path, file_name_without_ext, output_type, page, page_count
+            ),
+            1,
+        )
     return 0
+
+
+def _render_range(*args) -> tuple[ErrorCategory | None, str]:
+    """
+    Runs _render_pages(*args) in a worker process and returns the category and message of its error, (None, "") on
+    success: the result collection of the parent process does not reach the workers.
+    """
+    from result import collect
+
+    result = collect(_render_pages, *args)
+    return result.error, result.message
@@ -1,20 +1,56 @@
-def convert_to_pdf(file_type: str, file_path: str, output_file: str) -> int:
+from atomic_output import atomic_output
+from detect_format import (
+    IMAGE_FORMATS,
+    MULTI_FRAME_FORMATS,
+    TEXT_FORMATS,
+    detect_encoding,
+    detect_format,
+    is_type,
+)
+from encoding_profiles import encoder_options
+from result import ErrorCategory, produced, report_error
+
+# Page sizes, in points, accepted by name by from_text
+PAGE_SIZES = {
+    "A3": (841.89, 1190.55),
+    "A4": (595.28, 841.89),
+    "A5": (419.53, 595.28),
+    "letter": (612.0, 792.0),
+    "legal": (612.0, 1008.0),
+}
+
+# Standard PDF fonts from_text can use. They are monospaced, so lines are wrapped by counting characters.
+TEXT_FONTS = ("Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique")
+
+# Width of a Courier glyph, as a fraction of the font size
+COURIER_ADVANCE = 0.6
+
+TAB_SIZE = 8
+
+
+def convert_to_pdf(file_type: str, file_path: str, output_file: str, **options) -> int:
     """
     Converts a file to PDF format.
 
     Args:
-        file_type (str): The type of the file to convert. Supported types are 'img' for images and 'doc' for Word documents.
+        file_type (str): The type of the file to convert. Supported types are 'img' for images, 'doc' for Word documents
+            and 'txt' for text files.
+            The conversion is chosen from the detected content of the file, which must be of this type.
         file_path (str): The path to the input file that needs to be converted.
         output_file (str): The desired path for the output PDF file. If not provided, the output file will have the same name as the input file with a .pdf extension.
+        **options: Keyword options of the conversion. The conversion function is the handler converter_registry
+            registers for the detected format, and receives the options it declares there: profile for images;
+            encoding, font, font_size, page_size, margin and profile for text files. Other options are ignored.
 
     Returns:
         int: Returns 0 on successful conversion, -1 if the file does not exist or if the file type is unsupported.
     """
     import os
 
+    import converter_registry
+
     if not os.path.exists(file_path):
-        print(f"{file_path} not found")
-        return -1
+        return report_error(ErrorCategory.NOT_FOUND, f"{file_path} not found")
 
     file_name = (
         file_path.split("/")[-1] if "/" in file_path else file_path.split("\\")[-1]
@@ -30,54 +66,151 @@ def convert_to_pdf(file_type: str, file_path: str, output_file: str) -> int:
 
     output_file = output_path + output_file
 
-    match file_type:
-        case "img":
-            return from_image(file_path, output_file)
-        case "doc":
-            return from_word(file_path, output_file)
+    file_format = detect_format(file_path, fallback_to_extension=True)
+    if not is_type(file_format, file_type):
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_name} is not a {file_type} file"
+        )
 
-    return -1
+    converter = converter_registry.find(file_format, "pdf")
+    if converter is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_name} cannot be converted to PDF"
+        )
+    return converter_registry.call(converter, file_path, output_file, **options)
 
 
-def from_image(image_file: str, output_file: str) -> int:
+def from_image(image_file: str, output_file: str, profile: str | None = None) -> int:
     """
     Converts an image file to a PDF file.
 
     Args:
-        image_file (str): The path to the input image file. Supported formats are 'png', 'jpg', 'jpeg', 'gif'.
+        image_file (str): The path to the input image file. Supported formats are 'png', 'jpg', 'gif', 'tiff', 'bmp',
+            'webp', detected from the file content. Transparent images are flattened onto a white page. Animated GIF
+            and WebP images and multi-page TIFF images become one page per frame (see _frames_to_pdf).
         output_file (str): The path to the output PDF file.
+        profile (str | None): An encoding profile (see encoding_profiles) setting the JPEG options of the pages. None
+            keeps the encoder's defaults.
 
     Returns:
-        int: Returns 0 if the conversion is successful, -1 if the image file is not found or if the file format is not supported.
+        int: Returns 0 if the conversion is successful, -1 if the image file is not found, if the file format is not
+            supported or if the profile is unknown.
 
     Raises:
         FileNotFoundError: If the image file is not found.
     """
     from PIL import Image
 
-    image_extensions = ["png", "jpg", "jpeg", "gif"]
+    from image_modes import prepare_image
+    from metrics import span
 
-    if image_file.split(".")[-1] not in image_extensions:
-        print("Image file must be one of the following types: ", image_extensions)
-        return -1
+    file_format = detect_format(image_file, fallback_to_extension=True)
+    if file_format not in IMAGE_FORMATS:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"Image file must be one of the following types: {IMAGE_FORMATS}",
+        )
+    jpeg_options = _jpeg_options(profile)
+    if jpeg_options is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"Unknown encoding profile: {profile}"
+        )
 
     try:
-        with Image.open(image_file) as im:
-            im = im.convert("RGB")
-            im.save(output_file)
+        with span("open", "pdf.from_image", image_file):
+            opened = Image.open(image_file)
+        with opened as im:
+            if file_format in MULTI_FRAME_FORMATS and getattr(im, "n_frames", 1) > 1:
+                compress_level = encoder_options(profile, "pdf").get(
+                    "compress_level", -1
+                )
+                return _frames_to_pdf(im, output_file, jpeg_options, compress_level)
+            with span("decode", "pdf.from_image") as s:
+                im.load()
+                s.add(pages=1)
+            with span("convert", "pdf.from_image"):
+                im = prepare_image(im, "pdf")
+            with (
+                span("encode", "pdf.from_image", output_file),
+                atomic_output(output_file) as partial,
+            ):
+                im.save(partial, **jpeg_options)
     except FileNotFoundError:
-        print("Image file not found")
-        return -1
+        return report_error(ErrorCategory.NOT_FOUND, "Image file not found")
 
+    produced(output_file, 1)
     return 0
 
 
+def _frames_to_pdf(
+    im, output_file: str, jpeg_options: dict, compress_level: int = -1
+) -> int:
+    """
+    Writes each frame of a multi-frame image as a page of one PDF file (see _add_frames).
+
+    Returns:
+        int: Returns 0 once every frame is written.
+    """
+    with atomic_output(output_file) as partial, open(partial, "wb") as f:
+        writer = _PdfWriter(f)
+        _add_frames(writer, im, jpeg_options, compress_level)
+        writer.close()
+
+    produced(output_file, len(writer.page_refs))
+    return 0
+
+
+def _add_frames(
+    writer,
+    im,
+    jpeg_options: dict,
+    compress_level: int = -1,
+    resolution: float = 72.0,
+    operation: str = "pdf.from_image",
+):
+    """
+    Adds a page per frame of a multi-frame image to writer. Frames are decoded, flattened and encoded one at a time, and
+    each page is written before the next frame is decoded, like from_images does with image files. Bilevel and palette
+    frames, such as fax scans, are Flate-encoded at compress_level (see _flate_page); the others are JPEG-encoded with
+    jpeg_options, grayscale frames staying grayscale.
+    """
+    from PIL import ImageSequence
+
+    from image_modes import prepare_image
+    from metrics import span
+
+    for frame in ImageSequence.Iterator(im):
+        with span("decode", operation) as s:
+            frame.load()
+            s.add(pages=1)
+        with span("convert", operation):
+            page = prepare_image(frame, "pdf")
+        with span("encode", operation) as s:
+            if page.mode in ("1", "P"):
+                width, height, color_space, data, bits = _flate_page(
+                    page, compress_level
+                )
+                writer.add_image_page(
+                    width,
+                    height,
+                    color_space,
+                    data,
+                    resolution,
+                    bits_per_component=bits,
+                    image_filter="FlateDecode",
+                )
+            else:
+                width, height, color_space, data = _jpeg_page(page, jpeg_options)
+                writer.add_image_page(width, height, color_space, data, resolution)
+            s.add(bytes=len(data))
+
+
 def from_word(word_file: str, output_file: str) -> int:
     """
     Converts a Word document to a PDF file.
 
     Args:
-        word_file (str): The path to the input Word document. Must have a .doc or .docx extension.
+        word_file (str): The path to the input Word document. Must be a .doc or .docx document.
         output_file (str): The path where the output PDF file will be saved.
 
     Returns:
@@ -85,16 +218,423 @@ def from_word(word_file: str, output_file: str) -> int:
     """
     from spire.doc import Document, FileFormat
 
-    word_extensions = ["doc", "docx"]
-    file_extension = word_file.split(".")[-1]
-    if file_extension not in word_extensions:
-        print("word file must be one of the following types: ", word_extensions)
-        return -1
+    from metrics import span
+
+    word_formats = ["doc", "docx"]
+    if detect_format(word_file, fallback_to_extension=True) not in word_formats:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"word file must be one of the following types: {word_formats}",
+        )
 
     # Create word document
     document = Document()
-    document.LoadFromFile(word_file)
-    document.SaveToFile(output_file, FileFormat.PDF)
+    with span("open", "pdf.from_word", word_file):
+        document.LoadFromFile(word_file)
+    with (
+        span("render", "pdf.from_word", output_file),
+        atomic_output(output_file) as partial,
+    ):
+        document.SaveToFile(partial, FileFormat.PDF)
     document.Close()
 
-    return 0
\ No newline at end of file
+    produced(output_file)
+    return 0
+
+
+def from_text(
+    text_file: str,
+    output_file: str,
+    encoding: str | None = None,
+    font: str = "Courier",
+    font_size: float = 10.0,
+    page_size: str | tuple[float, float] = "A4",
+    margin: float = 36.0,
+    profile: str | None = None,
+) -> int:
+    """
+    Converts a text file to a PDF file.
+
+    The text is read line by line and each page is written to the output as soon as it is full, so memory does not
+    grow with the size of the file. Long lines are wrapped at the right margin and tabs are expanded every TAB_SIZE
+    columns. Characters that the standard PDF fonts cannot show (outside Windows-1252) are printed as '?'.
+
+    Args:
+        text_file (str): The path to the input text file.
+        output_file (str): The path to the output PDF file.
+        encoding (str | None): The encoding of the text file. Detected from its content when None.
+        font (str): One of TEXT_FONTS.
+        font_size (float): The font size, in points. Lines are spaced 1.2 times the font size.
+        page_size (str | tuple[float, float]): A name from PAGE_SIZES or a (width, height) in points.
+        margin (float): The page margin, in points.
+        profile (str | None): An encoding profile (see encoding_profiles) setting the zlib level of the page contents.
+            None keeps zlib's default level.
+
+    Returns:
+        int: Returns 0 if the conversion is successful, -1 if the input file is not a text file or is not found, or if
+            the encoding, font, page size or profile is not supported.
+    """
+    if detect_format(text_file, fallback_to_extension=True) not in TEXT_FORMATS:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"Text file must be one of the following types: {TEXT_FORMATS}",
+        )
+    if font not in TEXT_FONTS:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"Font must be one of the following: {TEXT_FONTS}",
+        )
+    if isinstance(page_size, str):
+        if page_size not in PAGE_SIZES:
+            return report_error(
+                ErrorCategory.UNSUPPORTED,
+                f"Page size must be one of the following: {tuple(PAGE_SIZES)}",
+            )
+        page_size = PAGE_SIZES[page_size]
+    options = encoder_options(profile, "pdf")
+    if options is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"Unknown encoding profile: {profile}"
+        )
+    compress_level = options.get("compress_level", -1)
+
+    width, height = page_size
+    leading = font_size * 1.2
+    columns = max(1, int((width - 2 * margin) / (font_size * COURIER_ADVANCE)))
+    rows = max(1, int((height - 2 * margin) / leading))
+    # text state shared by every page: font, leading and the position of the first baseline
+    text_start = (
+        f"BT /F1 {font_size:g} Tf {leading:g} TL "
+        f"{margin:g} {height - margin - font_size:g} Td\n"
+    )
+
+    try:
+        with (
+            open(
+                text_file,
+                encoding=encoding or detect_encoding(text_file),
+                errors="replace",
+            ) as text,
+            atomic_output(output_file) as partial,
+            open(partial, "wb") as f,
+        ):
+            writer = _PdfWriter(f)
+            font_ref = writer.add_object(
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{font} "
+                "/Encoding /WinAnsiEncoding >>"
+            )
+            resources = f"<< /Font << /F1 {font_ref} 0 R >> >>"
+
+            page = []
+            for line in _wrap_lines(text, columns):
+                page.append(line)
+                if len(page) == rows:
+                    writer.add_page(
+                        width,
+                        height,
+                        resources,
+                        _text_content(text_start, page, compress_level),
+                    )
+                    page = []
+            if page or not writer.page_refs:
+                writer.add_page(
+                    width,
+                    height,
+                    resources,
+                    _text_content(text_start, page, compress_level),
+                )
+            writer.close()
+    except FileNotFoundError:
+        return report_error(ErrorCategory.NOT_FOUND, "Text file not found")
+    except LookupError:
+        return report_error(ErrorCategory.UNSUPPORTED, f"Unknown encoding: {encoding}")
+
+    produced(output_file, len(writer.page_refs))
+    return 0
+
+
+def from_images(
+    image_files: list[str],
+    output_file: str,
+    resolution: float = 72.0,
+    profile: str | None = None,
+) -> int:
+    """
+    Assembles several image files into a single PDF file, one page per image, in the given order. Animated GIF and
+    WebP images and multi-page TIFF images add one page per frame, like from_image.
+
+    Pages are written to the output as soon as each image is read, so memory stays bounded by the largest page rather
+    than the number of pages. RGB and grayscale JPEG files are embedded as-is (DCTDecode passthrough) without being
+    decoded; other images are decoded, converted to RGB and JPEG-encoded like from_image does.
+
+    Args:
+        image_files (list[str]): The paths to the input image files. Supported formats are 'png', 'jpg', 'gif', 'tiff',
+            'bmp', 'webp', detected from the file content.
+        output_file (str): The path to the output PDF file.
+        resolution (float): The image resolution in DPI, which sets the page size. Defaults to 72, like from_image.
+        profile (str | None): An encoding profile (see encoding_profiles) setting the JPEG options of the re-encoded
+            images. Passed-through JPEG files are embedded unchanged.
+
+    Returns:
+        int: Returns 0 if the conversion is successful, -1 if no image is given, if an image file is not found, if a
+            file format or the profile is not supported. No output file is left behind on failure.
+    """
+    if not image_files:
+        return report_error(ErrorCategory.UNSUPPORTED, "No image files given")
+    jpeg_options = _jpeg_options(profile)
+    if jpeg_options is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"Unknown encoding profile: {profile}"
+        )
+
+    for image_file in image_files:
+        if detect_format(image_file, fallback_to_extension=True) not in IMAGE_FORMATS:
+            return report_error(
+                ErrorCategory.UNSUPPORTED,
+                f"Image file must be one of the following types: {IMAGE_FORMATS}",
+            )
+
+    from PIL import Image
+
+    compress_level = encoder_options(profile, "pdf").get("compress_level", -1)
+    try:
+        with atomic_output(output_file) as partial, open(partial, "wb") as f:
+            writer = _PdfWriter(f)
+            for image_file in image_files:
+                with Image.open(image_file) as im:
+                    if getattr(im, "n_frames", 1) > 1:
+                        _add_frames(
+                            writer,
+                            im,
+                            jpeg_options,
+                            compress_level,
+                            resolution,
+                            "pdf.from_images",
+                        )
+                        continue
+                writer.add_image_page(*_pdf_image(image_file, jpeg_options), resolution)
+            writer.close()
+    except FileNotFoundError:
+        return report_error(ErrorCategory.NOT_FOUND, "Image file not found")
+
+    produced(output_file, len(writer.page_refs))
+    return 0
+
+
+def _pdf_image(
+    image_file: str, jpeg_options: dict | None = None
+) -> tuple[int, int, str, bytes]:
+    """
+    Returns the (width, height, color space, DCT-encoded data) of an image to embed in a PDF page.
+    JPEG files in RGB or L mode are returned undecoded; other images are flattened onto a white page like from_image
+    does, and encoded with jpeg_options.
+    """
+    from PIL import Image
+
+    from image_modes import prepare_image
+
+    with Image.open(image_file) as im:
+        if im.format == "JPEG" and im.mode in ("RGB", "L"):
+            with open(image_file, "rb") as f:
+                data = f.read()
+            color_space = "DeviceGray" if im.mode == "L" else "DeviceRGB"
+            return im.width, im.height, color_space, data
+        return _jpeg_page(prepare_image(im, "jpg"), jpeg_options)
+
+
+def _jpeg_page(im, jpeg_options: dict | None = None) -> tuple[int, int, str, bytes]:
+    """
+    Returns the (width, height, color space, DCT-encoded data) of a decoded image, converted to RGB unless it is
+    grayscale. jpeg_options are passed to the JPEG encoder (e.g. quality).
+    """
+    import io
+
+    if im.mode not in ("RGB", "L"):
+        im = im.convert("RGB")
+    buffer = io.BytesIO()
+    im.save(buffer, "JPEG", **(jpeg_options or {}))
+    color_space = "DeviceGray" if im.mode == "L" else "DeviceRGB"
+    return im.width, im.height, color_space, buffer.getvalue()
+
+
+def _flate_page(im, compress_level: int = -1) -> tuple[int, int, str, bytes, int]:
+    """
+    Returns the (width, height, color space, Flate-encoded data, bits per component) of a bilevel or palette image,
+    stored losslessly: bilevel images at 1 bit per pixel, palette images as indexes into their RGB palette.
+    """
+    import zlib
+
+    if im.mode == "1":
+        # Pillow packs each row MSB first, padded to a byte, 1 for white: the layout of a 1-bit DeviceGray image
+        color_space, bits = "DeviceGray", 1
+    else:
+        palette = bytes(im.getpalette("RGB"))
+        color_space = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]"
+        bits = 8
+    data = zlib.compress(im.tobytes(), compress_level)
+    return im.width, im.height, color_space, data, bits
+
+
+def _jpeg_options(profile: str | None) -> dict | None:
+    """
+    Returns the JPEG encoder options of a profile for PDF pages, None if the profile is unknown.
+    """
+    options = encoder_options(profile, "pdf")
+    if options is not None:
+        # the zlib level of the content streams, which the JPEG encoder has no use for
+        options.pop("compress_level", None)
+    return options
+
+
+# Characters escaped in PDF literal strings
+_PDF_STRING_ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)"})
+
+
+def _wrap_lines(text, columns: int):
+    """
+    Yields the lines of a text file, tabs expanded, cut into lines of at most columns characters.
+    """
+    for line in text:
+        line = line.rstrip("\r\n").expandtabs(TAB_SIZE)
+        if len(line) <= columns:
+            yield line
+            continue
+        for start in range(0, len(line), columns):
+            yield line[start : start + columns]
+
+
+def _text_content(text_start: str, lines: list[str], compress_level: int = -1) -> bytes:
+    """
+    Returns the compressed content stream of a text page: each line shown on its own baseline. compress_level is the
+    zlib level, -1 for zlib's default.
+    """
+    import zlib
+
+    content = text_start + "".join(
+        f"({line.translate(_PDF_STRING_ESCAPES)}) Tj T*\n" for line in lines
+    )
+    return zlib.compress(
+        (content + "ET").encode("cp1252", errors="replace"), compress_level
+    )
+
+
+class _PdfWriter:
+    """
+    Minimal PDF writer that writes each object to the file as soon as it is added.
+
+    Only the object offsets and the page references are kept in memory; the page tree, catalog and cross-reference
+    table are written by close().
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.offsets = [0]
+        self.page_refs = []
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.pages_ref = self.reserve()
+
+    def reserve(self) -> int:
+        """
+        Allocates an object number whose object is written later with write_object().
+        """
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def write_object(self, number: int, body: str, stream: bytes | None = None):
+        """
+        Writes object `number`. For a stream object, body holds the stream dictionary entries without the enclosing
+        `<< >>` or /Length, which are added here.
+        """
+        self.offsets[number] = self.file.tell()
+        self.file.write(f"{number} 0 obj\n".encode())
+        if stream is None:
+            self.file.write(body.encode())
+        else:
+            self.file.write(f"<< {body} /Length {len(stream)} >>\nstream\n".encode())
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def add_object(self, body: str, stream: bytes | None = None) -> int:
+        number = self.reserve()
+        self.write_object(number, body, stream)
+        return number
+
+    def add_image_page(
+        self,
+        width: int,
+        height: int,
+        color_space: str,
+        data: bytes,
+        resolution: float = 72.0,
+        bits_per_component: int = 8,
+        image_filter: str = "DCTDecode",
+    ):
+        """
+        Adds a page showing an image scaled to fill it. color_space is a color space name (e.g. 'DeviceRGB') or a
+        color space array, and data is encoded with image_filter.
+        """
+        page_width = width * 72.0 / resolution
+        page_height = height * 72.0 / resolution
+
+        if not color_space.startswith("["):
+            color_space = f"/{color_space}"
+        image_ref = self.add_object(
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {color_space} /BitsPerComponent {bits_per_component} "
+            f"/Filter /{image_filter}",
+            data,
+        )
+        self.add_page(
+            page_width,
+            page_height,
+            f"<< /XObject << /Im0 {image_ref} 0 R >> >>",
+            f"q {page_width:g} 0 0 {page_height:g} 0 0 cm /Im0 Do Q".encode(),
+            compressed=False,
+        )
+
+    def add_page(
+        self,
+        width: float,
+        height: float,
+        resources: str,
+        content: bytes,
+        compressed: bool = True,
+    ):
+        """
+        Adds a page of the given size, in points, drawn by a content stream. A compressed content stream is
+        FlateDecode-encoded (zlib).
+        """
+        contents_ref = self.add_object(
+            "/Filter /FlateDecode" if compressed else "", content
+        )
+        self.page_refs.append(
+            self.add_object(
+                f"<< /Type /Page /Parent {self.pages_ref} 0 R "
+                f"/MediaBox [0 0 {width:g} {height:g}] "
+                f"/Resources {resources} /Contents {contents_ref} 0 R >>"
+            )
+        )
+
+    def close(self):
+        """
+        Writes the page tree, catalog, cross-reference table and trailer.
+        """
+        kids = " ".join(f"{ref} 0 R" for ref in self.page_refs)
+        self.write_object(
+            self.pages_ref,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_refs)} >>",
+        )
+        catalog_ref = self.add_object(
+            f"<< /Type /Catalog /Pages {self.pages_ref} 0 R >>"
+        )
+
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {len(self.offsets)}\n".encode())
+        self.file.write(b"0000000000 65535 f \n")
+        for offset in self.offsets[1:]:
+            self.file.write(f"{offset:010d} 00000 n \n".encode())
+        self.file.write(
+            f"trailer\n<< /Size {len(self.offsets)} /Root {catalog_ref} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
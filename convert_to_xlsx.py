@@ -0,0 +1,264 @@
+import math
+import re
+from typing import Callable
+
+from atomic_output import atomic_output
+from detect_format import TEXT_FORMATS, detect_encoding, detect_format, is_type
+from result import ErrorCategory, produced, report_error
+
+# Rows of an Excel worksheet. Longer CSV files continue on new sheets.
+EXCEL_MAX_ROWS = 1_048_576
+
+# Data rows read ahead to infer the type of each column
+TYPE_SAMPLE_ROWS = 1000
+
+# Rows converted between two progress reports
+PROGRESS_INTERVAL = 10_000
+
+# Delimiters recognized when the delimiter is not given
+CSV_DELIMITERS = ",;\t|"
+
+# Numbers without leading zeros, so that identifiers and zip codes keep their digits. Integers are limited to the 15
+# significant digits Excel stores exactly.
+_INTEGER = re.compile(r"-?(0|[1-9]\d{0,14})")
+_DECIMAL = re.compile(r"-?((0|[1-9]\d*)(\.\d*)?|\.\d+)([eE][-+]?\d+)?")
+
+
+def convert_to_xlsx(file_type: str, file_path: str, output_file: str) -> int:
+    """
+    Converts a file to XLSX format.
+
+    Args:
+        file_type (str): The type of the file to convert. The only supported type is 'csv'. The content of the file
+            must be text.
+        file_path (str): The path to the input file that needs to be converted.
+        output_file (str): The desired path for the output XLSX file. If not provided, the output file will have the
+            same name as the input file with a .xlsx extension.
+
+    Returns:
+        int: Returns 0 on successful conversion, -1 if the file does not exist or if the file type is unsupported.
+    """
+    import os
+
+    if not os.path.exists(file_path):
+        return report_error(ErrorCategory.NOT_FOUND, f"{file_path} not found")
+
+    file_name = os.path.basename(file_path)
+    if not output_file:
+        output_file = os.path.splitext(file_name)[0] + ".xlsx"
+    if not output_file.endswith(".xlsx"):
+        output_file = output_file + ".xlsx"
+    output_file = os.path.join(os.path.dirname(file_path), output_file)
+
+    if not is_type(detect_format(file_path, fallback_to_extension=True), file_type):
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_name} is not a {file_type} file"
+        )
+
+    if file_type == "csv":
+        return from_csv(file_path, output_file)
+    return report_error(
+        ErrorCategory.UNSUPPORTED, f"{file_name} cannot be converted to XLSX"
+    )
+
+
+def from_csv(
+    csv_file: str,
+    output_file: str,
+    delimiter: str | None = None,
+    encoding: str | None = None,
+    header: bool = True,
+    progress: Callable[[int, int], bool | None] | None = None,
+) -> int:
+    """
+    Converts a CSV file to an XLSX workbook.
+
+    Rows are read one at a time and written through a write-only workbook, which streams them to disk, so memory does
+    not grow with the number of rows. The type of each column (integer, decimal, date and time, or text) is inferred
+    from the first TYPE_SAMPLE_ROWS data rows; values that do not match their column's type are written as text. Files
+    longer than EXCEL_MAX_ROWS rows continue on new sheets, each starting with the header row.
+
+    Args:
+        csv_file (str): The path to the input CSV file.
+        output_file (str): The path to the output XLSX file.
+        delimiter (str | None): The field delimiter. Detected among CSV_DELIMITERS when None.
+        encoding (str | None): The encoding of the CSV file. Detected from its content when None.
+        header (bool): Whether the first row holds column names, kept as text and repeated on every sheet.
+        progress (Callable[[int, int], bool | None] | None): Called with (bytes read, file size) every
+            PROGRESS_INTERVAL rows. Returning False cancels the conversion.
+
+    Returns:
+        int: Returns 0 if the conversion is successful, -1 if the input file is not a text file or is not found, if
+            the encoding is unknown or if the conversion is cancelled. No output file is left behind on failure.
+    """
+    import csv
+    import io
+    import itertools
+    import os
+
+    from openpyxl import Workbook
+
+    if detect_format(csv_file, fallback_to_extension=True) not in TEXT_FORMATS:
+        return report_error(
+            ErrorCategory.UNSUPPORTED,
+            f"CSV file must be one of the following types: {TEXT_FORMATS}",
+        )
+
+    try:
+        size = os.path.getsize(csv_file)
+        with open(csv_file, "rb") as binary:
+            text = io.TextIOWrapper(
+                binary,
+                encoding=encoding or detect_encoding(csv_file),
+                errors="replace",
+                newline="",
+            )
+            if delimiter is None:
+                delimiter = _sniff_delimiter(text.read(1 << 16))
+                text.seek(0)
+            reader = csv.reader(text, delimiter=delimiter)
+
+            header_row = next(reader, []) if header else []
+            # the sample is converted like the rows after it, once the column types are known
+            sample = [row for _, row in zip(range(TYPE_SAMPLE_ROWS), reader)]
+            converters = _column_converters(sample)
+
+            workbook = Workbook(write_only=True)
+            sheet = None
+            sheet_rows = EXCEL_MAX_ROWS
+            for count, row in enumerate(itertools.chain(sample, reader), start=1):
+                if sheet_rows == EXCEL_MAX_ROWS:
+                    sheet = workbook.create_sheet(
+                        f"Sheet{len(workbook.worksheets) + 1}"
+                    )
+                    sheet_rows = 0
+                    if header_row:
+                        sheet.append(_row(sheet, header_row, []))
+                        sheet_rows = 1
+                sheet.append(_row(sheet, row, converters))
+                sheet_rows += 1
+
+                if progress and count % PROGRESS_INTERVAL == 0:
+                    if progress(binary.tell(), size) is False:
+                        # finish the sheets' temporary files without writing the workbook
+                        for written in workbook.worksheets:
+                            written.close()
+                        return report_error(
+                            ErrorCategory.CANCELLED, "Conversion cancelled"
+                        )
+
+            if sheet is None:
+                sheet = workbook.create_sheet("Sheet1")
+                if header_row:
+                    sheet.append(_row(sheet, header_row, []))
+            with atomic_output(output_file) as partial:
+                workbook.save(partial)
+    except FileNotFoundError:
+        return report_error(ErrorCategory.NOT_FOUND, "CSV file not found")
+    except LookupError:
+        return report_error(ErrorCategory.UNSUPPORTED, f"Unknown encoding: {encoding}")
+
+    if progress:
+        progress(size, size)
+    produced(output_file)
+    return 0
+
+
+def _row(sheet, row: list[str], converters: list[Callable]) -> list:
+    """
+    Converts the values of a row, as text past the end of converters. Text starting with '=' would be written as a
+    formula: it is forced to a text cell, so that a CSV file cannot inject formulas into the workbook.
+    """
+    values = [convert(value) for convert, value in zip(converters, row)]
+    values += [_text(value) for value in row[len(values) :]]
+    if any(type(value) is str and value[0] == "=" for value in values):
+        values = [
+            (
+                _text_cell(sheet, value)
+                if type(value) is str and value[0] == "="
+                else value
+            )
+            for value in values
+        ]
+    return values
+
+
+def _sniff_delimiter(head: str) -> str:
+    """
+    Returns the delimiter of a CSV file from its first characters, ',' if none of CSV_DELIMITERS stands out.
+    """
+    import csv
+
+    # the last line may be cut
+    head = head.rsplit("\n", 1)[0] if "\n" in head else head
+    try:
+        return csv.Sniffer().sniff(head, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return ","
+
+
+def _column_converters(sample: list[list[str]]) -> list[Callable]:
+    """
+    Picks, for each column, the most specific converter that accepts every non-empty value of the sample.
+    """
+    columns = max((len(row) for row in sample), default=0)
+    converters = []
+    for column in range(columns):
+        values = [row[column] for row in sample if len(row) > column and row[column]]
+        for converter in (_integer, _decimal, _datetime):
+            # converters return the value unchanged when it does not parse
+            if values and all(type(converter(value)) is not str for value in values):
+                converters.append(converter)
+                break
+        else:
+            converters.append(_text)
+    return converters
+
+
+def _integer(value: str):
+    if not value:
+        return None
+    if _INTEGER.fullmatch(value):
+        return int(value)
+    return value
+
+
+def _decimal(value: str):
+    if not value:
+        return None
+    if _DECIMAL.fullmatch(value):
+        number = float(value)
+        if math.isfinite(number):
+            return number
+    return value
+
+
+def _datetime(value: str):
+    """
+    Returns an ISO 8601 date or date and time as a datetime, or value unchanged. Excel has no time zones: values with
+    an offset stay text.
+    """
+    from datetime import datetime
+
+    if not value:
+        return None
+    if "-" in value[:5]:
+        try:
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is None:
+                return parsed
+        except ValueError:
+            pass
+    return value
+
+
+def _text(value: str):
+    return value or None
+
+
+def _text_cell(sheet, value: str):
+    from openpyxl.cell import WriteOnlyCell
+
+    cell = WriteOnlyCell(sheet, value)
+    cell.data_type = "s"
+    return cell
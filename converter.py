@@ -1,8 +1,19 @@
+import os
+import queue
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, Toplevel, filedialog, messagebox, BooleanVar, DISABLED, NORMAL
 from ttkthemes import ThemedTk
-from convert_to_pdf import convert_to_pdf
-from convert_to_image import convert_to_image
+import converter_registry
+from result import ErrorCategory
+
+# Conversions running at the same time; further ones wait in the executor queue.
+MAX_CONCURRENT_CONVERSIONS = 4
+# Pages rendered per poppler call when converting a PDF, i.e. how often a cancel request is checked.
+PDF_CHUNK_SIZE = 4
+# Interval, in milliseconds, at which the main thread picks up progress and results from the workers.
+POLL_INTERVAL = 100
 
 
 class App:
@@ -11,33 +22,37 @@ class App:
         # self.root = ThemedTk(theme="arc")
         self.root.geometry("+600+200")
         self.root.title("File converters")
+        self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CONVERSIONS)
+        # Workers never touch Tk: they post (kind, job, *values) events here, handled by __poll on the main thread.
+        self.events = queue.Queue()
+        # The cancel events of the conversions not done yet, set when the window is closed.
+        self.cancel_events = set()
         self.__create_content()
 
     def run(self):
+        self.root.after(POLL_INTERVAL, self.__poll)
         self.root.mainloop()
+        # stop the running conversions at their next progress call, not only the queued ones
+        for cancel_event in list(self.cancel_events):
+            cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
     def __create_content(self):
         self.content_frame = ttk.Frame(self.root)
         self.content_frame.pack(pady=0, fill="both")
 
-        converters = [
-            ("IMG to PDF", lambda: self.__select_file("img", "pdf"), True),
-            ("DOC to PDF", lambda: self.__select_file("doc", "pdf")),
-            ("TXT to PDF", lambda: self.__select_file("txt", "pdf")),
-            ("PDF to PNG", lambda: self.__select_file("pdf", "png"), True),
-            ("JPG to PNG", lambda: self.__select_file("jpg", "png"), True),
-            ("PDF to JPG", lambda: self.__select_file("pdf", "jpg"), True),
-            ("PNG to JPG", lambda: self.__select_file("png", "jpg"), True),
-            ("MP4 to MP3", lambda: self.__select_file("mp4")),
-            ("CSV to XLSX", lambda: self.__select_file("csv")),
-        ]
+        converters = [c for c in converter_registry.converters() if c.label]
 
         for i, converter in enumerate(converters):
-            text, command, *rest = converter
-            enable = rest[0] if rest else False
             col = i % 3
             row = i // 3
-            self.__create_conversion_option(text, row, col, command, enable)
+            self.__create_conversion_option(
+                converter.label,
+                row,
+                col,
+                lambda converter=converter: self.__select_file(converter),
+                converter.available,
+            )
 
     def __create_conversion_option(
         self, text: str, row: int, col: int, command, enable: bool = False
@@ -52,24 +67,22 @@ class App:
         )
         button.grid(row=row, column=col, padx=20, pady=25)
 
-    def __select_file(self, original_type: str, output_type: str = "pdf"):
-        filetypes = {
-            "doc": [("Word Documents", "*.docx *.doc")],
-            "img": [("Images", "*.png *jpg *jpeg *gif")],
-            "png": [("Png Images", "*png")],
-            "jpg": [("JPEG Images", "*jpg *jpeg")],
-            "txt": [("Text Files", "*.txt")],
-            "pdf": [("Pdf Files", "*.pdf")],
-        }
+    def __select_file(self, converter: converter_registry.Converter):
+        from detect_format import extensions
 
+        patterns = " ".join(
+            f"*.{extension}"
+            for source in converter.sources
+            for extension in extensions(source)
+        )
         selected_file = filedialog.askopenfilename(
             title="Select File",
-            filetypes=filetypes.get(original_type, [("All Files", "*.*")]),
+            filetypes=[(f"{converter.group.upper()} Files", patterns)],
         )
         if selected_file:
-            self.__open_confirmation_window(selected_file, original_type, output_type)
+            self.__open_confirmation_window(selected_file, converter.target)
 
-    def __open_confirmation_window(self, file_path, file_type, output_type):
+    def __open_confirmation_window(self, file_path, output_type):
         file_name = (
             file_path.split("/")[-1] if "/" in file_path else file_path.split("\\")[-1]
         )
@@ -131,30 +144,154 @@ class App:
                     f"File will be renamed to: {new_name}",
                     parent=confirm_frame,
                 )
-            res = -1
+            self.__start_conversion(
+                confirm_win, confirm_frame, file_path, output_type, o
+            )
+
+        confirm_button = ttk.Button(
+            confirm_frame, text="Confirm", command=confirm_action
+        )
+        confirm_button.pack(pady=0)
 
-            match output_type:
-                case "pdf":
-                    res = convert_to_pdf(file_type, file_path, o)
-                case "png" | "jpg" | "jpeg" | "gif":
-                    res = convert_to_image(file_type, output_type, file_path, o)
+    def __start_conversion(
+        self, confirm_win, confirm_frame, file_path, output_type, output
+    ):
+        for child in confirm_frame.winfo_children():
+            child.destroy()
+        # let the user start other conversions while this one runs
+        confirm_win.grab_release()
+        confirm_win.title(f"Converting to {output}")
 
-            if res == -1:
-                messagebox.showerror(
-                    "Failure", "Error while converting", parent=confirm_frame
-                )
+        status_label = ttk.Label(confirm_frame, text="Waiting...", wraplength=320)
+        status_label.pack(pady=10)
+        progress_bar = ttk.Progressbar(confirm_frame, length=320)
+        progress_bar.pack(pady=10)
+
+        cancel_event = threading.Event()
+        self.cancel_events.add(cancel_event)
+        job = {
+            "window": confirm_win,
+            "parent": confirm_frame,
+            "status": status_label,
+            "progress": progress_bar,
+            "cancel": cancel_event,
+            "cancellable": _cancellable(file_path, output_type),
+            "output": output,
+        }
+
+        def cancel():
+            if job["future"].cancel():
+                # still queued: it will never start
+                self.cancel_events.discard(cancel_event)
                 confirm_win.destroy()
                 return
+            if not job["cancellable"]:
+                return
+            cancel_event.set()
+            status_label.configure(text="Cancelling...")
+            cancel_button.configure(state=DISABLED)
 
-            messagebox.showinfo(
-                "Converted", f"{o} is created successfully!", parent=confirm_frame
-            )
-            confirm_win.destroy()
+        cancel_button = ttk.Button(confirm_frame, text="Cancel", command=cancel)
+        cancel_button.pack(pady=0)
+        job["cancel_button"] = cancel_button
+        confirm_win.protocol("WM_DELETE_WINDOW", cancel)
 
-        confirm_button = ttk.Button(
-            confirm_frame, text="Confirm", command=confirm_action
+        job["future"] = self.executor.submit(
+            self.__convert, job, file_path, output_type, output
         )
-        confirm_button.pack(pady=0)
+
+    def __convert(self, job, file_path, output_type, output):
+        """
+        Runs on a worker thread: performs the conversion and reports through self.events.
+        """
+        self.events.put(("started", job))
+
+        def progress(done, total):
+            self.events.put(("progress", job, done, total))
+            return not job["cancel"].is_set()
+
+        output_file = os.path.join(os.path.dirname(file_path), output)
+        if not output_file.endswith("." + output_type):
+            output_file += "." + output_type
+
+        result = converter_registry.convert_file(
+            file_path,
+            output_type,
+            output_file,
+            chunk_size=PDF_CHUNK_SIZE,
+            progress=progress,
+        )
+        self.events.put(("done", job, result))
+
+    def __poll(self):
+        while True:
+            try:
+                kind, job, *values = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "done":
+                self.cancel_events.discard(job["cancel"])
+            window = job["window"]
+            if not window.winfo_exists():
+                continue
+
+            match kind:
+                case "started":
+                    if job["cancellable"]:
+                        job["status"].configure(text="Converting...")
+                    else:
+                        job["status"].configure(
+                            text="Converting... (this conversion cannot be cancelled)"
+                        )
+                        job["cancel_button"].configure(state=DISABLED)
+                    job["progress"].configure(mode="indeterminate")
+                    job["progress"].start()
+                case "progress":
+                    done, total = values
+                    # pages for PDF renders, bytes or microseconds for streamed conversions; an unknown total
+                    # (0) keeps the bar indeterminate
+                    if total:
+                        job["progress"].stop()
+                        job["progress"].configure(
+                            mode="determinate", maximum=total, value=done
+                        )
+                        job["status"].configure(text=f"{done * 100 // total}%")
+                case "done":
+                    (result,) = values
+                    job["progress"].stop()
+                    # a cancel pressed once the work was done did not prevent the output
+                    if result.error is ErrorCategory.CANCELLED:
+                        messagebox.showinfo(
+                            "Cancelled", "Conversion cancelled", parent=job["parent"]
+                        )
+                    elif not result.ok:
+                        messagebox.showerror(
+                            "Failure",
+                            f"Error while converting: {result.message}",
+                            parent=job["parent"],
+                        )
+                    else:
+                        messagebox.showinfo(
+                            "Converted",
+                            f"{job['output']} is created successfully!",
+                            parent=job["parent"],
+                        )
+                    window.destroy()
+
+        self.root.after(POLL_INTERVAL, self.__poll)
+
+
+def _cancellable(file_path: str, output_type: str) -> bool:
+    """
+    Returns whether a conversion can be stopped once started: some converter of its chain must take a progress
+    callback, whose return value is the cancel check. Others, such as Word documents converted by Spire, run to the end.
+    """
+    from detect_format import detect_format
+
+    source = detect_format(file_path, fallback_to_extension=True)
+    chain = converter_registry.route(source, output_type) or []
+    return any("progress" in converter.options for converter in chain)
 
 
 if __name__ == "__main__":
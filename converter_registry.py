@@ -0,0 +1,350 @@
+"""
+Registry of the supported conversions.
+
+Every conversion is a Converter mapping source formats to a target format through a handler, named as
+'module:function' and imported on first use, so looking conversions up never loads a backend. The GUI buttons, the
+batch engine and the command line are built from this registry, and convert() chains converters when there is no
+direct one (e.g. DOC → PDF → PNG).
+
+Handlers are called as handler(file_path, output_file, **options) and return 0 on success, -1 on failure.
+convert_file() returns a result.ConversionResult instead.
+"""
+
+from typing import Callable, NamedTuple
+
+from detect_format import FORMAT_ALIASES, FORMAT_GROUPS, IMAGE_FORMATS, normalize
+
+# Images offered as targets. Every image format detect_format recognizes can be read.
+IMAGE_TARGETS = ("png", "jpg", "gif")
+WORD_FORMATS = FORMAT_GROUPS["doc"]
+
+
+class Converter(NamedTuple):
+    """
+    A registered conversion.
+
+    Attributes:
+        sources (tuple[str, ...]): The source formats the handler accepts, as normalized by detect_format.
+        target (str): The target format, normalized.
+        handler (str): The handler, as 'module:function'. Empty for a planned conversion without backend yet.
+        label (str): The text of the GUI button, empty for conversions without one.
+        group (str): The source type the GUI asks a file for (e.g., 'img' for every image format).
+        options (tuple[str, ...]): The keyword options the handler accepts; other options are not passed to it.
+        multi_page (bool): Whether a conversion may write `<name>_<i>.<ext>` pages or frames instead of a single output
+            file.
+    """
+
+    sources: tuple[str, ...]
+    target: str
+    handler: str
+    label: str = ""
+    group: str = ""
+    options: tuple[str, ...] = ()
+    multi_page: bool = False
+
+    @property
+    def available(self) -> bool:
+        return bool(self.handler)
+
+
+_converters: list[Converter] = []
+
+
+def register(converter: Converter) -> Converter:
+    """
+    Adds a converter. Converters registered first win when several handle the same (source, target) pair.
+    """
+    _converters.append(converter)
+    return converter
+
+
+def converters() -> list[Converter]:
+    """
+    Returns the registered converters, in registration order.
+    """
+    return list(_converters)
+
+
+def targets() -> list[str]:
+    """
+    Returns the formats that can be produced, directly or through several converters, with their aliases (e.g. 'jpeg').
+    """
+    formats = {c.target for c in _converters if c.available}
+    return sorted(formats | {a for a, fmt in FORMAT_ALIASES.items() if fmt in formats})
+
+
+def find(source: str, target: str) -> Converter | None:
+    """
+    Returns the available converter from source to target, or None if there is no direct one. Aliases such as 'jpeg'
+    name their format.
+    """
+    source, target = normalize(source), normalize(target)
+    for converter in _converters:
+        if (
+            converter.available
+            and converter.target == target
+            and source in converter.sources
+        ):
+            return converter
+    return None
+
+
+def route(source: str, target: str) -> list[Converter] | None:
+    """
+    Returns the shortest chain of available converters from source to target, or None if there is none.
+    Single-page intermediates only: a multi-page output cannot feed the next converter.
+    """
+    source, target = normalize(source), normalize(target)
+    if source == target:
+        return None
+
+    previous = {source: None}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for fmt in frontier:
+            for converter in _converters:
+                if (
+                    not converter.available
+                    or fmt not in converter.sources
+                    or converter.target in previous
+                ):
+                    continue
+                if converter.multi_page and converter.target != target:
+                    continue
+                previous[converter.target] = (fmt, converter)
+                if converter.target == target:
+                    chain = []
+                    step = target
+                    while previous[step]:
+                        step, hop = previous[step]
+                        chain.append(hop)
+                    return chain[::-1]
+                next_frontier.append(converter.target)
+        frontier = next_frontier
+    return None
+
+
+def load(converter: Converter) -> Callable:
+    """
+    Imports the handler of a converter. The module is imported on first use; the function is looked up on every call.
+    """
+    import importlib
+
+    module, function = converter.handler.split(":")
+    return getattr(importlib.import_module(module), function)
+
+
+def call(converter: Converter, file_path: str, output_file: str, **options) -> int:
+    """
+    Runs the handler of a converter on file_path with the options it declares; other options are dropped.
+
+    Returns:
+        int: The handler's result, 0 on success and -1 on failure.
+    """
+    handler_options = {k: v for k, v in options.items() if k in converter.options}
+    return load(converter)(file_path, output_file, **handler_options)
+
+
+def convert_file(file_path: str, target: str, output_file: str = "", **options):
+    """
+    Converts a file like convert() and returns a ConversionResult: the output files, page count, sizes and stage
+    timings, or the category and message of the error. Exceptions of the handlers are caught and categorized.
+
+    Returns:
+        result.ConversionResult: The outcome of the conversion.
+    """
+    from result import collect
+
+    return collect(convert, file_path, target, output_file, **options)
+
+
+def convert(file_path: str, target: str, output_file: str = "", **options) -> int:
+    """
+    Converts a file to the target format, chaining converters when there is no direct one.
+
+    Args:
+        file_path (str): The path to the input file. Its source format is detected from its content.
+        target (str): The target format (e.g., 'pdf', 'png').
+        output_file (str): The path to the output file. Defaults to the input path with the target extension.
+        **options: Handler options (e.g., chunk_size, progress). Each converter of the chain receives those it
+            declares; intermediate files are written to a temporary directory.
+
+    Returns:
+        int: Returns 0 on success, -1 if the file does not exist, if its format is not recognized, if no chain of
+            converters leads to the target format or if a conversion fails.
+    """
+    import os
+    import tempfile
+
+    from detect_format import detect_format
+    from result import ErrorCategory, intermediate, produced, report_error
+
+    if not os.path.exists(file_path):
+        return report_error(ErrorCategory.NOT_FOUND, f"{file_path} not found")
+
+    stem = os.path.splitext(file_path)[0]
+    source = detect_format(file_path)
+    if source is None:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"{file_path}: unrecognized file format"
+        )
+
+    chain = route(source, target)
+    if not chain:
+        return report_error(
+            ErrorCategory.UNSUPPORTED, f"No conversion from {source} to {target}"
+        )
+
+    if not output_file:
+        output_file = f"{stem}.{target}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        current = file_path
+        for converter in chain[:-1]:
+            hop_output = os.path.join(
+                tmp, f"{os.path.basename(stem)}.{converter.target}"
+            )
+            with intermediate():
+                if call(converter, current, hop_output, **options) == -1:
+                    return -1
+            current = hop_output
+
+        converter = chain[-1]
+        if call(converter, current, output_file, **options) == -1:
+            return -1
+
+    if not converter.multi_page:
+        # for handlers that do not report their output themselves
+        produced(output_file)
+    return 0
+
+
+def _pdf_to_image(pdf_file: str, output_file: str, **options) -> int:
+    """
+    Adapts convert_to_image.from_pdf to the handler signature: pages are named after output_file.
+    """
+    import os
+
+    from convert_to_image import from_pdf
+
+    output_path, name = os.path.split(output_file)
+    file_name_without_ext, extension = os.path.splitext(name)
+    if output_path:
+        output_path += os.sep
+    return from_pdf(
+        pdf_file,
+        output_path,
+        file_name_without_ext,
+        extension.removeprefix("."),
+        **options,
+    )
+
+
+PDF_TO_IMAGE_OPTIONS = ("chunk_size", "workers", "progress", "dpi", "profile")
+IMAGE_TO_IMAGE_OPTIONS = ("max_size", "profile")
+IMAGE_TO_PDF_OPTIONS = ("profile",)
+TEXT_TO_PDF_OPTIONS = (
+    "encoding",
+    "font",
+    "font_size",
+    "page_size",
+    "margin",
+    "profile",
+)
+CSV_TO_XLSX_OPTIONS = ("delimiter", "encoding", "header", "progress")
+VIDEO_TO_AUDIO_OPTIONS = ("bitrate", "progress")
+
+# The GUI shows the labelled converters, in this order, three per row.
+for _converter in [
+    Converter(
+        IMAGE_FORMATS,
+        "pdf",
+        "convert_to_pdf:from_image",
+        "IMG to PDF",
+        "img",
+        IMAGE_TO_PDF_OPTIONS,
+    ),
+    Converter(WORD_FORMATS, "pdf", "convert_to_pdf:from_word", "DOC to PDF", "doc"),
+    Converter(
+        ("txt",),
+        "pdf",
+        "convert_to_pdf:from_text",
+        "TXT to PDF",
+        "txt",
+        TEXT_TO_PDF_OPTIONS,
+    ),
+    Converter(
+        ("pdf",),
+        "png",
+        "converter_registry:_pdf_to_image",
+        "PDF to PNG",
+        "pdf",
+        PDF_TO_IMAGE_OPTIONS,
+        True,
+    ),
+    Converter(
+        ("jpg",),
+        "png",
+        "convert_to_image:from_image",
+        "JPG to PNG",
+        "jpg",
+        IMAGE_TO_IMAGE_OPTIONS,
+        True,
+    ),
+    Converter(
+        ("pdf",),
+        "jpg",
+        "converter_registry:_pdf_to_image",
+        "PDF to JPG",
+        "pdf",
+        PDF_TO_IMAGE_OPTIONS,
+        True,
+    ),
+    Converter(
+        ("png",),
+        "jpg",
+        "convert_to_image:from_image",
+        "PNG to JPG",
+        "png",
+        IMAGE_TO_IMAGE_OPTIONS,
+        True,
+    ),
+    Converter(
+        ("mp4",),
+        "mp3",
+        "convert_to_audio:from_video",
+        "MP4 to MP3",
+        "mp4",
+        VIDEO_TO_AUDIO_OPTIONS,
+    ),
+    Converter(
+        ("csv",),
+        "xlsx",
+        "convert_to_xlsx:from_csv",
+        "CSV to XLSX",
+        "csv",
+        CSV_TO_XLSX_OPTIONS,
+    ),
+]:
+    register(_converter)
+
+for _target in IMAGE_TARGETS:
+    register(
+        Converter(
+            tuple(f for f in IMAGE_FORMATS if f != _target),
+            _target,
+            "convert_to_image:from_image",
+            options=IMAGE_TO_IMAGE_OPTIONS,
+            multi_page=True,
+        )
+    )
+    register(
+        Converter(
+            ("pdf",),
+            _target,
+            "converter_registry:_pdf_to_image",
+            options=PDF_TO_IMAGE_OPTIONS,
+            multi_page=True,
+        )
+    )
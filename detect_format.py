@@ -0,0 +1,199 @@
+"""
+Content-based file format detection.
+
+detect_format reads the first HEAD_SIZE bytes of a file and classifies it from its magic bytes, so a batch can be
+triaged, and mislabeled or corrupt inputs rejected, without decoding anything.
+"""
+
+# Bytes read from the start of a file: enough for every signature below, and for the first part names of a zip package.
+HEAD_SIZE = 512
+
+IMAGE_FORMATS = ("png", "jpg", "gif", "tiff", "bmp", "webp")
+
+# Image formats that can hold several frames (animations, multi-page scans), converted frame by frame
+MULTI_FRAME_FORMATS = ("gif", "tiff", "webp")
+
+# Extensions naming the same format as another one
+FORMAT_ALIASES = {"jpeg": "jpg", "tif": "tiff"}
+
+# Formats told apart by their extension once the content is known to be text
+TEXT_FORMATS = ("txt", "csv")
+
+# Sizes of the BMP info headers (BITMAPCOREHEADER to BITMAPV5HEADER), stored at offset 14. "BM" alone is common text.
+BMP_HEADER_SIZES = (12, 40, 52, 56, 108, 124)
+
+# UTF-8, UTF-16 LE and UTF-16 BE byte order marks
+TEXT_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+# Bytes of a text file checked for UTF-8 by detect_encoding
+ENCODING_SAMPLE_SIZE = 1 << 16
+
+# Encoding of text files that have no byte order mark and are not UTF-8
+FALLBACK_ENCODING = "cp1252"
+
+
+# Source types of the GUI and the conversion functions standing for several formats
+FORMAT_GROUPS = {"img": IMAGE_FORMATS, "doc": ("doc", "docx")}
+
+
+def is_type(file_format: str | None, file_type: str) -> bool:
+    """
+    Tells whether a detected format is of a given file type: a format name (e.g. 'jpeg') or a group ('img', 'doc').
+    """
+    if file_type in FORMAT_GROUPS:
+        return file_format in FORMAT_GROUPS[file_type]
+    file_type = normalize(file_type)
+    if file_type in IMAGE_FORMATS:
+        # the image conversions accept any image, whatever button or extension it came from
+        return file_format in IMAGE_FORMATS
+    return file_format == file_type
+
+
+def normalize(fmt: str) -> str:
+    """
+    Returns the canonical name of a format or extension, e.g. 'jpg' for 'JPEG'.
+    """
+    fmt = fmt.lower().removeprefix(".")
+    return FORMAT_ALIASES.get(fmt, fmt)
+
+
+def extensions(fmt: str) -> tuple[str, ...]:
+    """
+    Returns the file extensions of a normalized format: its name and its aliases, e.g. ('jpg', 'jpeg').
+    """
+    return (fmt, *(alias for alias, name in FORMAT_ALIASES.items() if name == fmt))
+
+
+def detect_format(file_path: str, fallback_to_extension: bool = False) -> str | None:
+    """
+    Detects the format of a file from its first bytes.
+
+    Args:
+        file_path (str): The path to the file.
+        fallback_to_extension (bool): When the file cannot be read, return its normalized extension instead of None.
+
+    Returns:
+        str | None: A normalized format name ('png', 'jpg', 'gif', 'tiff', 'bmp', 'webp', 'pdf', 'doc', 'docx',
+            'xlsx', 'zip', 'mp4', 'mp3', 'txt', 'csv'), or None if the content is not recognized.
+    """
+    extension = normalize(file_path.rsplit(".", 1)[-1]) if "." in file_path else ""
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+    except OSError:
+        return (extension or None) if fallback_to_extension else None
+
+    return detect_head(head, extension)
+
+
+def detect_encoding(file_path: str) -> str:
+    """
+    Guesses the encoding of a text file from its byte order mark, else from whether its first ENCODING_SAMPLE_SIZE bytes
+    are valid UTF-8.
+
+    Returns:
+        str: A codec name for open(): 'utf-8-sig', 'utf-16', 'utf-8' or FALLBACK_ENCODING.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(file_path, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if sample.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # a multi-byte character cut by the end of the sample is still UTF-8
+        if e.start < len(sample) - 3 or e.reason != "unexpected end of data":
+            return FALLBACK_ENCODING
+    return "utf-8"
+
+
+def detect_head(head: bytes, extension: str = "") -> str | None:
+    """
+    Classifies the first bytes of a file. The normalized extension only tells text formats (txt, csv) apart.
+    """
+    if not head:
+        # an empty file is a blank text file when it is named like one
+        return extension if extension in TEXT_FORMATS else None
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if head.startswith((b"II*\x00", b"MM\x00*")):
+        return "tiff"
+    if (
+        head.startswith(b"BM")
+        and len(head) >= 26
+        and int.from_bytes(head[14:18], "little") in BMP_HEADER_SIZES
+    ):
+        return "bmp"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        # OLE2 compound file: legacy Office formats, of which only Word is supported
+        return "doc"
+    if head.startswith(b"PK\x03\x04"):
+        return _detect_zip(head, extension)
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head.startswith(TEXT_BOMS):
+        # checked before MP3 frame sync, which UTF-16 byte order marks resemble
+        return extension if extension in TEXT_FORMATS else "txt"
+    if _is_id3(head) or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if _is_text(head):
+        return extension if extension in TEXT_FORMATS else "txt"
+    return None
+
+
+def _detect_zip(head: bytes, extension: str) -> str:
+    """
+    Tells Office Open XML packages from plain zip archives by the part names visible in the head. The parts stored
+    first (`[Content_Types].xml`, `docProps/`...) are common to every Office format, so when no Word or Excel part
+    shows up the extension decides.
+    """
+    if b"word/" in head:
+        return "docx"
+    if b"xl/" in head:
+        return "xlsx"
+    if extension in ("docx", "xlsx"):
+        return extension
+    return "zip"
+
+
+def _is_id3(head: bytes) -> bool:
+    """
+    Tells an ID3v2 tag header from text starting with "ID3": version 2 to 4, unused flag bits clear and a syncsafe
+    size (7 bits per byte).
+    """
+    return (
+        head.startswith(b"ID3")
+        and len(head) >= 10
+        and head[3] in (2, 3, 4)
+        and head[4] != 0xFF
+        and head[5] & 0x0F == 0
+        and all(b < 0x80 for b in head[6:10])
+    )
+
+
+def _is_text(head: bytes) -> bool:
+    if not head or b"\x00" in head:
+        return False
+    try:
+        head.decode("utf-8")
+        return True
+    except UnicodeDecodeError as e:
+        # a multi-byte character cut by the end of the head
+        if e.start >= len(head) - 3 and e.reason == "unexpected end of data":
+            return True
+    # single-byte encodings: text unless control characters other than whitespace show up
+    return not any(b < 0x20 and b not in b"\t\n\r\f\x1b" for b in head)
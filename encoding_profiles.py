@@ -0,0 +1,62 @@
+"""
+Named encoder settings for the converters' writers.
+
+A profile maps each output format to the keyword arguments of its encoder: Pillow's save() options for images, and for
+PDF outputs the JPEG options of image pages plus the zlib level (compress_level) of compressed streams. The converters
+take a profile name through their `profile` option; without one they keep the encoders' defaults.
+
+    fast      the quickest writes: low zlib levels and fast WebP methods, for outputs that go over slow storage once
+    balanced  the encoders' default levels, with optimized JPEG Huffman tables (smaller files, same pixels)
+    smallest  the smallest files: highest zlib levels, progressive JPEG at a lower quality, slowest WebP method
+
+`python -m benchmarks.bench_profiles` reports the size and time of each profile on the benchmark corpus.
+"""
+
+PROFILES = {
+    "fast": {
+        "png": {"compress_level": 1},
+        "jpg": {"quality": 75},
+        "webp": {"quality": 80, "method": 0},
+        "tiff": {},
+        "pdf": {"quality": 75, "compress_level": 1},
+    },
+    "balanced": {
+        "png": {"compress_level": 6},
+        "jpg": {"quality": 75, "optimize": True},
+        "webp": {"quality": 80, "method": 4},
+        "tiff": {"compression": "tiff_lzw"},
+        "pdf": {"quality": 75, "optimize": True, "compress_level": 6},
+    },
+    "smallest": {
+        "png": {"compress_level": 9, "optimize": True},
+        "jpg": {"quality": 65, "optimize": True, "progressive": True},
+        "gif": {"optimize": True},
+        "webp": {"quality": 70, "method": 6},
+        "tiff": {"compression": "tiff_adobe_deflate"},
+        "pdf": {
+            "quality": 65,
+            "optimize": True,
+            "progressive": True,
+            "compress_level": 9,
+        },
+    },
+}
+
+
+def encoder_options(profile: str | None, output_format: str) -> dict | None:
+    """
+    Returns the encoder keyword arguments of a profile for an output format.
+
+    Args:
+        profile (str | None): A name from PROFILES, or None for the encoders' defaults.
+        output_format (str): The normalized output format (e.g., 'png', 'jpg', 'pdf').
+
+    Returns:
+        dict | None: The keyword arguments, empty without a profile or for formats the profile leaves at their
+            defaults; None if the profile is unknown.
+    """
+    if profile is None:
+        return {}
+    if profile not in PROFILES:
+        return None
+    return dict(PROFILES[profile].get(output_format, {}))
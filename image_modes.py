@@ -0,0 +1,64 @@
+"""
+Pixel mode handling for the image writers.
+
+Converting an image to another mode copies every pixel, so prepare_image only converts when the output format cannot
+store the mode of the decoded image: RGB photos, palette GIFs and transparent PNGs are saved as they are. Formats
+without an alpha channel get transparent images flattened onto FLATTEN_BACKGROUND instead of having their alpha dropped.
+"""
+
+# Modes each output format stores without conversion. GIF takes RGB and RGBA too: Pillow quantizes them to a palette,
+# keeping transparency, which it has to do from any other mode anyway. Likewise WebP only encodes RGB and RGBA, and
+# Pillow converts the other modes to one of them, keeping transparency, while saving.
+SAVE_MODES = {
+    "png": ("1", "L", "LA", "P", "RGB", "RGBA", "I;16"),
+    "gif": ("1", "L", "P", "RGB", "RGBA"),
+    "jpg": ("L", "RGB", "CMYK"),
+    "pdf": ("1", "L", "P", "RGB", "CMYK"),
+    "webp": ("1", "L", "LA", "P", "RGB", "RGBA"),
+    "tiff": ("1", "L", "LA", "P", "RGB", "RGBA", "CMYK", "I;16"),
+    "bmp": ("1", "L", "P", "RGB"),
+}
+
+# Output formats that keep transparency
+ALPHA_FORMATS = ("png", "gif", "webp", "tiff")
+
+# What transparent pixels become in formats without alpha: white, like the paper of a printed page
+FLATTEN_BACKGROUND = "white"
+
+
+def prepare_image(im, output_format: str):
+    """
+    Returns an image that can be saved in the output format: the image itself when its mode is stored as-is, else a
+    converted copy. Transparent images are flattened onto FLATTEN_BACKGROUND for formats without alpha.
+
+    Args:
+        im (PIL.Image.Image): The decoded image.
+        output_format (str): The normalized output format (e.g., 'png', 'jpg', 'pdf'). Formats not in SAVE_MODES are
+            taken to store RGB only.
+
+    Returns:
+        PIL.Image.Image: The image to save.
+    """
+    modes = SAVE_MODES.get(output_format, ("RGB",))
+    has_alpha = im.mode in ("RGBA", "LA", "PA") or (
+        im.mode == "P" and "transparency" in im.info
+    )
+    if has_alpha and output_format not in ALPHA_FORMATS:
+        im = _flatten(im)
+        has_alpha = False
+    if im.mode in modes:
+        return im
+    return im.convert("RGBA" if has_alpha else "RGB")
+
+
+def _flatten(im):
+    """
+    Composites a transparent image onto FLATTEN_BACKGROUND. Grayscale images stay grayscale.
+    """
+    from PIL import Image
+
+    if im.mode not in ("LA", "RGBA"):
+        im = im.convert("RGBA")
+    background = Image.new(im.mode[:-1], im.size, FLATTEN_BACKGROUND)
+    background.paste(im, mask=im.getchannel("A"))
+    return background
@@ -0,0 +1,289 @@
+"""
+Per-stage timing of conversions.
+
+The converters wrap each stage of their work in a span:
+
+    open    reading the input file header (and, for Word documents, the whole document)
+    decode  decoding the input pixels
+    convert color mode conversion and resizing
+    render  rasterizing PDF pages, laying out Word documents
+    encode  encoding and writing an output file: the image libraries write as they encode, so saves have no separate
+            write stage
+
+Finished spans are handed to the sinks added with add_sink(), and to those recording(sink, local=True) adds for the
+current thread or asyncio task only. With no sink, span() returns a shared do-nothing span: an instrumented conversion
+then costs one function call and two lookups per stage.
+
+Sinks only see the spans of their own process: the pages rendered by from_pdf workers (workers > 1) are not reported.
+
+Example:
+    from metrics import MemorySink, recording
+
+    with recording(MemorySink()) as sink:
+        convert_to_pdf("img", "scan.jpg", "")
+    print(sink.totals())
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_sinks = ()
+_sinks_lock = threading.Lock()
+# sinks of the current thread or task only
+_local_sinks = ContextVar("metrics_local_sinks", default=())
+
+
+class Span:
+    """
+    A timed stage of a conversion.
+
+    Attributes:
+        stage (str): The stage name: open, decode, convert, render or encode.
+        operation (str): The instrumented function, e.g. 'pdf.from_image'.
+        file (str | None): The file read or written by the stage. Its size is taken as the stage's byte count when the
+            span ends, unless add() set one.
+        bytes (int): The bytes read or written.
+        pages (int): The pages or images processed.
+        seconds (float): The duration of the stage, set when the span ends.
+        failed (bool): Whether the stage raised an exception.
+    """
+
+    __slots__ = ("stage", "operation", "file", "bytes", "pages", "seconds", "failed")
+
+    def __init__(self, stage: str, operation: str, file: str | None = None):
+        self.stage = stage
+        self.operation = operation
+        self.file = file
+        self.bytes = 0
+        self.pages = 0
+        self.seconds = 0.0
+        self.failed = False
+
+    def add(self, bytes: int = 0, pages: int = 0):
+        """
+        Adds to the byte and page counts of the span.
+        """
+        self.bytes += bytes
+        self.pages += pages
+
+    def __enter__(self):
+        self.seconds = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        import os
+
+        self.seconds = time.perf_counter() - self.seconds
+        self.failed = exc_type is not None
+        if self.file and not self.bytes:
+            try:
+                self.bytes = os.path.getsize(self.file)
+            except OSError:
+                pass
+        for sink in _sinks + _local_sinks.get():
+            sink.record(self)
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "operation": self.operation,
+            "seconds": self.seconds,
+            "bytes": self.bytes,
+            "pages": self.pages,
+            "failed": self.failed,
+        }
+
+
+class _NoSpan:
+    """
+    The span returned while no sink is added: it records nothing.
+    """
+
+    __slots__ = ()
+
+    def add(self, bytes: int = 0, pages: int = 0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage: str, operation: str, file: str | None = None) -> Span | _NoSpan:
+    """
+    Returns a context manager timing a stage of a conversion, to be used as `with span(...) as s:`.
+
+    Args:
+        stage (str): The stage name (see the module documentation).
+        operation (str): The instrumented function, e.g. 'image.from_pdf'.
+        file (str | None): The file the stage reads or writes, whose size is recorded when the stage ends.
+    """
+    if not _sinks and not _local_sinks.get():
+        return _NO_SPAN
+    return Span(stage, operation, file)
+
+
+def enabled() -> bool:
+    """
+    Returns whether spans are being recorded.
+    """
+    return bool(_sinks or _local_sinks.get())
+
+
+def add_sink(sink):
+    """
+    Starts handing finished spans to sink.record(span). Sinks are called on the thread that ran the stage.
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + (sink,)
+
+
+def remove_sink(sink):
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+@contextmanager
+def recording(sink, local: bool = False):
+    """
+    Adds sink for the duration of a with block, and yields it.
+
+    Args:
+        sink: The sink.
+        local (bool): Record only the spans of the current thread or asyncio task, e.g. to attribute them to one of
+            several conversions running at once.
+    """
+    if local:
+        token = _local_sinks.set(_local_sinks.get() + (sink,))
+        try:
+            yield sink
+        finally:
+            _local_sinks.reset(token)
+        return
+
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
+
+
+class MemorySink:
+    """
+    Aggregates spans in memory, by operation and stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, span: Span):
+        with self._lock:
+            totals = self._totals.setdefault(
+                (span.operation, span.stage),
+                {"count": 0, "seconds": 0.0, "bytes": 0, "pages": 0, "failures": 0},
+            )
+            totals["count"] += 1
+            totals["seconds"] += span.seconds
+            totals["bytes"] += span.bytes
+            totals["pages"] += span.pages
+            totals["failures"] += span.failed
+
+    def totals(self) -> dict[tuple[str, str], dict]:
+        """
+        Returns the span count, total seconds, bytes, pages and failures of each (operation, stage).
+        """
+        with self._lock:
+            return {key: dict(totals) for key, totals in self._totals.items()}
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+
+class JsonLinesSink:
+    """
+    Appends each span to a file as a JSON object on its own line, with the time it ended.
+
+    Args:
+        path (str): The file to append to.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1)
+
+    def record(self, span: Span):
+        import json
+
+        line = json.dumps({"time": time.time(), **span.as_dict()})
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PrometheusSink(MemorySink):
+    """
+    Aggregates spans like MemorySink and exposes them in the Prometheus text format, for a scrape endpoint or the
+    node_exporter textfile collector.
+
+    Args:
+        prefix (str): The prefix of the metric names.
+    """
+
+    # metric suffix, MemorySink total and help text
+    METRICS = (
+        ("stage_seconds_total", "seconds", "Time spent in conversion stages."),
+        ("stage_runs_total", "count", "Conversion stages run."),
+        ("stage_bytes_total", "bytes", "Bytes read or written by conversion stages."),
+        ("stage_pages_total", "pages", "Pages processed by conversion stages."),
+        ("stage_failures_total", "failures", "Conversion stages that raised."),
+    )
+
+    def __init__(self, prefix: str = "file_converter"):
+        super().__init__()
+        self.prefix = prefix
+
+    def render(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        totals = self.totals()
+        lines = []
+        for suffix, key, description in self.METRICS:
+            name = f"{self.prefix}_{suffix}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for (operation, stage), values in sorted(totals.items()):
+                lines.append(
+                    f'{name}{{operation="{operation}",stage="{stage}"}} {values[key]}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Writes the metrics to path, replacing the file at once so a collector never reads it half-written.
+        """
+        import os
+
+        with open(path + ".tmp", "w") as f:
+            f.write(self.render())
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,213 @@
+"""
+Structured outcome of a conversion.
+
+The conversion functions return 0 or -1 and print their errors. Run under collect(), the same call returns a
+ConversionResult instead: the files written, their page count and sizes, the time spent in each stage (see metrics)
+and, on failure, a typed ErrorCategory with the error message.
+
+Converters report into the collection of the calling thread or task through report_error() and produced(). Errors are
+printed only outside a collection, so the int API is unchanged and a batch or the service does not print every failure.
+
+Example:
+    from result import ErrorCategory, collect
+    from convert_to_image import from_pdf
+
+    result = collect(from_pdf, "book.pdf", "out/", "book", "png")
+    if result.error is ErrorCategory.NOT_FOUND:
+        ...
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Callable, NamedTuple
+
+
+class ErrorCategory(str, Enum):
+    """
+    Why a conversion failed.
+    """
+
+    # the input file does not exist
+    NOT_FOUND = "not-found"
+    # the input format, the target format or an option is not supported
+    UNSUPPORTED = "unsupported"
+    # the input is damaged or is not what its format claims
+    DECODE_FAILURE = "decode-failure"
+    TIMEOUT = "timeout"
+    CANCELLED = "cancelled"
+    # anything else, e.g. an unwritable output
+    FAILED = "failed"
+
+
+class ConversionResult(NamedTuple):
+    """
+    The outcome of a conversion.
+
+    Attributes:
+        input_path (str | list[str]): The path of the converted file, or the paths of the images of a merge.
+        outputs (list[str]): The paths of the files written, in page order for multi-page outputs. On failure, the
+            files written before the error, if any.
+        pages (int): The pages or images written, 0 when the converter does not count them (e.g. Word documents).
+        bytes_in (int): The size of the input file.
+        bytes_out (int): The total size of the outputs.
+        seconds (float): The wall time of the conversion.
+        stages (dict[str, float]): The seconds spent in each stage reported by the converter (see metrics).
+        error (ErrorCategory | None): The error category, None on success.
+        message (str): The error message, empty on success.
+    """
+
+    input_path: str | list[str]
+    outputs: list[str]
+    pages: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+    stages: dict[str, float] = {}
+    error: ErrorCategory | None = None
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def code(self) -> int:
+        """
+        The int the conversion functions return: 0 on success, -1 on failure.
+        """
+        return 0 if self.error is None else -1
+
+
+class _Collection:
+    """
+    What the converters of one collect() call reported. Also a metrics sink, for the stage timings.
+    """
+
+    def __init__(self):
+        self.outputs = []
+        self.pages = 0
+        self.stages = {}
+        self.error = None
+        self.message = ""
+        # the stage an exception escaped from, if any
+        self.failed_stage = None
+        # false while intermediate files are written
+        self.keep_outputs = True
+
+    def record(self, span):
+        self.stages[span.stage] = self.stages.get(span.stage, 0.0) + span.seconds
+        if span.failed:
+            self.failed_stage = span.stage
+
+    def fail(self, category: ErrorCategory, message: str):
+        # the first error is the cause; later ones are its consequences
+        if self.error is None:
+            self.error = category
+        if not self.message:
+            self.message = message
+
+
+_collection = ContextVar("conversion_collection", default=None)
+
+
+def report_error(category: ErrorCategory, message: str) -> int:
+    """
+    Records an error in the current collection, or prints it outside a collection.
+
+    Returns:
+        int: -1, so that a conversion function can `return report_error(...)`.
+    """
+    collection = _collection.get()
+    if collection is None:
+        print(message)
+    else:
+        collection.fail(category, message)
+    return -1
+
+
+def produced(path: str, pages: int = 0):
+    """
+    Records an output file written by the conversion, with the number of pages it holds.
+    """
+    collection = _collection.get()
+    if collection is not None and collection.keep_outputs:
+        if path not in collection.outputs:
+            collection.outputs.append(path)
+        collection.pages += pages
+
+
+@contextmanager
+def intermediate():
+    """
+    Marks the files produced in a with block as intermediate files of a chained conversion, not as its outputs.
+    """
+    collection = _collection.get()
+    if collection is None:
+        yield
+        return
+    keep_outputs = collection.keep_outputs
+    collection.keep_outputs = False
+    try:
+        yield
+    finally:
+        collection.keep_outputs = keep_outputs
+
+
+def collect(
+    convert: Callable[..., int], file_path: str | list[str], *args, **kwargs
+) -> ConversionResult:
+    """
+    Runs convert(file_path, *args, **kwargs), one of the int-returning conversion functions, and returns its outcome.
+
+    Exceptions are caught and categorized: a missing file is NOT_FOUND, a timeout TIMEOUT, a failure while opening,
+    decoding or rendering the input DECODE_FAILURE, anything else FAILED.
+
+    Returns:
+        ConversionResult: The outcome of the conversion.
+    """
+    import os
+    import subprocess
+    import time
+
+    from metrics import recording
+
+    collection = _Collection()
+    token = _collection.set(collection)
+    start = time.perf_counter()
+    try:
+        with recording(collection, local=True):
+            code = convert(file_path, *args, **kwargs)
+        if code == -1:
+            collection.fail(ErrorCategory.FAILED, "conversion failed")
+    except FileNotFoundError as e:
+        collection.fail(ErrorCategory.NOT_FOUND, str(e))
+    except (TimeoutError, subprocess.TimeoutExpired) as e:
+        collection.fail(ErrorCategory.TIMEOUT, str(e) or "conversion timed out")
+    except Exception as e:
+        # an input that cannot be opened, decoded or rendered is damaged
+        if collection.failed_stage in ("open", "decode", "render"):
+            collection.fail(ErrorCategory.DECODE_FAILURE, repr(e))
+        else:
+            collection.fail(ErrorCategory.FAILED, repr(e))
+    finally:
+        _collection.reset(token)
+    seconds = time.perf_counter() - start
+
+    def size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    return ConversionResult(
+        file_path,
+        collection.outputs,
+        collection.pages,
+        sum(map(size, file_path if isinstance(file_path, list) else [file_path])),
+        sum(map(size, collection.outputs)),
+        seconds,
+        collection.stages,
+        collection.error,
+        collection.message,
+    )
@@ -0,0 +1,22 @@
+"""
+Base TestCase of the tests that read and write files in a temporary directory.
+"""
+
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    Gives each test an empty temporary directory, self.dir, removed once the test and its tearDown are done.
+    Subclasses that define setUp call super().setUp() first.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = self.tmp.name
+
+    def path(self, *names):
+        return os.path.join(self.dir, *names)
@@ -0,0 +1,166 @@
+import multiprocessing
+import os
+import signal
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from atomic_output import PageManifest, atomic_output, partial_path
+from convert_to_image import from_image, from_pdf
+from result import ErrorCategory, collect
+from tempdir_case import TempDirTestCase
+
+# The conversions that get killed run in forked processes, which inherit the patches of the test.
+FORK = multiprocessing.get_context("fork")
+
+PAGES = 6
+
+
+def save_and_die(die_on: str):
+    """
+    Returns a replacement of Image.save that dies halfway through writing files whose path contains die_on.
+    """
+    save = Image.Image.save
+
+    def dying_save(image, path, *args, **kwargs):
+        if die_on in path:
+            with open(path, "wb") as f:
+                f.write(b"\x89PNG\r\n")
+            os.kill(os.getpid(), signal.SIGKILL)
+        save(image, path, *args, **kwargs)
+
+    return dying_save
+
+
+def render(pdf_file, dpi, first_page, last_page):
+    return [
+        Image.new("L", (8, 8), page * 10) for page in range(first_page, last_page + 1)
+    ]
+
+
+class TestAtomicOutput(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pdf = self.path("book.pdf")
+        with open(self.pdf, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+
+    def run_killed(self, target, *args):
+        process = FORK.Process(target=target, args=args)
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, -signal.SIGKILL)
+
+    def test_atomic_output(self):
+        output = self.path("out.txt")
+        with atomic_output(output) as partial:
+            self.assertEqual(partial, self.path(".out.partial.txt"))
+            with open(partial, "w") as f:
+                f.write("done")
+        with self.assertRaises(ValueError):
+            with atomic_output(output) as partial:
+                with open(partial, "w") as f:
+                    f.write("half")
+                raise ValueError
+        with open(output) as f:
+            self.assertEqual(f.read(), "done")
+        self.assertEqual(sorted(os.listdir(self.dir)), ["book.pdf", "out.txt"])
+
+    def test_killed_save_keeps_previous_output(self):
+        source = self.path("photo.png")
+        Image.new("RGB", (8, 8), "red").save(source)
+        output = self.path("photo.gif")
+        with open(output, "wb") as f:
+            f.write(b"previous")
+
+        with patch("PIL.Image.Image.save", save_and_die("photo")):
+            self.run_killed(from_image, source, output)
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"previous")
+
+        # the next conversion overwrites the partial file
+        self.assertEqual(from_image(source, output), 0)
+        with Image.open(output) as im:
+            self.assertEqual(im.format, "GIF")
+        self.assertFalse(os.path.exists(partial_path(output)))
+
+    @patch("pdf2image.pdfinfo_from_path", return_value={"Pages": PAGES})
+    @patch("pdf2image.convert_from_path", side_effect=render)
+    def test_killed_pdf_conversion_resumes(self, mock_convert_from_path, _):
+        output_path = self.dir + "/"
+        with patch("PIL.Image.Image.save", save_and_die("book_4")):
+            self.run_killed(from_pdf, self.pdf, output_path, "book", "png", 2)
+        self.assertTrue(os.path.exists(self.path("book_3.png")))
+        self.assertFalse(os.path.exists(self.path("book_4.png")))
+
+        # a page changed since it was recorded is rendered again
+        with open(self.path("book_2.png"), "ab") as f:
+            f.write(b"\0")
+        mock_convert_from_path.reset_mock()
+
+        self.assertEqual(from_pdf(self.pdf, output_path, "book", "png", 2), 0)
+        self.assertEqual(
+            [
+                (c.kwargs["first_page"], c.kwargs["last_page"])
+                for c in mock_convert_from_path.call_args_list
+            ],
+            [(2, 2), (4, 5), (6, 6)],
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.dir)),
+            ["book.pdf"] + [f"book_{page}.png" for page in range(1, PAGES + 1)],
+        )
+        for page in range(1, PAGES + 1):
+            with Image.open(self.path(f"book_{page}.png")) as im:
+                self.assertEqual(im.getpixel((0, 0)), page * 10)
+
+    @patch("pdf2image.pdfinfo_from_path", return_value={"Pages": PAGES})
+    @patch("pdf2image.convert_from_path", side_effect=render)
+    def test_killed_worker_pages_are_kept(self, mock_convert_from_path, _):
+        output_path = self.dir + "/"
+        with patch("PIL.Image.Image.save", save_and_die("book_5")):
+            result = collect(from_pdf, self.pdf, output_path, "book", "png", workers=2)
+        self.assertEqual(result.error, ErrorCategory.FAILED)
+        self.assertIn("worker died", result.message)
+
+        # page 4 was complete when the worker rendering pages 4 to 6 died
+        mock_convert_from_path.reset_mock()
+        self.assertEqual(from_pdf(self.pdf, output_path, "book", "png"), 0)
+        rendered = {
+            page
+            for c in mock_convert_from_path.call_args_list
+            for page in range(c.kwargs["first_page"], c.kwargs["last_page"] + 1)
+        }
+        self.assertNotIn(4, rendered)
+        self.assertIn(5, rendered)
+        self.assertEqual(len(os.listdir(self.dir)), PAGES + 1)
+
+    def test_manifest_belongs_to_input_and_parameters(self):
+        page_files = {1: self.path("a_1.png"), 2: self.path("a_2.png")}
+        for page_file in page_files.values():
+            with open(page_file, "wb") as f:
+                f.write(b"page")
+        manifest = PageManifest(self.path("a.manifest"), self.pdf, dpi=72)
+        self.assertEqual(manifest.resume(page_files), set())
+        manifest.add(1, page_files[1])
+        manifest.add(2, page_files[2])
+        # a line cut short by a crash
+        with open(manifest.path, "a") as f:
+            f.write('{"page": 3, "si')
+
+        self.assertEqual(
+            PageManifest(manifest.path, self.pdf, dpi=72).resume(page_files), {1, 2}
+        )
+        self.assertEqual(
+            PageManifest(manifest.path, self.pdf, dpi=200).resume(page_files), set()
+        )
+        # the manifest was restarted for the new DPI
+        self.assertEqual(
+            PageManifest(manifest.path, self.pdf, dpi=72).resume(page_files), set()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
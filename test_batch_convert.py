@@ -0,0 +1,221 @@
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from PIL import Image
+
+from batch_convert import collect_files, convert_batch
+from result import ErrorCategory
+from tempdir_case import TempDirTestCase
+
+
+@patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor)
+class TestBatchConvert(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for name in ["a.png", "b.jpg", "c.gif"]:
+            Image.new("RGB", (8, 8), "red").save(self.path(name))
+        os.mkdir(self.path("sub"))
+        Image.new("RGB", (8, 8), "blue").save(self.path("sub", "d.png"))
+        with open(self.path("notes.txt"), "w") as f:
+            f.write("not an image")
+
+    def test_collect_files_directory(self):
+        self.assertEqual(
+            collect_files(self.dir),
+            [
+                self.path("a.png"),
+                self.path("b.jpg"),
+                self.path("c.gif"),
+                self.path("notes.txt"),
+            ],
+        )
+        self.assertIn(
+            self.path("sub", "d.png"), collect_files(self.dir, recursive=True)
+        )
+
+    def test_collect_files_glob_and_list(self):
+        self.assertEqual(
+            collect_files([self.path("**", "*.png"), self.path("b.jpg")]),
+            [self.path("a.png"), self.path("b.jpg"), self.path("sub", "d.png")],
+        )
+
+    def test_convert_batch_to_pdf(self):
+        results = {
+            r.file_path: r for r in convert_batch(self.path("*"), "pdf", workers=2)
+        }
+        self.assertEqual(len(results), 4)
+        for name in ["a.png", "b.jpg", "c.gif"]:
+            output = self.path(name.split(".")[0] + ".pdf")
+            result = results[self.path(name)]
+            self.assertEqual(result.status, "converted")
+            self.assertEqual(result.outputs, [output])
+            self.assertTrue(os.path.exists(output))
+        self.assertEqual(results[self.path("notes.txt")].status, "converted")
+
+    def test_convert_batch_skips_up_to_date_outputs(self):
+        first = list(convert_batch([self.path("a.png"), self.path("b.jpg")], "gif"))
+        self.assertEqual({r.status for r in first}, {"converted"})
+
+        # touching an input makes it out of date again
+        later = time.time() + 10
+        os.utime(self.path("b.jpg"), (later, later))
+
+        second = {
+            r.file_path: r.status
+            for r in convert_batch([self.path("a.png"), self.path("b.jpg")], "gif")
+        }
+        self.assertEqual(
+            second, {self.path("a.png"): "skipped", self.path("b.jpg"): "converted"}
+        )
+
+        forced = list(convert_batch(self.path("a.png"), "gif", force=True))
+        self.assertEqual(forced[0].status, "converted")
+
+    def test_convert_batch_outputs_of_frames_and_neighbours(self):
+        Image.new("RGB", (8, 8)).save(self.path("b_1.jpg"))
+        frames = [Image.new("RGB", (8, 8), color) for color in ("red", "blue")]
+        frames[0].save(self.path("anim.gif"), save_all=True, append_images=frames[1:])
+        sources = [self.path(name) for name in ("b.jpg", "b_1.jpg", "anim.gif")]
+        list(convert_batch(sources, "png"))
+
+        results = {r.file_path: r for r in convert_batch(sources, "png")}
+        self.assertEqual({r.status for r in results.values()}, {"skipped"})
+        # b_1.png is the output of b_1.jpg, not a page of b.jpg
+        self.assertEqual(results[self.path("b.jpg")].outputs, [self.path("b.png")])
+        self.assertEqual(
+            results[self.path("anim.gif")].outputs,
+            [self.path("anim_1.png"), self.path("anim_2.png")],
+        )
+
+        # a missing frame makes the animation out of date again
+        os.remove(self.path("anim_2.png"))
+        (result,) = convert_batch(self.path("anim.gif"), "png")
+        self.assertEqual(result.status, "converted")
+
+    def test_convert_batch_counts_pages_of_converted_files_only(self):
+        for name in ("new.pdf", "doc.pdf"):
+            with open(self.path(name), "wb") as f:
+                f.write(b"%PDF-1.4\n")
+        Image.new("RGB", (8, 8)).save(self.path("doc_1.png"))
+        old = time.time() - 10
+        os.utime(self.path("doc_1.png"), (old, old))
+
+        with (
+            patch("batch_convert._page_count") as mock_page_count,
+            patch("batch_convert._convert_one") as mock_convert_one,
+        ):
+            # never converted, then changed since its conversion
+            list(convert_batch(self.path("new.pdf"), "png", workers=1))
+            list(convert_batch(self.path("doc.pdf"), "png", workers=1))
+        mock_page_count.assert_not_called()
+        self.assertEqual(mock_convert_one.call_count, 2)
+
+    def test_convert_batch_same_type_is_skipped(self):
+        results = list(convert_batch(self.path("a.png"), "png"))
+        self.assertEqual(results[0].status, "skipped")
+
+        # the content decides, not the extension
+        Image.new("RGB", (8, 8)).save(self.path("e.jpeg"))
+        (result,) = convert_batch(self.path("e.jpeg"), "jpg")
+        self.assertEqual(
+            (result.status, result.outputs), ("skipped", [self.path("e.jpeg")])
+        )
+
+        Image.new("RGB", (8, 8)).save(self.path("png.jpg"), "PNG")
+        (result,) = convert_batch(self.path("png.jpg"), "jpg")
+        self.assertEqual(result.status, "converted")
+        with Image.open(self.path("png.jpg")) as im:
+            self.assertEqual(im.format, "JPEG")
+
+    def test_convert_batch_reuses_cached_outputs(self):
+        cache_dir = self.path("cache")
+        first = list(convert_batch(self.path("a.png"), "pdf", cache_dir=cache_dir))
+        self.assertEqual(first[0].status, "converted")
+
+        # the same content under another name is served from the cache
+        os.mkdir(self.path("copy"))
+        with (
+            open(self.path("a.png"), "rb") as f,
+            open(self.path("copy", "a.png"), "wb") as g,
+        ):
+            g.write(f.read())
+
+        second = list(
+            convert_batch(self.path("copy", "a.png"), "pdf", cache_dir=cache_dir)
+        )
+        self.assertEqual(second[0].status, "cached")
+        self.assertEqual(second[0].outputs, [self.path("copy", "a.pdf")])
+        with (
+            open(self.path("a.pdf"), "rb") as f,
+            open(self.path("copy", "a.pdf"), "rb") as g,
+        ):
+            self.assertEqual(f.read(), g.read())
+
+    def test_convert_batch_never_rewrites_cached_outputs(self):
+        cache_dir = self.path("cache")
+        list(convert_batch(self.path("a.png"), "pdf", cache_dir=cache_dir))
+        with open(self.path("a.pdf"), "rb") as f:
+            cached = f.read()
+
+        # new content: a.pdf, hardlinked to the cache entry, is converted over
+        Image.new("RGB", (16, 16), "green").save(self.path("a.png"))
+        (result,) = convert_batch(
+            self.path("a.png"), "pdf", force=True, cache_dir=cache_dir
+        )
+        self.assertEqual(result.status, "converted")
+
+        Image.new("RGB", (8, 8), "red").save(self.path("sub", "a.png"))
+        (result,) = convert_batch(self.path("sub", "a.png"), "pdf", cache_dir=cache_dir)
+        self.assertEqual(result.status, "cached")
+        with open(self.path("sub", "a.pdf"), "rb") as f:
+            self.assertEqual(f.read(), cached)
+
+    def test_convert_batch_rejects_bad_inputs_before_converting(self):
+        with open(self.path("broken.png"), "wb") as f:
+            f.write(bytes(range(32)))
+        with open(self.path("archive.zip"), "wb") as f:
+            f.write(b"PK\x03\x04" + bytes(26) + b"data.bin")
+        Image.new("RGB", (8, 8)).save(self.path("mislabeled.gif"), "PNG")
+
+        with patch("batch_convert._convert_one") as mock_convert_one:
+            results = list(
+                convert_batch(
+                    [self.path("broken.png"), self.path("archive.zip")],
+                    "pdf",
+                    workers=1,
+                )
+            )
+        mock_convert_one.assert_not_called()
+        self.assertEqual([r.status for r in results], ["rejected", "rejected"])
+        errors = {r.file_path: r.error for r in results}
+        self.assertEqual(errors[self.path("broken.png")], "unrecognized file format")
+        self.assertEqual(
+            errors[self.path("archive.zip")], "no conversion from zip to pdf"
+        )
+        self.assertEqual({r.category for r in results}, {ErrorCategory.UNSUPPORTED})
+
+        (result,) = convert_batch([self.path("gone.png")], "pdf")
+        self.assertEqual(result.status, "rejected")
+        self.assertEqual(result.error, f"{self.path('gone.png')} not found")
+        self.assertEqual(result.category, ErrorCategory.NOT_FOUND)
+
+        results = list(convert_batch(self.path("mislabeled.gif"), "jpg"))
+        self.assertEqual(results[0].status, "converted")
+
+    def test_convert_batch_reports_failure_category(self):
+        Image.new("RGB", (8, 8)).save(self.path("truncated.png"))
+        with open(self.path("truncated.png"), "r+b") as f:
+            f.truncate(40)
+
+        (result,) = convert_batch(self.path("truncated.png"), "jpg", workers=1)
+        self.assertEqual(result.status, "failed")
+        self.assertEqual(result.category, ErrorCategory.DECODE_FAILURE)
+        self.assertTrue(result.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
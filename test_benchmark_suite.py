@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.corpus import make_corpus
+from benchmarks.suite import compare
+
+
+def results(scale=1.0, **cases):
+    return {"seed": 0, "scale": scale, "cases": cases}
+
+
+def ok(seconds, peak_rss_mib=100.0):
+    return {"status": "ok", "seconds": seconds, "peak_rss_mib": peak_rss_mib}
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_compare_flags_regressions(self):
+        baseline = results(
+            fast=ok(1.0), heavy=ok(1.0), broken=ok(1.0), new_skip=ok(1.0)
+        )
+        current = results(
+            fast=ok(1.15),
+            heavy=ok(0.9, 150.0),
+            broken={"status": "failed", "reason": "RuntimeError()"},
+            new_skip={"status": "skipped", "reason": "pdftoppm not available"},
+            added=ok(5.0),
+        )
+
+        regressions = compare(current, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("heavy: peak RSS"))
+        self.assertTrue(regressions[1].startswith("broken: failed"))
+        self.assertEqual(len(compare(current, baseline, tolerance=0.1)), 3)
+
+    def test_compare_rejects_other_corpus(self):
+        self.assertEqual(len(compare(results(0.1), results(1.0))), 1)
+
+    def test_corpus_is_reproducible(self):
+        contents = []
+        for _ in range(2):
+            with tempfile.TemporaryDirectory() as tmp:
+                corpus = make_corpus(tmp, seed=1, scale=0.01)
+                files = {}
+                for name, path in corpus.items():
+                    for p in path if isinstance(path, list) else [path]:
+                        if isinstance(p, str):
+                            with open(p, "rb") as f:
+                                files[os.path.basename(p)] = f.read()
+                contents.append(files)
+
+        self.assertEqual(contents[0], contents[1])
+        self.assertIn("report.docx", contents[0])
+        self.assertEqual(corpus["pages_of/document.pdf"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import unittest
+
+from conversion_cache import ConversionCache
+from tempdir_case import TempDirTestCase
+
+
+class TestConversionCache(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = ConversionCache(self.path("cache"))
+
+    def write(self, name, data):
+        path = self.path(name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_key_depends_on_content_and_params(self):
+        a = self.write("a.pdf", b"same")
+        b = self.write("b.pdf", b"same")
+        c = self.write("c.pdf", b"other")
+
+        self.assertEqual(
+            self.cache.key(a, output_type="png"), self.cache.key(b, output_type="png")
+        )
+        self.assertNotEqual(
+            self.cache.key(a, output_type="png"), self.cache.key(c, output_type="png")
+        )
+        self.assertNotEqual(
+            self.cache.key(a, output_type="png"),
+            self.cache.key(a, output_type="png", dpi=300),
+        )
+
+    def test_fetch_recreates_outputs(self):
+        source = self.write("doc.pdf", b"pdf")
+        outputs = [
+            self.write("doc_1.png", b"page 1"),
+            self.write("doc_2.png", b"page 2"),
+        ]
+        key = self.cache.key(source, output_type="png")
+
+        self.assertIsNone(self.cache.fetch(key, self.path("doc")))
+        self.cache.store(key, outputs, self.path("doc"))
+
+        os.mkdir(self.path("copy"))
+        stem = self.path("copy", "again")
+        fetched = self.cache.fetch(key, stem)
+        self.assertEqual(fetched, [stem + "_1.png", stem + "_2.png"])
+        with open(fetched[1], "rb") as f:
+            self.assertEqual(f.read(), b"page 2")
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual((stats["entries"], stats["bytes"]), (1, 12))
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 25
+        keys = []
+        for i in range(3):
+            source = self.write(f"{i}.png", bytes([i]))
+            output = self.write(f"{i}.pdf", b"x" * 10)
+            keys.append(self.cache.key(source, output_type="pdf"))
+            self.cache.store(keys[-1], [output], self.path(str(i)))
+            # make the entries' last use times distinct
+            os.utime(os.path.join(self.cache._entry(keys[-1]), "manifest.json"), (i, i))
+            if i == 1:
+                # using the first entry makes the second one the least recently used
+                self.assertIsNotNone(self.cache.fetch(keys[0], self.path("0")))
+
+        stem = self.path("out")
+        self.assertIsNotNone(self.cache.fetch(keys[0], stem))
+        self.assertIsNone(self.cache.fetch(keys[1], stem))
+        self.assertIsNotNone(self.cache.fetch(keys[2], stem))
+
+    def test_invalidate_by_params(self):
+        source = self.write("a.pdf", b"pdf")
+        stem = self.path("a")
+        for output_type in ["png", "jpg"]:
+            output = self.write(f"a.{output_type}", b"image")
+            key = self.cache.key(source, output_type=output_type)
+            self.cache.store(key, [output], stem, output_type=output_type)
+
+        self.assertEqual(self.cache.invalidate(output_type="png"), 1)
+        self.assertIsNone(
+            self.cache.fetch(self.cache.key(source, output_type="png"), stem)
+        )
+        self.assertIsNotNone(
+            self.cache.fetch(self.cache.key(source, output_type="jpg"), stem)
+        )
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from conversion_service import ConversionService, request
+from result import ConversionResult
+from tempdir_case import TempDirTestCase
+
+
+def fake_convert_file(file_path, target, output_file="", progress=None, **options):
+    if "slow" in file_path:
+        time.sleep(0.5)
+    for page in (1, 2):
+        progress(page, 2)
+    if "crash" in file_path:
+        os._exit(1)
+    return ConversionResult(file_path, [f"{file_path}.{target}"], 2)
+
+
+# Worker processes are forked, so they inherit the patches active when the service starts.
+FORK = multiprocessing.get_context("fork")
+
+
+class TestConversionService(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.socket = self.path("converter.sock")
+
+    def run_service(self, scenario, **options):
+        async def run():
+            service = ConversionService(mp_context=FORK, **options)
+            await service.start(path=self.socket)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+
+        return asyncio.run(run())
+
+    def test_converts_and_polls(self):
+        source = self.path("a.png")
+        Image.new("RGB", (8, 8), "red").save(source)
+
+        async def scenario(service):
+            status, (job,) = await request(
+                self.socket, "POST", "/jobs", {"file": source, "target": "gif"}
+            )
+            self.assertEqual(status, 202)
+            for _ in range(500):
+                _, (job,) = await request(self.socket, "GET", f"/jobs/{job['id']}")
+                if job["status"] in ("done", "failed"):
+                    return job
+                await asyncio.sleep(0.01)
+
+        job = self.run_service(scenario, workers=1)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"]["outputs"], [source[:-4] + ".gif"])
+        self.assertTrue(os.path.exists(source[:-4] + ".gif"))
+
+    @patch("converter_registry.convert_file", fake_convert_file)
+    def test_streams_status_changes(self):
+        async def scenario(service):
+            _, (job,) = await request(
+                self.socket, "POST", "/jobs", {"file": "slow.pdf", "target": "png"}
+            )
+            return await request(self.socket, "GET", f"/jobs/{job['id']}/events")
+
+        status, events = self.run_service(scenario, workers=1)
+        self.assertEqual(status, 200)
+        self.assertEqual(events[-1]["status"], "done")
+        self.assertEqual(events[-1]["result"]["outputs"], ["slow.pdf.png"])
+        self.assertIn([2, 2], [event["progress"] for event in events])
+
+    @patch("converter_registry.convert_file", fake_convert_file)
+    def test_bounded_queue_and_cancel(self):
+        async def scenario(service):
+            statuses, jobs = [], []
+            for i in range(4):
+                status, (job,) = await request(
+                    self.socket,
+                    "POST",
+                    "/jobs",
+                    {"file": f"slow{i}.pdf", "target": "png"},
+                )
+                statuses.append(status)
+                jobs.append(job)
+                # let the dispatcher take the first job off the queue
+                await asyncio.sleep(0.1)
+            cancelled = await request(self.socket, "DELETE", f"/jobs/{jobs[2]['id']}")
+            running = await request(self.socket, "DELETE", f"/jobs/{jobs[0]['id']}")
+            _, health = await request(self.socket, "GET", "/health")
+            return statuses, cancelled, running, health
+
+        statuses, cancelled, running, (health,) = self.run_service(
+            scenario, workers=1, queue_size=2
+        )
+        self.assertEqual(statuses, [202, 202, 202, 503])
+        self.assertEqual(cancelled[0], 200)
+        self.assertEqual(cancelled[1][0]["status"], "cancelled")
+        self.assertEqual(running[0], 409)
+        self.assertEqual(health["running"], 1)
+
+    @patch("converter_registry.convert_file", fake_convert_file)
+    def test_worker_crash_fails_job_and_service_recovers(self):
+        async def scenario(service):
+            results = []
+            for name in ("crash.pdf", "after.pdf"):
+                _, (job,) = await request(
+                    self.socket, "POST", "/jobs", {"file": name, "target": "png"}
+                )
+                _, events = await request(
+                    self.socket, "GET", f"/jobs/{job['id']}/events"
+                )
+                results.append(events[-1]["status"])
+            return results
+
+        self.assertEqual(self.run_service(scenario, workers=1), ["failed", "done"])
+
+    def test_bad_requests(self):
+        async def scenario(service):
+            return [
+                (await request(self.socket, *call))[0]
+                for call in [
+                    ("POST", "/jobs", {"file": "a.png"}),
+                    ("POST", "/jobs", {"file": "a.png", "target": "exe"}),
+                    ("GET", "/jobs/unknown"),
+                    ("PUT", "/health"),
+                ]
+            ]
+
+        self.assertEqual(self.run_service(scenario, workers=1), [400, 400, 404, 404])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from PIL import Image
+
+from convert_cli import STARTUP_BUDGET_SECONDS, main
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_python(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+class TestConvertCli(unittest.TestCase):
+
+    def test_startup_time_budget(self):
+        # best of a few runs, to keep a busy machine from failing the check
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "convert_cli.py", "--help"],
+                cwd=HERE,
+                capture_output=True,
+                check=True,
+            )
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), STARTUP_BUDGET_SECONDS)
+
+    def test_startup_imports_no_gui_or_backend(self):
+        loaded = run_python(
+            "import sys, convert_cli\n"
+            "convert_cli.parse_args(['--to', 'pdf', 'a.png'])\n"
+            "print(' '.join(sys.modules))"
+        ).split()
+        for module in ["tkinter", "ttkthemes", "PIL", "pdf2image", "spire"]:
+            self.assertNotIn(module, loaded)
+
+    def test_image_conversion_imports_only_pil(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            image = os.path.join(tmp, "a.png")
+            Image.new("RGB", (4, 4)).save(image)
+            loaded = run_python(
+                "import sys, convert_cli\n"
+                f"assert convert_cli.main(['--to', 'pdf', {image!r}]) == 0\n"
+                "print(' '.join(m.split('.')[0] for m in sys.modules))"
+            ).split()
+        self.assertIn("PIL", loaded)
+        for module in ["tkinter", "ttkthemes", "pdf2image", "spire"]:
+            self.assertNotIn(module, loaded)
+
+    def test_main_converts_many_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["a.png", "b.gif"]:
+                Image.new("RGB", (4, 4)).save(os.path.join(tmp, name))
+
+            self.assertEqual(main(["--to", "jpg", os.path.join(tmp, "*")]), 0)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "a.jpg")))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "b.jpg")))
+
+    def test_main_reports_failure(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = os.path.join(tmp, "data.xyz")
+            with open(data, "wb") as f:
+                f.write(bytes(range(32)))
+
+            self.assertEqual(main(["--to", "pdf", data]), 1)
+
+    def test_main_merges_images_in_argument_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, size in [("a.jpg", (10, 10)), ("b.jpg", (20, 20))]:
+                Image.new("RGB", size).save(os.path.join(tmp, name))
+            output = os.path.join(tmp, "merged.pdf")
+
+            self.assertEqual(
+                main(
+                    [
+                        "--to",
+                        "pdf",
+                        "--merge",
+                        output,
+                        os.path.join(tmp, "b.jpg"),
+                        os.path.join(tmp, "a.jpg"),
+                    ]
+                ),
+                0,
+            )
+            with open(output, "rb") as f:
+                pdf = f.read()
+
+        self.assertLess(
+            pdf.index(b"/MediaBox [0 0 20 20]"), pdf.index(b"/MediaBox [0 0 10 10]")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
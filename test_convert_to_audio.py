@@ -0,0 +1,167 @@
+import ast
+import os
+import stat
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import convert_to_audio
+from convert_to_audio import convert_to_audio as convert, from_video
+from tempdir_case import TempDirTestCase
+
+# Stand-ins for ffprobe and ffmpeg: ffprobe reports the codec in $FAKE_CODEC, ffmpeg records its arguments, reports
+# progress over 4 seconds and writes the output file (or fails when $FAKE_FAIL is set).
+FAKE_FFPROBE = """
+import json, os
+print(json.dumps({
+    "streams": [{"codec_name": os.environ["FAKE_CODEC"]}] if os.environ["FAKE_CODEC"] else [],
+    "format": {"duration": "4.000000"},
+}))
+"""
+
+FAKE_FFMPEG = """
+import os, sys, time
+with open(os.environ["FAKE_ARGS"], "a") as f:
+    f.write(repr(sys.argv[1:]) + "\\n")
+if os.environ.get("FAKE_FAIL"):
+    sys.stderr.write("Invalid data found when processing input\\n")
+    sys.exit(1)
+with open(sys.argv[-1], "wb") as f:
+    f.write(b"ID3")
+    for second in range(1, 5):
+        print(f"out_time_us={second * 1000000}\\nout_time=00:00:0{second}.000000", flush=True)
+        print("progress=continue" if second < 4 else "progress=end", flush=True)
+        time.sleep(float(os.environ.get("FAKE_DELAY", "0")))
+"""
+
+
+class TestConvertToAudio(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        bin_dir = self.path("bin")
+        os.mkdir(bin_dir)
+        for name, source in [("ffprobe", FAKE_FFPROBE), ("ffmpeg", FAKE_FFMPEG)]:
+            path = os.path.join(bin_dir, name)
+            with open(path, "w") as f:
+                f.write(f"#!{sys.executable}\n{source}")
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+        self.args_file = self.path("args.txt")
+        self.env = patch.dict(
+            os.environ,
+            {"PATH": bin_dir, "FAKE_CODEC": "aac", "FAKE_ARGS": self.args_file},
+        )
+        self.env.start()
+
+        self.video = self.path("clip.mp4")
+        with open(self.video, "wb") as f:
+            f.write(b"\x00\x00\x00\x20ftypisom" + bytes(64))
+        self.output = self.path("clip.mp3")
+
+    def tearDown(self):
+        self.env.stop()
+
+    def ffmpeg_args(self):
+        with open(self.args_file) as f:
+            return [ast.literal_eval(line) for line in f]
+
+    def test_from_video_reencodes_and_reports_progress(self):
+        reported = []
+
+        result = from_video(
+            self.video, self.output, progress=lambda *p: reported.append(p)
+        )
+        self.assertEqual(result, 0)
+        self.assertTrue(os.path.exists(self.output))
+        (args,) = self.ffmpeg_args()
+        self.assertIn("libmp3lame", args)
+        self.assertEqual(args[args.index("-b:a") + 1], "192k")
+        self.assertEqual(args[args.index("-progress") + 1], "pipe:1")
+        self.assertEqual(
+            reported, [(s * 1000000, 4000000) for s in (1, 2, 3, 4)] + [(4000000,) * 2]
+        )
+
+    def test_from_video_copies_compatible_audio(self):
+        os.environ["FAKE_CODEC"] = "mp3"
+
+        self.assertEqual(from_video(self.video, self.output), 0)
+        self.assertEqual(from_video(self.video, self.output, bitrate="96k"), 0)
+        copied, reencoded = self.ffmpeg_args()
+        self.assertEqual(copied[copied.index("-c:a") + 1], "copy")
+        self.assertNotIn("-b:a", copied)
+        self.assertEqual(reencoded[reencoded.index("-b:a") + 1], "96k")
+
+    def test_from_video_cancel_removes_output(self):
+        os.environ["FAKE_DELAY"] = "0.2"
+
+        result = from_video(self.video, self.output, progress=lambda done, total: False)
+        self.assertEqual(result, -1)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_from_video_failures(self):
+        os.environ["FAKE_FAIL"] = "1"
+        self.assertEqual(from_video(self.video, self.output), -1)
+        self.assertFalse(os.path.exists(self.output))
+
+        os.environ["FAKE_CODEC"] = ""
+        self.assertEqual(from_video(self.video, self.output), -1)
+
+        self.assertEqual(from_video(self.video, self.output + ".wav"), -1)
+        self.assertEqual(from_video("example.png", self.output), -1)
+
+        os.environ["PATH"] = ""
+        self.assertEqual(from_video(self.video, self.output), -1)
+
+    def test_concurrency_limit(self):
+        os.environ["FAKE_DELAY"] = "0.05"
+        run_ffmpeg = convert_to_audio._run_ffmpeg
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def counting_run_ffmpeg(*args):
+            with lock:
+                running.append(args)
+                peak.append(len(running))
+            try:
+                return run_ffmpeg(*args)
+            finally:
+                with lock:
+                    running.remove(args)
+
+        results = []
+        convert_to_audio.set_concurrency_limit(2)
+        try:
+            with patch("convert_to_audio._run_ffmpeg", counting_run_ffmpeg):
+                threads = [
+                    threading.Thread(
+                        target=lambda i=i: results.append(
+                            from_video(self.video, f"{self.output[:-4]}_{i}.mp3")
+                        )
+                    )
+                    for i in range(4)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            convert_to_audio.set_concurrency_limit(
+                convert_to_audio.MAX_CONCURRENT_ENCODES
+            )
+
+        self.assertEqual(results, [0] * 4)
+        self.assertEqual(len(peak), 4)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_convert_to_audio(self):
+        self.assertEqual(convert("mp4", "mp3", self.video, ""), 0)
+        self.assertTrue(os.path.exists(self.output))
+        self.assertEqual(convert("mp4", "mp3", "missing.mp4", ""), -1)
+        self.assertEqual(convert("pdf", "mp3", self.video, ""), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
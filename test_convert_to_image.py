@@ -1,10 +1,42 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
-from convert_to_image import convert_to_image, from_image, from_pdf
+from concurrent.futures import ThreadPoolExecutor
+from atomic_output import partial_path
+from convert_to_image import convert_to_image, from_image, from_pdf, _worker_count
+from detect_format import normalize
+from result import ErrorCategory, collect
+
+
+def write_page(path):
+    with open(path, "wb") as f:
+        f.write(b"page")
+
+
+def rendered_page():
+    """
+    A page as returned by pdf2image, whose save() writes a small file.
+    """
+    image = MagicMock()
+    image.save.side_effect = write_page
+    return image
 
 
 class TestConvertToImage(unittest.TestCase):
 
+    def setUp(self):
+        # the outputs are written next to example.pdf, in the current directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        with open("example.pdf", "wb") as f:
+            f.write(b"%PDF-1.4\n")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
     @patch("os.path.exists")
     def test_convert_to_image_file_not_found(self, mock_exists):
         mock_exists.return_value = False
@@ -24,6 +56,10 @@ class TestConvertToImage(unittest.TestCase):
                 "output." + image_format,
             )
             self.assertEqual(result, -1)
+        # the same format under another extension
+        self.assertEqual(
+            convert_to_image("jpeg", "jpg", "example.jpeg", "output.jpg"), -1
+        )
 
     @patch("os.path.exists")
     @patch("convert_to_image.from_image")
@@ -33,7 +69,7 @@ class TestConvertToImage(unittest.TestCase):
         mock_from_image.return_value = 0
         for input_format in image_format_expected:
             for output_format in image_format_expected:
-                if input_format != output_format:
+                if normalize(input_format) != normalize(output_format):
                     result = convert_to_image(
                         input_format,
                         output_format,
@@ -45,6 +81,36 @@ class TestConvertToImage(unittest.TestCase):
                         "example." + input_format, "output." + output_format
                     )
 
+    def test_convert_to_image_compares_content_with_target(self):
+        from PIL import Image
+
+        # a PNG named .jpg is converted; a JPEG named .jpeg is already a jpg
+        Image.new("RGB", (4, 4)).save("mislabeled.jpg", "PNG")
+        self.assertEqual(convert_to_image("jpg", "jpg", "mislabeled.jpg", "output"), 0)
+        with Image.open("output.jpg") as im:
+            self.assertEqual(im.format, "JPEG")
+
+        Image.new("RGB", (4, 4)).save("photo.jpeg")
+        self.assertEqual(convert_to_image("jpg", "jpg", "photo.jpeg", "copy"), -1)
+        self.assertFalse(os.path.exists("copy.jpg"))
+
+    @patch("convert_to_image.from_pdf", return_value=0)
+    def test_convert_to_image_passes_each_function_its_options(self, mock_from_pdf):
+        from PIL import Image
+
+        Image.new("RGB", (8, 8)).save("photo.png")
+        options = {"max_size": (4, 4), "chunk_size": 2, "progress": print}
+        self.assertEqual(convert_to_image("png", "jpg", "photo.png", "", **options), 0)
+        with Image.open("photo.jpg") as im:
+            self.assertEqual(im.size, (4, 4))
+
+        self.assertEqual(
+            convert_to_image("pdf", "png", "example.pdf", "", **options), 0
+        )
+        mock_from_pdf.assert_called_once_with(
+            "example.pdf", "", "example", "png", chunk_size=2, progress=print
+        )
+
     @patch("os.path.exists")
     @patch("convert_to_image.from_pdf")
     def test_convert_to_image_from_pdf_success(self, mock_from_pdf, mock_exists):
@@ -56,9 +122,8 @@ class TestConvertToImage(unittest.TestCase):
                 "pdf", output_format, "example.pdf", "output." + output_format
             )
             self.assertEqual(result, 0)
-            mock_from_pdf.assert_called_with(
-                "example.pdf", "", "example", output_format
-            )
+            # pages are named after the output file, like for the other converters of the registry
+            mock_from_pdf.assert_called_with("example.pdf", "", "output", output_format)
 
     @patch("PIL.Image.open")
     def test_from_image_success(self, mock_open):
@@ -67,11 +132,13 @@ class TestConvertToImage(unittest.TestCase):
 
         mock_open.return_value.__enter__.return_value = mock_image
         mock_image.convert.return_value = mock_converted_image
+        mock_converted_image.save.side_effect = write_page
 
         result = from_image("example.png", "output.jpg")
         self.assertEqual(result, 0)
         mock_image.convert.assert_called_once_with("RGB")
-        mock_converted_image.save.assert_called_once_with("output.jpg")
+        mock_converted_image.save.assert_called_once_with(partial_path("output.jpg"))
+        self.assertTrue(os.path.exists("output.jpg"))
 
     @patch("pdf2image.convert_from_path")
     def test_from_pdf_no_images_created(self, mock_convert_from_path):
@@ -82,22 +149,312 @@ class TestConvertToImage(unittest.TestCase):
 
     @patch("pdf2image.convert_from_path")
     def test_from_pdf_success_single_image(self, mock_convert_from_path):
-        mock_image = MagicMock()
+        mock_image = rendered_page()
         mock_convert_from_path.return_value = [mock_image]
 
         result = from_pdf("example.pdf", "", "example", "png")
         self.assertEqual(result, 0)
-        mock_image.save.assert_called_once_with("example.png")
+        mock_image.save.assert_called_once_with(partial_path("example.png"))
+        self.assertTrue(os.path.exists("example.png"))
 
     @patch("pdf2image.convert_from_path")
     def test_from_pdf_success_multiple_images(self, mock_convert_from_path):
-        mock_images = [MagicMock(), MagicMock()]
+        mock_images = [rendered_page(), rendered_page()]
         mock_convert_from_path.return_value = mock_images
 
         result = from_pdf("example.pdf", "", "example", "png")
         self.assertEqual(result, 0)
-        mock_images[0].save.assert_called_once_with("example_1.png")
-        mock_images[1].save.assert_called_once_with("example_2.png")
+        mock_images[0].save.assert_called_once_with(partial_path("example_1.png"))
+        mock_images[1].save.assert_called_once_with(partial_path("example_2.png"))
+        self.assertEqual(
+            sorted(os.listdir()), ["example.pdf", "example_1.png", "example_2.png"]
+        )
+
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path")
+    def test_from_pdf_streaming_renders_in_chunks(
+        self, mock_pdfinfo, mock_convert_from_path
+    ):
+        mock_pdfinfo.return_value = {"Pages": 5}
+        mock_images = [rendered_page() for _ in range(5)]
+        mock_convert_from_path.side_effect = [
+            mock_images[0:2],
+            mock_images[2:4],
+            mock_images[4:5],
+        ]
+
+        result = from_pdf("example.pdf", "", "example", "png", chunk_size=2)
+        self.assertEqual(result, 0)
+        mock_convert_from_path.assert_any_call(
+            "example.pdf", dpi=200, first_page=1, last_page=2
+        )
+        mock_convert_from_path.assert_any_call(
+            "example.pdf", dpi=200, first_page=3, last_page=4
+        )
+        mock_convert_from_path.assert_called_with(
+            "example.pdf", dpi=200, first_page=5, last_page=5
+        )
+        for i, mock_image in enumerate(mock_images):
+            mock_image.save.assert_called_once_with(partial_path(f"example_{i+1}.png"))
+            mock_image.close.assert_called_once()
+
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path")
+    def test_from_pdf_streaming_saves_first_page_before_rendering_rest(
+        self, mock_pdfinfo, mock_convert_from_path
+    ):
+        mock_pdfinfo.return_value = {"Pages": 3}
+        saved = []
+
+        def render(pdf_file, dpi, first_page, last_page):
+            # every page rendered so far must already be on disk
+            self.assertEqual(saved, list(range(1, first_page)))
+            images = []
+            for page in range(first_page, last_page + 1):
+                image = MagicMock()
+                image.save.side_effect = lambda path, page=page: (
+                    write_page(path),
+                    saved.append(page),
+                )
+                images.append(image)
+            return images
+
+        mock_convert_from_path.side_effect = render
+
+        result = from_pdf("example.pdf", "", "example", "png", chunk_size=1)
+        self.assertEqual(result, 0)
+        self.assertEqual(saved, [1, 2, 3])
+
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path")
+    def test_from_pdf_streaming_single_page(self, mock_pdfinfo, mock_convert_from_path):
+        mock_pdfinfo.return_value = {"Pages": 1}
+        mock_image = rendered_page()
+        mock_convert_from_path.return_value = [mock_image]
+
+        result = from_pdf("example.pdf", "", "example", "jpg", chunk_size=4)
+        self.assertEqual(result, 0)
+        mock_image.save.assert_called_once_with(partial_path("example.jpg"))
+
+    @patch("pdf2image.convert_from_path")
+    def test_from_pdf_dpi(self, mock_convert_from_path):
+        mock_convert_from_path.return_value = [rendered_page()]
+
+        result = from_pdf("example.pdf", "", "example", "png", dpi=72)
+        self.assertEqual(result, 0)
+        mock_convert_from_path.assert_called_once_with("example.pdf", dpi=72)
+
+    def test_from_image_max_size(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            photo = os.path.join(tmp, "photo.jpg")
+            Image.new("RGB", (1600, 1200), "red").save(photo)
+            preview = os.path.join(tmp, "preview.png")
+
+            self.assertEqual(from_image(photo, preview, max_size=(200, 200)), 0)
+            with Image.open(preview) as im:
+                self.assertEqual(im.size, (200, 150))
+
+            # never enlarged
+            self.assertEqual(from_image(photo, preview, max_size=(4000, 4000)), 0)
+            with Image.open(preview) as im:
+                self.assertEqual(im.size, (1600, 1200))
+
+    def test_from_image_saves_every_frame(self):
+        from PIL import Image, ImageColor
+
+        colors = ["red", "lime", "blue"]
+        frames = [Image.new("RGB", (40, 20), color) for color in colors]
+        frames[0].save("anim.gif", save_all=True, append_images=frames[1:])
+
+        result = collect(from_image, "anim.gif", "anim.png", max_size=(20, 20))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.outputs, ["anim_1.png", "anim_2.png", "anim_3.png"])
+        self.assertEqual(result.pages, 3)
+        for output, color in zip(result.outputs, colors):
+            with Image.open(output) as im:
+                self.assertEqual(im.size, (20, 10))
+                self.assertEqual(
+                    im.convert("RGB").getpixel((0, 0)), ImageColor.getrgb(color)
+                )
+        self.assertFalse(os.path.exists("anim.png"))
+
+        # a single-frame GIF keeps the output name
+        frames[0].save("still.gif")
+        self.assertEqual(from_image("still.gif", "still.png"), 0)
+        self.assertTrue(os.path.exists("still.png"))
+
+    @patch("PIL.Image.open")
+    def test_from_image_max_size_uses_draft_mode(self, mock_open):
+        mock_image = MagicMock()
+        mock_open.return_value.__enter__.return_value = mock_image
+        mock_image.convert.return_value.save.side_effect = write_page
+
+        result = from_image("example.jpg", "output.png", max_size=(320, 240))
+        self.assertEqual(result, 0)
+        mock_image.draft.assert_called_once_with("RGB", (320, 240))
+        mock_image.thumbnail.assert_called_once_with((320, 240))
+
+    @patch("os.cpu_count")
+    def test_worker_count(self, mock_cpu_count):
+        mock_cpu_count.return_value = 32
+        self.assertEqual(_worker_count(4, 100), 4)
+        self.assertEqual(_worker_count(8, 3), 3)
+        self.assertEqual(_worker_count(0, 1), 1)
+        self.assertEqual(_worker_count(0, 10), 3)
+        self.assertEqual(_worker_count(0, 400), 32)
+
+    @patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor)
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path")
+    def test_from_pdf_parallel_keeps_page_naming(
+        self, mock_pdfinfo, mock_convert_from_path
+    ):
+        mock_pdfinfo.return_value = {"Pages": 7}
+        os.mkdir("out")
+        saved = {}
+
+        def render(pdf_file, dpi, first_page, last_page):
+            images = []
+            for page in range(first_page, last_page + 1):
+                image = MagicMock()
+                image.save.side_effect = lambda path, page=page: (
+                    write_page(path),
+                    saved.update({page: path}),
+                )
+                images.append(image)
+            return images
+
+        mock_convert_from_path.side_effect = render
+
+        result = from_pdf("example.pdf", "out/", "example", "png", workers=3)
+        self.assertEqual(result, 0)
+        self.assertEqual(
+            saved,
+            {page: partial_path(f"out/example_{page}.png") for page in range(1, 8)},
+        )
+        ranges = sorted(
+            (c.kwargs["first_page"], c.kwargs["last_page"])
+            for c in mock_convert_from_path.call_args_list
+        )
+        self.assertEqual(ranges, [(1, 3), (4, 6), (7, 7)])
+
+    @patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor)
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path", return_value={"Pages": 8})
+    def test_from_pdf_parallel_keeps_error_category(self, _, mock_convert_from_path):
+        def render(pdf_file, dpi, first_page, last_page):
+            if first_page == 5:
+                raise ValueError("broken page tree")
+            return [rendered_page() for _ in range(first_page, last_page + 1)]
+
+        mock_convert_from_path.side_effect = render
+        result = collect(from_pdf, "example.pdf", "", "example", "png", workers=2)
+        self.assertEqual(result.error, ErrorCategory.DECODE_FAILURE)
+        self.assertIn("broken page tree", result.message)
+
+        mock_convert_from_path.side_effect = lambda *args, **kwargs: []
+        result = collect(from_pdf, "example.pdf", "", "example", "png", workers=2)
+        self.assertEqual(
+            (result.error, result.message),
+            (ErrorCategory.DECODE_FAILURE, "No images created"),
+        )
+
+    @patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor)
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path", return_value={"Pages": 4})
+    def test_from_pdf_parallel_cancel_returns_at_once(self, _, mock_convert_from_path):
+        import threading
+        import time
+
+        release = threading.Event()
+
+        def render(pdf_file, dpi, first_page, last_page):
+            if first_page > 1:
+                release.wait(10)
+            return [rendered_page() for _ in range(first_page, last_page + 1)]
+
+        mock_convert_from_path.side_effect = render
+        start = time.monotonic()
+        result = collect(
+            from_pdf,
+            "example.pdf",
+            "",
+            "example",
+            "png",
+            workers=2,
+            progress=lambda done, total: False,
+        )
+        elapsed = time.monotonic() - start
+        release.set()
+        # let the range finish writing its pages before the test leaves the temporary directory
+        for thread in threading.enumerate():
+            if thread.name.startswith("ThreadPoolExecutor"):
+                thread.join(10)
+        self.assertEqual(result.error, ErrorCategory.CANCELLED)
+        # the range still rendering was not waited for
+        self.assertLess(elapsed, 5)
+
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path")
+    def test_from_pdf_progress_and_cancel(self, mock_pdfinfo, mock_convert_from_path):
+        mock_pdfinfo.return_value = {"Pages": 6}
+        mock_convert_from_path.side_effect = (
+            lambda pdf_file, dpi, first_page, last_page: [
+                rendered_page() for _ in range(first_page, last_page + 1)
+            ]
+        )
+        reported = []
+
+        def progress(done, total):
+            reported.append((done, total))
+            return done < 3
+
+        result = from_pdf(
+            "example.pdf", "", "example", "png", chunk_size=2, progress=progress
+        )
+        self.assertEqual(result, -1)
+        self.assertEqual(reported, [(1, 6), (2, 6), (3, 6)])
+        # the window holding page 3 was the last one rendered
+        self.assertEqual(mock_convert_from_path.call_count, 2)
+
+    @patch("os.path.exists")
+    @patch("convert_to_image.from_pdf")
+    def test_convert_to_image_forwards_options_to_from_pdf(
+        self, mock_from_pdf, mock_exists
+    ):
+        mock_exists.return_value = True
+        mock_from_pdf.return_value = 0
+        progress = MagicMock()
+
+        result = convert_to_image(
+            "pdf", "png", "example.pdf", "", chunk_size=4, progress=progress
+        )
+        self.assertEqual(result, 0)
+        mock_from_pdf.assert_called_with(
+            "example.pdf", "", "example", "png", chunk_size=4, progress=progress
+        )
+
+    def test_convert_to_image_detects_content(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            upper = os.path.join(tmp, "PHOTO.JPG")
+            Image.new("RGB", (4, 4)).save(upper, "JPEG")
+            tiff = os.path.join(tmp, "scan.tiff")
+            Image.new("RGB", (4, 4)).save(tiff)
+            fake = os.path.join(tmp, "fake.png")
+            with open(fake, "w") as f:
+                f.write("not an image")
+
+            self.assertEqual(convert_to_image("jpg", "png", upper, ""), 0)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "PHOTO.png")))
+            self.assertEqual(convert_to_image("img", "png", tiff, ""), 0)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "scan.png")))
+            self.assertEqual(convert_to_image("png", "jpg", fake, ""), -1)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "fake.jpg")))
+            self.assertEqual(convert_to_image("pdf", "png", tiff, ""), -1)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,17 @@
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import os
+import tempfile
 
-from convert_to_pdf import convert_to_pdf, from_image, from_word
+from atomic_output import partial_path
+from convert_to_pdf import (
+    convert_to_pdf,
+    from_image,
+    from_images,
+    from_text,
+    from_word,
+    _pdf_image,
+)
 
 
 class TestConvertToPdf(unittest.TestCase):
@@ -44,11 +53,15 @@ class TestConvertToPdf(unittest.TestCase):
         
         mock_open.return_value.__enter__.return_value = mock_image
         mock_image.convert.return_value = mock_converted_image
+        mock_converted_image.save.side_effect = lambda path: open(path, "wb").close()
 
-        result = from_image("example.png", "output.pdf")
-        self.assertEqual(result, 0)
-        mock_image.convert.assert_called_once_with("RGB")
-        mock_converted_image.save.assert_called_once_with("output.pdf")
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "output.pdf")
+            result = from_image("example.png", output)
+            self.assertEqual(result, 0)
+            mock_image.convert.assert_called_once_with("RGB")
+            mock_converted_image.save.assert_called_once_with(partial_path(output))
+            self.assertEqual(os.listdir(tmp), ["output.pdf"])
 
     def test_from_image_invalid_extension(self):
         result = from_image("example.txt", "output.pdf")
@@ -65,16 +78,237 @@ class TestConvertToPdf(unittest.TestCase):
     def test_from_word_success(self, mock_document, mock_format):
         mock_doc_instance = mock_document.return_value
         mock_format.PDF = MagicMock()
-        result = from_word("example.docx", "output.pdf")
-        self.assertEqual(result, 0)
-        mock_doc_instance.LoadFromFile.assert_called_once_with("example.docx")
-        mock_doc_instance.SaveToFile.assert_called_once_with("output.pdf", mock_format.PDF)
+        mock_doc_instance.SaveToFile.side_effect = lambda path, _: open(
+            path, "wb"
+        ).close()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "output.pdf")
+            result = from_word("example.docx", output)
+            self.assertEqual(result, 0)
+            mock_doc_instance.LoadFromFile.assert_called_once_with("example.docx")
+            mock_doc_instance.SaveToFile.assert_called_once_with(
+                partial_path(output), mock_format.PDF
+            )
+            self.assertEqual(os.listdir(tmp), ["output.pdf"])
         mock_doc_instance.Close.assert_called_once()
 
     def test_from_word_invalid_extension(self):
         result = from_word("example.txt", "output.pdf")
         self.assertEqual(result, -1)
 
+    def test_from_images_writes_one_page_per_image(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            jpeg = os.path.join(tmp, "a.jpg")
+            png = os.path.join(tmp, "b.png")
+            output = os.path.join(tmp, "out.pdf")
+            Image.new("RGB", (40, 20), "red").save(jpeg)
+            Image.new("RGBA", (10, 30), (0, 0, 255, 128)).save(png)
+
+            result = from_images([jpeg, png, jpeg], output)
+            self.assertEqual(result, 0)
+
+            with open(output, "rb") as f:
+                pdf = f.read()
+            with open(jpeg, "rb") as f:
+                jpeg_data = f.read()
+
+        self.assertTrue(pdf.startswith(b"%PDF-1.4"))
+        self.assertTrue(pdf.endswith(b"%%EOF\n"))
+        self.assertIn(b"/Count 3", pdf)
+        self.assertEqual(pdf.count(b"/Type /Page "), 3)
+        self.assertIn(b"/MediaBox [0 0 40 20]", pdf)
+        self.assertIn(b"/MediaBox [0 0 10 30]", pdf)
+        # the JPEG is embedded byte for byte instead of being re-encoded
+        self.assertEqual(pdf.count(jpeg_data), 2)
+
+    def test_from_images_writes_every_frame(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            gif = os.path.join(tmp, "anim.gif")
+            jpeg = os.path.join(tmp, "a.jpg")
+            output = os.path.join(tmp, "out.pdf")
+            frames = [
+                Image.new("RGB", (10, 10), color) for color in ("red", "green", "blue")
+            ]
+            frames[0].save(gif, save_all=True, append_images=frames[1:])
+            Image.new("RGB", (40, 20), "red").save(jpeg)
+
+            self.assertEqual(from_images([jpeg, gif], output, resolution=144), 0)
+            with open(output, "rb") as f:
+                pdf = f.read()
+
+        self.assertIn(b"/Count 4", pdf)
+        self.assertEqual(pdf.count(b"/MediaBox [0 0 20 10]"), 1)
+        self.assertEqual(pdf.count(b"/MediaBox [0 0 5 5]"), 3)
+
+    def test_from_images_flattens_transparency_onto_white(self):
+        import io
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            png = os.path.join(tmp, "clear.png")
+            gif = os.path.join(tmp, "clear.gif")
+            Image.new("RGBA", (8, 8), (0, 0, 0, 0)).save(png)
+            Image.new("P", (8, 8)).save(gif, transparency=0)
+
+            for image_file in (png, gif):
+                width, height, color_space, data = _pdf_image(image_file)
+                with Image.open(io.BytesIO(data)) as page:
+                    self.assertEqual(
+                        page.convert("RGB").getpixel((4, 4)), (255, 255, 255)
+                    )
+
+    def test_from_image_multi_frame_tiff_writes_one_page_per_frame(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tiff = os.path.join(tmp, "scan.tiff")
+            output = os.path.join(tmp, "scan.pdf")
+            frames = [Image.new("RGB", (20 + i, 10), "red") for i in range(3)]
+            frames.append(Image.new("LA", (5, 5), (0, 0)))
+            frames[0].save(tiff, save_all=True, append_images=frames[1:])
+
+            self.assertEqual(from_image(tiff, output), 0)
+            with open(output, "rb") as f:
+                pdf = f.read()
+
+        self.assertIn(b"/Count 4", pdf)
+        for size in (b"20 10", b"21 10", b"22 10", b"5 5"):
+            self.assertIn(b"/MediaBox [0 0 " + size + b"]", pdf)
+        # the transparent frame is flattened to grayscale
+        self.assertIn(b"/ColorSpace /DeviceGray", pdf)
+
+    def test_from_image_bilevel_tiff_stays_bilevel(self):
+        import zlib
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tiff = os.path.join(tmp, "fax.tiff")
+            gif = os.path.join(tmp, "anim.gif")
+            output = os.path.join(tmp, "fax.pdf")
+            frames = [Image.new("1", (1728, 2200), 1) for _ in range(3)]
+            frames[0].putpixel((0, 0), 0)
+            frames[0].save(
+                tiff, save_all=True, append_images=frames[1:], compression="group4"
+            )
+
+            self.assertEqual(from_image(tiff, output), 0)
+            with open(output, "rb") as f:
+                pdf = f.read()
+
+            colors = [Image.new("RGB", (16, 16), color) for color in ("red", "blue")]
+            colors[0].save(gif, save_all=True, append_images=colors[1:])
+            self.assertEqual(from_image(gif, output), 0)
+            with open(output, "rb") as f:
+                gif_pdf = f.read()
+
+        self.assertIn(b"/Count 3", pdf)
+        self.assertEqual(
+            pdf.count(
+                b"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode"
+            ),
+            3,
+        )
+        self.assertNotIn(b"/DCTDecode", pdf)
+        # 1 bit per pixel instead of 8 bits of JPEG noise around the text
+        self.assertLess(len(pdf), 20000)
+        first_image = pdf.split(b"stream\n", 1)[1].split(b"\nendstream", 1)[0]
+        self.assertEqual(zlib.decompress(first_image), frames[0].tobytes())
+        # the palette of a GIF frame is kept as an indexed color space
+        self.assertIn(b"/ColorSpace [/Indexed /DeviceRGB ", gif_pdf)
+
+    def test_from_images_file_not_found(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "out.pdf")
+            result = from_images([os.path.join(tmp, "missing.png")], output)
+            self.assertEqual(result, -1)
+            self.assertFalse(os.path.exists(output))
+
+    def test_from_images_invalid_extension(self):
+        self.assertEqual(from_images(["a.png", "example.txt"], "output.pdf"), -1)
+        self.assertEqual(from_images([], "output.pdf"), -1)
+
+    def test_from_text_paginates(self):
+        import zlib
+
+        with tempfile.TemporaryDirectory() as tmp:
+            text_file = os.path.join(tmp, "log.txt")
+            with open(text_file, "w", encoding="cp1252") as f:
+                f.write("caf\u00e9 (1) \\ end\n")
+                for i in range(99):
+                    f.write(f"line {i}\n")
+            output = os.path.join(tmp, "log.pdf")
+
+            result = from_text(text_file, output, font_size=12, page_size=(200, 200))
+            self.assertEqual(result, 0)
+            with open(output, "rb") as f:
+                pdf = f.read()
+
+        # (200 - 2 * 36) / 14.4 = 8 lines per page
+        self.assertEqual(pdf.count(b"/Type /Page "), 13)
+        self.assertIn(b"/MediaBox [0 0 200 200]", pdf)
+        self.assertIn(b"/BaseFont /Courier ", pdf)
+        first_stream = pdf.split(b"stream\n", 1)[1].split(b"\nendstream", 1)[0]
+        content = zlib.decompress(first_stream)
+        self.assertIn(b"(caf\xe9 \\(1\\) \\\\ end) Tj T*", content)
+        self.assertIn(b"(line 6) Tj T*\nET", content)
+
+    def test_from_text_wraps_long_lines(self):
+        import zlib
+
+        with tempfile.TemporaryDirectory() as tmp:
+            text_file = os.path.join(tmp, "wide.txt")
+            with open(text_file, "w") as f:
+                f.write("a\tb\n" + "x" * 25)
+            output = os.path.join(tmp, "wide.pdf")
+
+            # (132 - 2 * 36) / 6 = 10 columns
+            self.assertEqual(from_text(text_file, output, page_size=(132, 400)), 0)
+            with open(output, "rb") as f:
+                pdf = f.read()
+
+        content = zlib.decompress(pdf.split(b"stream\n", 1)[1].split(b"\nendstream")[0])
+        lines = [line for line in content.split(b"\n") if line.endswith(b"Tj T*")]
+        self.assertEqual(
+            lines,
+            [
+                b"(a       b) Tj T*",
+                b"(xxxxxxxxxx) Tj T*",
+                b"(xxxxxxxxxx) Tj T*",
+                b"(xxxxx) Tj T*",
+            ],
+        )
+
+    def test_convert_to_pdf_text_detected_by_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # text starting like a BMP signature, and an empty file: one blank page
+            for name, text in [
+                ("bmw.txt", "BMW annual report 2024\n"),
+                ("empty.txt", ""),
+            ]:
+                text_file = os.path.join(tmp, name)
+                with open(text_file, "w") as f:
+                    f.write(text)
+                self.assertEqual(convert_to_pdf("txt", text_file, ""), 0)
+                with open(text_file.removesuffix(".txt") + ".pdf", "rb") as f:
+                    self.assertEqual(f.read().count(b"/Type /Page "), 1)
+
+    def test_from_text_invalid_arguments(self):
+        self.assertEqual(from_text("example.png", "output.pdf"), -1)
+        self.assertEqual(from_text("missing.txt", "output.pdf"), -1)
+        with tempfile.TemporaryDirectory() as tmp:
+            text_file = os.path.join(tmp, "a.txt")
+            with open(text_file, "w") as f:
+                f.write("a")
+            output = os.path.join(tmp, "a.pdf")
+            self.assertEqual(from_text(text_file, output, font="Arial"), -1)
+            self.assertEqual(from_text(text_file, output, page_size="B9"), -1)
+            self.assertEqual(from_text(text_file, output, encoding="nope"), -1)
+            self.assertFalse(os.path.exists(output))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+import os
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from openpyxl import load_workbook
+
+from convert_to_xlsx import convert_to_xlsx, from_csv
+from tempdir_case import TempDirTestCase
+
+
+class TestConvertToXlsx(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.csv_file = self.path("export.csv")
+        self.output = self.path("export.xlsx")
+
+    def write(self, text, encoding="utf-8"):
+        with open(self.csv_file, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+
+    def rows(self):
+        workbook = load_workbook(self.output)
+        return {
+            sheet.title: [[cell.value for cell in row] for row in sheet.iter_rows()]
+            for sheet in workbook
+        }
+
+    def test_from_csv_infers_column_types(self):
+        self.write(
+            "id,zip,price,date,name\n"
+            "1,01000,2.5,2024-05-01,café\n"
+            "2,75001,-3,2024-05-02 10:30:00,=SUM(A1:A2)\n"
+            "3,,1e3,,\n"
+        )
+
+        self.assertEqual(from_csv(self.csv_file, self.output), 0)
+        self.assertEqual(
+            self.rows()["Sheet1"],
+            [
+                ["id", "zip", "price", "date", "name"],
+                [1, "01000", 2.5, datetime(2024, 5, 1), "café"],
+                [2, "75001", -3.0, datetime(2024, 5, 2, 10, 30), "=SUM(A1:A2)"],
+                [3, None, 1000.0, None, None],
+            ],
+        )
+        # text starting with '=' is not turned into a formula
+        sheet = load_workbook(self.output)["Sheet1"]
+        self.assertEqual(sheet["E3"].data_type, "s")
+
+    def test_from_csv_values_not_matching_the_sample_stay_text(self):
+        self.write("n\n1\n2\nthree\n")
+
+        with patch("convert_to_xlsx.TYPE_SAMPLE_ROWS", 2):
+            self.assertEqual(from_csv(self.csv_file, self.output), 0)
+        self.assertEqual(self.rows()["Sheet1"], [["n"], [1], [2], ["three"]])
+
+    @patch("convert_to_xlsx.EXCEL_MAX_ROWS", 3)
+    def test_from_csv_splits_sheets(self):
+        self.write("a;b\n" + "".join(f"{i};x\n" for i in range(5)))
+
+        self.assertEqual(from_csv(self.csv_file, self.output), 0)
+        self.assertEqual(
+            self.rows(),
+            {
+                "Sheet1": [["a", "b"], [0, "x"], [1, "x"]],
+                "Sheet2": [["a", "b"], [2, "x"], [3, "x"]],
+                "Sheet3": [["a", "b"], [4, "x"]],
+            },
+        )
+
+    def test_from_csv_without_header_and_encoding_detection(self):
+        self.write("été\t1\nhiver\t2\n", encoding="cp1252")
+
+        self.assertEqual(from_csv(self.csv_file, self.output, header=False), 0)
+        self.assertEqual(self.rows()["Sheet1"], [["été", 1], ["hiver", 2]])
+
+    @patch("convert_to_xlsx.PROGRESS_INTERVAL", 2)
+    def test_from_csv_progress_and_cancel(self):
+        self.write("a\n" + "1\n" * 5)
+        size = os.path.getsize(self.csv_file)
+        reported = []
+
+        def progress(done, total):
+            reported.append((done, total))
+
+        self.assertEqual(from_csv(self.csv_file, self.output, progress=progress), 0)
+        self.assertEqual(len(reported), 3)
+        self.assertEqual(reported[-1], (size, size))
+
+        os.remove(self.output)
+        self.assertEqual(
+            from_csv(self.csv_file, self.output, progress=lambda done, total: False),
+            -1,
+        )
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_from_csv_invalid_input(self):
+        self.assertEqual(from_csv("missing.csv", self.output), -1)
+        self.assertEqual(from_csv("example.png", self.output), -1)
+
+    def test_convert_to_xlsx(self):
+        self.write("a,b\n1,2\n")
+
+        self.assertEqual(convert_to_xlsx("csv", self.csv_file, ""), 0)
+        self.assertTrue(os.path.exists(self.output))
+        self.assertEqual(convert_to_xlsx("pdf", self.csv_file, ""), -1)
+        self.assertEqual(convert_to_xlsx("csv", "missing.csv", ""), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
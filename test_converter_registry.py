@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import converter_registry
+from converter_registry import Converter, convert, find, route
+
+
+class TestConverterRegistry(unittest.TestCase):
+
+    def test_find(self):
+        self.assertEqual(find("jpeg", "pdf").handler, "convert_to_pdf:from_image")
+        self.assertEqual(find("docx", "pdf").handler, "convert_to_pdf:from_word")
+        self.assertEqual(find("gif", "png").handler, "convert_to_image:from_image")
+        self.assertIsNone(find("png", "png"))
+        self.assertIsNone(find("doc", "png"))
+
+    def test_image_formats_come_from_detect_format(self):
+        from detect_format import IMAGE_FORMATS
+
+        self.assertEqual(find("tif", "jpeg"), find("tiff", "jpg"))
+        self.assertEqual(route("png", "jpeg"), route("png", "jpg"))
+        for image_format in IMAGE_FORMATS:
+            with self.subTest(image_format=image_format):
+                self.assertIsNotNone(find(image_format, "pdf"))
+                self.assertIsNotNone(
+                    find(image_format, "png" if image_format != "png" else "jpg")
+                )
+        self.assertIn("jpeg", converter_registry.targets())
+        self.assertNotIn("tiff", converter_registry.targets())
+
+    def test_gui_labels(self):
+        labels = [c.label for c in converter_registry.converters() if c.label]
+        self.assertEqual(
+            labels,
+            [
+                "IMG to PDF",
+                "DOC to PDF",
+                "TXT to PDF",
+                "PDF to PNG",
+                "JPG to PNG",
+                "PDF to JPG",
+                "PNG to JPG",
+                "MP4 to MP3",
+                "CSV to XLSX",
+            ],
+        )
+
+    def test_route_direct(self):
+        self.assertEqual(route("png", "jpg"), [find("png", "jpg")])
+
+    def test_route_multi_hop(self):
+        self.assertEqual(route("doc", "png"), [find("doc", "pdf"), find("pdf", "png")])
+
+    def test_route_never_goes_through_multi_page_outputs(self):
+        # PDF → PNG writes one file per page, which cannot feed PNG → GIF
+        self.assertIsNone(route("pdf", "pdf"))
+        self.assertEqual(len(route("pdf", "gif")), 1)
+
+    def test_route_unavailable(self):
+        self.assertIsNone(route("xyz", "pdf"))
+
+    def test_convert_chains_handlers(self):
+        calls = []
+
+        def handler(file_path, output_file, **options):
+            calls.append((file_path, output_file, options))
+            with open(output_file, "w") as f:
+                f.write("out")
+            return 0
+
+        progress = MagicMock()
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "report.docx")
+            with open(source, "wb") as f:
+                f.write(b"PK\x03\x04" + bytes(26) + b"word/document.xml")
+
+            with patch("converter_registry.load", return_value=handler):
+                result = convert(source, "png", chunk_size=2, progress=progress)
+
+        self.assertEqual(result, 0)
+        (first_in, first_out, first_options), (
+            second_in,
+            second_out,
+            second_options,
+        ) = calls
+        self.assertEqual(first_in, source)
+        self.assertTrue(first_out.endswith("report.pdf"))
+        self.assertNotEqual(os.path.dirname(first_out), tmp)
+        self.assertEqual(first_options, {})
+        self.assertEqual(second_in, first_out)
+        self.assertEqual(second_out, os.path.join(tmp, "report.png"))
+        self.assertEqual(second_options, {"chunk_size": 2, "progress": progress})
+
+    def test_convert_image(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "a.png")
+            Image.new("RGB", (4, 4), "red").save(source)
+
+            self.assertEqual(convert(source, "gif"), 0)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "a.gif")))
+            self.assertEqual(convert(source, "xlsx"), -1)
+            self.assertEqual(convert(os.path.join(tmp, "missing.png"), "gif"), -1)
+
+    @patch("convert_to_image.from_pdf")
+    def test_pdf_to_image_adapter(self, mock_from_pdf):
+        mock_from_pdf.return_value = 0
+        handler = converter_registry.load(find("pdf", "png"))
+        self.assertEqual(
+            handler("in.pdf", os.path.join("out", "doc.png"), workers=2), 0
+        )
+        mock_from_pdf.assert_called_once_with(
+            "in.pdf", "out" + os.sep, "doc", "png", workers=2
+        )
+
+    def test_lookups_import_no_backend(self):
+        loaded = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, converter_registry\n"
+                "converter_registry.route('doc', 'png')\n"
+                "print(' '.join(m.split('.')[0] for m in sys.modules))",
+            ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        for module in [
+            "convert_to_pdf",
+            "convert_to_image",
+            "PIL",
+            "spire",
+            "pdf2image",
+        ]:
+            self.assertNotIn(module, loaded)
+
+    def test_register(self):
+        converter = Converter(("abc",), "xyz", "os.path:exists")
+        converter_registry.register(converter)
+        try:
+            self.assertEqual(find("abc", "xyz"), converter)
+            self.assertIs(converter_registry.load(converter), os.path.exists)
+        finally:
+            converter_registry._converters.remove(converter)
+
+
+if __name__ == "__main__":
+    unittest.main()
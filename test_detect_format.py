@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+from detect_format import (
+    detect_encoding,
+    detect_format,
+    detect_head,
+    is_type,
+    normalize,
+)
+
+
+class TestDetectFormat(unittest.TestCase):
+
+    def test_detect_head_signatures(self):
+        heads = {
+            b"\x89PNG\r\n\x1a\n" + bytes(8): "png",
+            b"\xff\xd8\xff\xe0\x00\x10JFIF": "jpg",
+            b"GIF89a\x01\x00": "gif",
+            b"II*\x00\x08\x00\x00\x00": "tiff",
+            b"MM\x00*\x00\x00\x00\x08": "tiff",
+            b"BM" + bytes(12) + b"\x28" + bytes(17): "bmp",
+            b"BMW annual report 2024\n": "txt",
+            b"RIFF\x00\x00\x00\x00WEBPVP8 ": "webp",
+            b"%PDF-1.7\n%\xe2\xe3\xcf\xd3": "pdf",
+            b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(8): "doc",
+            b"PK\x03\x04" + bytes(26) + b"word/document.xml": "docx",
+            b"PK\x03\x04" + bytes(26) + b"xl/workbook.xml": "xlsx",
+            b"PK\x03\x04" + bytes(26) + b"data.bin": "zip",
+            b"\x00\x00\x00\x20ftypisom": "mp4",
+            b"ID3\x04\x00\x00\x00\x00\x02\x01": "mp3",
+            b"ID3,name,amount\n1,a,2\n": "txt",
+            b"\xff\xfb\x90\x00": "mp3",
+            b"hello\nworld\n": "txt",
+            "héllo wörld".encode("utf-8"): "txt",
+            "héllo wörld".encode("cp1252"): "txt",
+            b"\xff\xfeh\x00i\x00": "txt",
+            b"\x00\x01\x02\x03\x04": None,
+            b"": None,
+        }
+        for head, expected in heads.items():
+            with self.subTest(head=head):
+                self.assertEqual(detect_head(head), expected)
+
+    def test_detect_head_uses_extension_for_text_and_office(self):
+        self.assertEqual(detect_head(b"a,b\n1,2\n", "csv"), "csv")
+        self.assertEqual(detect_head(b"a,b\n1,2\n", "pdf"), "txt")
+        office = b"PK\x03\x04" + bytes(26) + b"docProps/app.xml"
+        self.assertEqual(detect_head(office, "docx"), "docx")
+        self.assertEqual(detect_head(office, "xlsx"), "xlsx")
+        self.assertEqual(detect_head(office, "zip"), "zip")
+
+    def test_detect_head_empty_file(self):
+        self.assertEqual(detect_head(b"", "txt"), "txt")
+        self.assertEqual(detect_head(b"", "csv"), "csv")
+        self.assertIsNone(detect_head(b"", "png"))
+
+    def test_detect_head_text_cut_inside_character(self):
+        self.assertEqual(detect_head("aé".encode("utf-8")[:-1]), "txt")
+
+    def test_detect_format_reads_content_not_extension(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as tmp:
+            mislabeled = os.path.join(tmp, "photo.png")
+            Image.new("RGB", (4, 4)).save(mislabeled, "JPEG")
+            self.assertEqual(detect_format(mislabeled), "jpg")
+
+            upper = os.path.join(tmp, "PHOTO.TIF")
+            Image.new("RGB", (4, 4)).save(upper, "TIFF")
+            self.assertEqual(detect_format(upper), "tiff")
+
+    def test_detect_format_missing_file(self):
+        self.assertIsNone(detect_format("missing.JPEG"))
+        self.assertEqual(
+            detect_format("missing.JPEG", fallback_to_extension=True), "jpg"
+        )
+        self.assertIsNone(detect_format("missing", fallback_to_extension=True))
+
+    def test_detect_encoding(self):
+        samples = {
+            "h\u00e9llo".encode("utf-8"): "utf-8",
+            "h\u00e9llo".encode("utf-8-sig"): "utf-8-sig",
+            "h\u00e9llo".encode("utf-16"): "utf-16",
+            "h\u00e9llo".encode("cp1252"): "cp1252",
+            b"plain ascii": "utf-8",
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a.txt")
+            for data, expected in samples.items():
+                with self.subTest(data=data):
+                    with open(path, "wb") as f:
+                        f.write(data)
+                    self.assertEqual(detect_encoding(path), expected)
+
+    def test_normalize_and_is_type(self):
+        self.assertEqual(normalize(".JPEG"), "jpg")
+        self.assertEqual(normalize("tif"), "tiff")
+        self.assertTrue(is_type("jpg", "img"))
+        self.assertTrue(is_type("gif", "png"))
+        self.assertTrue(is_type("docx", "doc"))
+        self.assertTrue(is_type("pdf", "pdf"))
+        self.assertFalse(is_type("pdf", "img"))
+        self.assertFalse(is_type("txt", "doc"))
+        self.assertFalse(is_type(None, "img"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import unittest
+import zlib
+
+from PIL import Image
+
+import convert_to_image
+import convert_to_pdf
+from converter_registry import convert_file
+from encoding_profiles import PROFILES, encoder_options
+from result import ErrorCategory
+from tempdir_case import TempDirTestCase
+
+
+class TestEncodingProfiles(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # smooth areas and detail, where the encoder settings make a difference
+        gradient = Image.linear_gradient("L").resize((256, 256))
+        noise = Image.effect_noise((256, 256), 32)
+        self.image = self.path("photo.png")
+        Image.merge("RGB", [gradient, noise, gradient.rotate(90)]).save(self.image)
+
+    def convert(self, func, output, profile):
+        output_file = self.path(output)
+        self.assertEqual(func(self.image, output_file, profile=profile), 0)
+        return os.path.getsize(output_file)
+
+    def test_encoder_options(self):
+        self.assertEqual(encoder_options(None, "png"), {})
+        self.assertEqual(encoder_options("fast", "bmp"), {})
+        self.assertIsNone(encoder_options("tiny", "png"))
+        # callers may change the options they get
+        encoder_options("smallest", "pdf").clear()
+        self.assertIn("compress_level", PROFILES["smallest"]["pdf"])
+
+    def test_smaller_profiles_write_smaller_files(self):
+        for output_format, func in [
+            ("png", convert_to_image.from_image),
+            ("jpg", convert_to_image.from_image),
+            ("webp", convert_to_image.from_image),
+            ("pdf", convert_to_pdf.from_image),
+        ]:
+            with self.subTest(output_format=output_format):
+                sizes = [
+                    self.convert(func, f"{profile}.{output_format}", profile)
+                    for profile in ("fast", "balanced", "smallest")
+                ]
+                # fast and balanced only differ in speed for some encoders, not in size
+                self.assertGreater(min(sizes[:2]), sizes[2])
+
+    def test_profile_reaches_the_encoder(self):
+        self.convert(convert_to_image.from_image, "out.jpg", "smallest")
+        with Image.open(self.path("out.jpg")) as im:
+            self.assertTrue(im.info.get("progressive"))
+
+        self.convert(convert_to_image.from_image, "out.tiff", "balanced")
+        with Image.open(self.path("out.tiff")) as im:
+            self.assertEqual(im.info["compression"], "tiff_lzw")
+
+    def test_unknown_profile(self):
+        for func, output in [
+            (convert_to_image.from_image, "out.png"),
+            (convert_to_pdf.from_image, "out.pdf"),
+        ]:
+            with self.subTest(func=func.__module__):
+                self.assertEqual(
+                    func(self.image, self.path(output), profile="tiny"), -1
+                )
+                self.assertFalse(os.path.exists(self.path(output)))
+
+        result = convert_file(self.image, "jpg", profile="tiny")
+        self.assertEqual(result.error, ErrorCategory.UNSUPPORTED)
+        self.assertIn("tiny", result.message)
+
+    def test_profile_through_convert_functions(self):
+        sizes = {}
+        for profile in ("fast", "smallest"):
+            output = f"{profile}.pdf"
+            # options of other conversions are ignored
+            self.assertEqual(
+                convert_to_pdf.convert_to_pdf(
+                    "img", self.image, output, profile=profile, font="Courier"
+                ),
+                0,
+            )
+            sizes[profile] = os.path.getsize(self.path(output))
+        self.assertGreater(sizes["fast"], sizes["smallest"])
+
+        self.assertEqual(
+            convert_to_image.convert_to_image(
+                "png", "jpg", self.image, "out.jpg", profile="smallest", dpi=72
+            ),
+            0,
+        )
+        with Image.open(self.path("out.jpg")) as im:
+            self.assertTrue(im.info.get("progressive"))
+
+    def test_text_pdf_compress_level(self):
+        text_file = self.path("log.txt")
+        with open(text_file, "w") as f:
+            f.write("".join(f"line {i} of the log\n" for i in range(500)))
+
+        sizes = {}
+        for profile in ("fast", "smallest"):
+            output_file = self.path(f"{profile}.pdf")
+            self.assertEqual(
+                convert_to_pdf.from_text(text_file, output_file, profile=profile), 0
+            )
+            sizes[profile] = os.path.getsize(output_file)
+        self.assertGreater(sizes["fast"], sizes["smallest"])
+
+        content = convert_to_pdf._text_content("BT\n", ["a line"] * 50, 1)
+        self.assertEqual(
+            zlib.decompress(content),
+            zlib.decompress(convert_to_pdf._text_content("BT\n", ["a line"] * 50)),
+        )
+
+    def test_pdf_passthrough_jpeg_is_not_reencoded(self):
+        jpeg = self.path("scan.jpg")
+        Image.open(self.image).save(jpeg, quality=95)
+        with open(jpeg, "rb") as f:
+            data = f.read()
+
+        output_file = self.path("merged.pdf")
+        self.assertEqual(
+            convert_to_pdf.from_images([jpeg], output_file, profile="smallest"), 0
+        )
+        with open(output_file, "rb") as f:
+            self.assertIn(data, f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
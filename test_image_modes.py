@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from convert_to_image import from_image
+from image_modes import prepare_image
+
+
+class TestImageModes(unittest.TestCase):
+
+    def test_compatible_modes_are_not_copied(self):
+        for mode, output_format in [
+            ("RGB", "jpg"),
+            ("L", "jpg"),
+            ("RGB", "png"),
+            ("RGBA", "png"),
+            ("P", "gif"),
+            ("P", "png"),
+            ("RGB", "pdf"),
+            ("LA", "webp"),
+            ("P", "webp"),
+            ("1", "tiff"),
+            ("RGBA", "tiff"),
+            ("L", "bmp"),
+        ]:
+            with self.subTest(mode=mode, output_format=output_format):
+                im = Image.new(mode, (4, 4))
+                self.assertIs(prepare_image(im, output_format), im)
+
+    def test_transparent_palette_kept_for_png(self):
+        im = Image.new("P", (4, 4))
+        im.info["transparency"] = 0
+        self.assertIs(prepare_image(im, "png"), im)
+
+    def test_alpha_flattened_onto_white(self):
+        im = Image.new("RGBA", (2, 1), (255, 0, 0, 0))
+        im.putpixel((1, 0), (0, 0, 255, 255))
+
+        for output_format in ("jpg", "pdf", "bmp", "ico"):
+            with self.subTest(output_format=output_format):
+                flat = prepare_image(im, output_format)
+                self.assertEqual(flat.mode, "RGB")
+                self.assertEqual(flat.getpixel((0, 0)), (255, 255, 255))
+                self.assertEqual(flat.getpixel((1, 0)), (0, 0, 255))
+
+    def test_grayscale_alpha_flattened_to_grayscale(self):
+        im = Image.new("LA", (1, 1), (0, 0))
+        flat = prepare_image(im, "jpg")
+        self.assertEqual(flat.mode, "L")
+        self.assertEqual(flat.getpixel((0, 0)), 255)
+
+    def test_transparent_palette_flattened_for_jpg(self):
+        im = Image.new("P", (1, 1), 0)
+        im.info["transparency"] = 0
+        flat = prepare_image(im, "jpg")
+        self.assertEqual(flat.mode, "RGB")
+        self.assertEqual(flat.getpixel((0, 0)), (255, 255, 255))
+
+    def test_incompatible_modes_converted(self):
+        self.assertEqual(prepare_image(Image.new("CMYK", (1, 1)), "png").mode, "RGB")
+        self.assertEqual(prepare_image(Image.new("P", (1, 1)), "jpg").mode, "RGB")
+        self.assertEqual(prepare_image(Image.new("PA", (1, 1)), "png").mode, "RGBA")
+        self.assertEqual(prepare_image(Image.new("CMYK", (1, 1)), "bmp").mode, "RGB")
+        self.assertEqual(prepare_image(Image.new("PA", (1, 1)), "tiff").mode, "RGBA")
+
+    def test_alpha_kept_or_flattened_when_saved(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            png = os.path.join(tmp, "logo.png")
+            Image.new("RGBA", (8, 8), (255, 0, 0, 0)).save(png)
+
+            for output_format in ("webp", "tiff", "bmp"):
+                with self.subTest(output_format=output_format):
+                    output = os.path.join(tmp, f"logo.{output_format}")
+                    self.assertEqual(from_image(png, output), 0)
+                    with Image.open(output) as out:
+                        pixel = out.convert("RGBA").getpixel((4, 4))
+                    if output_format == "bmp":
+                        self.assertEqual(pixel, (255, 255, 255, 255))
+                    else:
+                        self.assertEqual(pixel[3], 0)
+
+    def test_png_to_gif_keeps_transparency(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            png = os.path.join(tmp, "logo.png")
+            im = Image.new("RGBA", (8, 8), (0, 0, 0, 0))
+            im.putpixel((0, 0), (255, 0, 0, 255))
+            im.save(png)
+            gif = os.path.join(tmp, "logo.gif")
+
+            self.assertEqual(from_image(png, gif), 0)
+            with Image.open(gif) as out:
+                self.assertEqual(out.mode, "P")
+                rgba = out.convert("RGBA")
+                self.assertEqual(rgba.getpixel((4, 4))[3], 0)
+                self.assertEqual(rgba.getpixel((0, 0)), (255, 0, 0, 255))
+
+
+if __name__ == "__main__":
+    unittest.main()
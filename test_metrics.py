@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+import metrics
+from convert_to_image import from_image, from_pdf
+from convert_to_pdf import from_image as image_to_pdf
+from metrics import JsonLinesSink, MemorySink, PrometheusSink, recording, span
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_span_is_a_no_op_without_sink(self):
+        self.assertFalse(metrics.enabled())
+        with span("decode", "test") as s:
+            s.add(bytes=10, pages=1)
+        self.assertIs(span("encode", "test"), span("decode", "test"))
+
+    def test_memory_sink_aggregates_by_operation_and_stage(self):
+        with recording(MemorySink()) as sink:
+            for _ in range(2):
+                with span("render", "test") as s:
+                    s.add(pages=3)
+            with self.assertRaises(ValueError):
+                with span("encode", "test"):
+                    raise ValueError
+        with span("render", "test"):
+            pass
+
+        totals = sink.totals()
+        self.assertEqual(set(totals), {("test", "render"), ("test", "encode")})
+        self.assertEqual(totals["test", "render"]["count"], 2)
+        self.assertEqual(totals["test", "render"]["pages"], 6)
+        self.assertEqual(totals["test", "encode"]["failures"], 1)
+
+    def test_from_image_stages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "photo.jpg")
+            Image.new("RGB", (64, 48), "red").save(source)
+
+            with recording(MemorySink()) as sink:
+                self.assertEqual(from_image(source, os.path.join(tmp, "p.png")), 0)
+                self.assertEqual(image_to_pdf(source, os.path.join(tmp, "p.pdf")), 0)
+
+            totals = sink.totals()
+            for operation, output in (("image", "p.png"), ("pdf", "p.pdf")):
+                operation += ".from_image"
+                self.assertEqual(
+                    [stage for op, stage in totals if op == operation],
+                    ["open", "decode", "convert", "encode"],
+                )
+                self.assertEqual(
+                    totals[operation, "open"]["bytes"], os.path.getsize(source)
+                )
+                self.assertEqual(
+                    totals[operation, "encode"]["bytes"],
+                    os.path.getsize(os.path.join(tmp, output)),
+                )
+                self.assertEqual(totals[operation, "decode"]["pages"], 1)
+
+    @patch("pdf2image.convert_from_path")
+    @patch("pdf2image.pdfinfo_from_path")
+    def test_from_pdf_stages(self, mock_pdfinfo, mock_convert_from_path):
+        mock_pdfinfo.return_value = {"Pages": 5}
+        mock_convert_from_path.side_effect = lambda *a, first_page, last_page, **k: [
+            Image.new("L", (4, 4)) for _ in range(first_page, last_page + 1)
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp, recording(MemorySink()) as sink:
+            pdf = os.path.join(tmp, "doc.pdf")
+            open(pdf, "wb").close()
+            self.assertEqual(from_pdf(pdf, tmp + "/", "doc", "png", chunk_size=2), 0)
+
+        totals = sink.totals()
+        self.assertEqual(totals["image.from_pdf", "render"]["count"], 3)
+        self.assertEqual(totals["image.from_pdf", "render"]["pages"], 5)
+        self.assertEqual(totals["image.from_pdf", "encode"]["pages"], 5)
+
+    def test_json_lines_sink(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spans.jsonl")
+            with JsonLinesSink(path) as sink, recording(sink):
+                with span("open", "test", path):
+                    pass
+                with span("write", "test") as s:
+                    s.add(bytes=42)
+
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual([r["stage"] for r in records], ["open", "write"])
+        self.assertEqual(records[1]["bytes"], 42)
+        self.assertFalse(records[0]["failed"])
+
+    def test_prometheus_sink(self):
+        with recording(PrometheusSink(prefix="conv")) as sink:
+            with span("render", "pdf.from_word") as s:
+                s.add(pages=4)
+
+        text = sink.render()
+        self.assertIn("# TYPE conv_stage_seconds_total counter\n", text)
+        self.assertIn(
+            'conv_stage_pages_total{operation="pdf.from_word",stage="render"} 4\n', text
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "converter.prom")
+            sink.write(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+            self.assertEqual(os.listdir(tmp), ["converter.prom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
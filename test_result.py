@@ -0,0 +1,100 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from PIL import Image
+
+from convert_to_image import from_image
+from converter_registry import convert_file
+from result import ErrorCategory, collect, produced, report_error
+from tempdir_case import TempDirTestCase
+
+
+class TestResult(TempDirTestCase):
+
+    def test_collect_success(self):
+        source = self.path("photo.jpg")
+        Image.new("RGB", (64, 48), "red").save(source)
+
+        result = collect(from_image, source, self.path("photo.png"))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.code, 0)
+        self.assertEqual(result.outputs, [self.path("photo.png")])
+        self.assertEqual(result.pages, 1)
+        self.assertEqual(result.bytes_in, os.path.getsize(source))
+        self.assertEqual(result.bytes_out, os.path.getsize(self.path("photo.png")))
+        self.assertEqual(set(result.stages), {"open", "decode", "convert", "encode"})
+        self.assertEqual(result.message, "")
+
+    def test_error_categories(self):
+        source = self.path("photo.png")
+        Image.new("RGB", (8, 8)).save(source)
+        broken = self.path("broken.png")
+        with open(source, "rb") as f:
+            data = f.read()
+        with open(broken, "wb") as f:
+            f.write(data[:16] + bytes(len(data) - 16))
+
+        for file_path, target, category in [
+            (self.path("missing.png"), "gif", ErrorCategory.NOT_FOUND),
+            (source, "xlsx", ErrorCategory.UNSUPPORTED),
+            (broken, "gif", ErrorCategory.DECODE_FAILURE),
+        ]:
+            with self.subTest(category=category):
+                result = convert_file(file_path, target)
+                self.assertEqual(result.error, category)
+                self.assertEqual(result.code, -1)
+                self.assertTrue(result.message)
+                self.assertEqual(result.outputs, [])
+
+    def test_timeout_and_cancel(self):
+        source = self.path("photo.png")
+        Image.new("RGB", (8, 8)).save(source)
+
+        def timing_out(file_path, output_file, **options):
+            raise TimeoutError("too slow")
+
+        def cancelled(file_path, output_file, **options):
+            return report_error(ErrorCategory.CANCELLED, "Conversion cancelled")
+
+        with patch("converter_registry.load", return_value=timing_out):
+            result = convert_file(source, "gif")
+        self.assertEqual(
+            (result.error, result.message), (ErrorCategory.TIMEOUT, "too slow")
+        )
+
+        with patch("converter_registry.load", return_value=cancelled):
+            self.assertEqual(convert_file(source, "gif").error, ErrorCategory.CANCELLED)
+
+    @patch("pdf2image.convert_from_path")
+    def test_chained_conversion_reports_final_pages_only(self, mock_convert_from_path):
+        source = self.path("notes.txt")
+        with open(source, "w") as f:
+            f.write("line\n" * 100)
+        mock_convert_from_path.return_value = [Image.new("L", (4, 4)) for _ in range(2)]
+
+        result = convert_file(source, "png")
+        self.assertTrue(result.ok)
+        self.assertEqual(
+            result.outputs, [self.path("notes_1.png"), self.path("notes_2.png")]
+        )
+        self.assertEqual(result.pages, 2)
+        self.assertIn("render", result.stages)
+
+    def test_outside_collection(self):
+        with redirect_stdout(io.StringIO()) as stdout:
+            self.assertEqual(report_error(ErrorCategory.FAILED, "failure"), -1)
+        self.assertEqual(stdout.getvalue(), "failure\n")
+        produced(self.path("ignored.png"), 1)
+
+    def test_collected_errors_are_not_printed(self):
+        with redirect_stdout(io.StringIO()) as stdout:
+            result = convert_file(self.path("missing.png"), "gif")
+        self.assertEqual(result.message, f"{self.path('missing.png')} not found")
+        self.assertEqual(stdout.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
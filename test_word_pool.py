@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from result import ErrorCategory, collect
+from word_pool import WordConverterPool
+
+
+def fake_convert(word_file, output_file):
+    if word_file == "slow.docx":
+        time.sleep(60)
+    if word_file == "crash.docx":
+        os._exit(1)
+    if word_file == "broken.docx":
+        raise ValueError("not a Word document")
+    return os.getpid()
+
+
+# Worker processes are forked, so they inherit these patches.
+FORK = multiprocessing.get_context("fork")
+
+
+@patch("word_pool.warm_up", lambda: None)
+@patch("word_pool._convert_document", fake_convert)
+class TestWordConverterPool(unittest.TestCase):
+
+    def test_worker_is_reused(self):
+        with WordConverterPool(workers=1, mp_context=FORK) as pool:
+            pids = [pool.convert(f"{i}.docx", f"{i}.pdf") for i in range(3)]
+        self.assertEqual(len(set(pids)), 1)
+        self.assertNotEqual(pids[0], os.getpid())
+
+    def test_worker_is_recycled_after_max_jobs(self):
+        with WordConverterPool(
+            workers=1, max_jobs_per_worker=2, mp_context=FORK
+        ) as pool:
+            pids = [pool.convert(f"{i}.docx", f"{i}.pdf") for i in range(5)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertEqual(len(set(pids)), 3)
+
+    def test_worker_is_recycled_above_memory_ceiling(self):
+        with WordConverterPool(workers=1, max_memory_mb=0, mp_context=FORK) as pool:
+            pids = [pool.convert(f"{i}.docx", f"{i}.pdf") for i in range(2)]
+        self.assertNotEqual(pids[0], pids[1])
+
+    def test_timeout_kills_worker_and_pool_keeps_going(self):
+        with WordConverterPool(workers=1, timeout=0.5, mp_context=FORK) as pool:
+            slow = pool.submit("slow.docx", "slow.pdf")
+            after = pool.submit("a.docx", "a.pdf")
+            with self.assertRaises(TimeoutError):
+                slow.result(timeout=10)
+            self.assertGreater(after.result(timeout=10), 0)
+
+            result = collect(pool.convert, "slow.docx", "slow.pdf")
+            self.assertEqual(result.error, ErrorCategory.TIMEOUT)
+            self.assertIn("timed out", result.message)
+
+    def test_dead_worker_is_replaced(self):
+        with WordConverterPool(workers=1, mp_context=FORK) as pool:
+            self.assertEqual(pool.convert("crash.docx", "crash.pdf"), -1)
+            self.assertGreater(pool.convert("a.docx", "a.pdf"), 0)
+
+    def test_failures_reach_the_callers_collection(self):
+        with WordConverterPool(workers=1, mp_context=FORK) as pool:
+            result = collect(pool.convert, "crash.docx", "crash.pdf")
+            self.assertEqual(result.error, ErrorCategory.FAILED)
+            self.assertEqual(result.message, "crash.docx: conversion worker died")
+
+            result = collect(pool.convert, "broken.docx", "broken.pdf")
+            self.assertEqual(result.error, ErrorCategory.DECODE_FAILURE)
+            self.assertEqual(result.message, "broken.docx: not a Word document")
+
+    def test_submit_after_close(self):
+        pool = WordConverterPool(workers=1, mp_context=FORK)
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            pool.submit("a.docx", "a.pdf")
+
+
+class TestWordConverterPoolSpire(unittest.TestCase):
+
+    def test_converts_word_documents(self):
+        from spire.doc import Document
+
+        with tempfile.TemporaryDirectory() as tmp:
+            word_file = os.path.join(tmp, "doc.docx")
+            document = Document()
+            document.AddSection().AddParagraph().AppendText("hello")
+            document.SaveToFile(word_file)
+            document.Close()
+
+            with WordConverterPool(workers=1) as pool:
+                self.assertEqual(
+                    pool.convert(word_file, os.path.join(tmp, "doc.pdf")), 0
+                )
+                self.assertEqual(pool.convert(os.path.join(tmp, "x.txt"), "x.pdf"), -1)
+
+            with open(os.path.join(tmp, "doc.pdf"), "rb") as f:
+                self.assertEqual(f.read(5), b"%PDF-")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""
+Pool of long-lived Word → PDF worker processes.
+
+Importing spire.doc and converting a first document costs far more than converting each following small document.
+The workers of a WordConverterPool pay that warm-up once and then take jobs over a pipe, so a stream of documents
+only pays for the conversions themselves.
+"""
+
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+
+from result import ErrorCategory, report_error
+
+
+class WordConverterPool:
+    """
+    Converts Word documents to PDF on a pool of warmed-up worker processes.
+
+    A worker is replaced by a fresh one after max_jobs_per_worker conversions, when its peak memory exceeds
+    max_memory_mb, when it dies, and when a document takes longer than timeout seconds (the worker is killed and the
+    job raises TimeoutError), so one pathological file cannot stall the pool.
+
+    Args:
+        workers (int): The number of worker processes.
+        max_jobs_per_worker (int): The number of conversions after which a worker is recycled.
+        max_memory_mb (float): The peak resident memory, in MiB, above which a worker is recycled.
+        timeout (float): The maximum time, in seconds, a single document may take.
+        mp_context: The multiprocessing context used to start the workers. Defaults to 'spawn': the native Spire
+            runtime does not survive being forked from a process that has already loaded it.
+
+    Example:
+        with WordConverterPool(workers=4) as pool:
+            futures = [pool.submit(doc, doc.rsplit(".", 1)[0] + ".pdf") for doc in docs]
+            results = [future.result() for future in futures]
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_jobs_per_worker: int = 500,
+        max_memory_mb: float = 1024,
+        timeout: float = 60.0,
+        mp_context=None,
+    ):
+        import multiprocessing
+
+        self.mp_context = mp_context or multiprocessing.get_context("spawn")
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_memory_mb = max_memory_mb
+        self.timeout = timeout
+        self._jobs = queue.Queue()
+        self._closed = False
+        # one thread per worker process: it feeds the process and enforces the limits
+        self._threads = [
+            threading.Thread(target=self._run_slot, daemon=True) for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, word_file: str, output_file: str) -> Future:
+        """
+        Queues the conversion of word_file to the PDF file output_file.
+
+        Returns:
+            Future: Resolves to 0 if the conversion is successful, -1 if it failed. Raises TimeoutError if it took longer
+                than the pool's timeout. Failures are reported with result.report_error in the context of the caller,
+                so that they reach its result.collect().
+        """
+        if self._closed:
+            raise RuntimeError("cannot submit to a closed WordConverterPool")
+        future = Future()
+        self._jobs.put((future, word_file, output_file, contextvars.copy_context()))
+        return future
+
+    def convert(self, word_file: str, output_file: str) -> int:
+        """
+        Converts word_file to the PDF file output_file and waits for the result, like convert_to_pdf.from_word.
+
+        Raises:
+            TimeoutError: If the conversion took longer than the pool's timeout. Under result.collect(), the
+                conversion fails with ErrorCategory.TIMEOUT.
+        """
+        return self.submit(word_file, output_file).result()
+
+    def close(self):
+        """
+        Lets the queued jobs finish, then stops the workers.
+        """
+        self._closed = True
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run_slot(self):
+        worker = None
+        jobs_done = 0
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, word_file, output_file, context = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            if worker is None:
+                try:
+                    worker = _Worker(self.mp_context)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                jobs_done = 0
+
+            try:
+                worker.conn.send((word_file, output_file))
+                if not worker.conn.poll(self.timeout):
+                    future.set_exception(
+                        TimeoutError(
+                            f"{word_file}: conversion timed out after {self.timeout}s"
+                        )
+                    )
+                    worker.kill()
+                    worker = None
+                    continue
+                res, peak_memory_mb, error = worker.conn.recv()
+            except (EOFError, OSError):
+                future.set_result(
+                    context.run(
+                        report_error,
+                        ErrorCategory.FAILED,
+                        f"{word_file}: conversion worker died",
+                    )
+                )
+                worker.kill()
+                worker = None
+                continue
+
+            if error is not None:
+                res = context.run(report_error, ErrorCategory.DECODE_FAILURE, error)
+            future.set_result(res)
+            jobs_done += 1
+            if (
+                jobs_done >= self.max_jobs_per_worker
+                or peak_memory_mb > self.max_memory_mb
+            ):
+                worker.stop()
+                worker = None
+
+        if worker is not None:
+            worker.stop()
+
+
+class _Worker:
+    """
+    A worker process and the parent end of its pipe.
+    """
+
+    def __init__(self, mp_context):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def _worker_main(conn):
+    """
+    Worker process loop: receives (word_file, output_file) jobs until None and answers with
+    (result, peak memory in MiB, error message or None) for each.
+    """
+    import resource
+
+    warm_up()
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        error = None
+        try:
+            res = _convert_document(*job)
+        except Exception as e:
+            # reported by the parent, in the context of the caller
+            res, error = -1, f"{job[0]}: {e}"
+        # ru_maxrss is in KiB on Linux
+        peak_memory_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        conn.send((res, peak_memory_mb, error))
+
+
+def warm_up():
+    """
+    Imports spire.doc and converts a one-paragraph document, so that the first real job in this process runs on a warm
+    engine. The pool's workers call it when they start.
+
+    Raises:
+        ImportError: If spire.doc is not installed.
+    """
+    import os
+    import tempfile
+
+    from spire.doc import Document, FileFormat
+
+    document = Document()
+    document.AddSection().AddParagraph().AppendText("warm-up")
+    with tempfile.TemporaryDirectory() as tmp:
+        document.SaveToFile(os.path.join(tmp, "warm-up.pdf"), FileFormat.PDF)
+    document.Close()
+
+
+def _convert_document(word_file: str, output_file: str) -> int:
+    from convert_to_pdf import from_word
+
+    return from_word(word_file, output_file)